@@ -0,0 +1,49 @@
+"""Add composite index for IRN expiry sweeps
+
+Revision ID: 017_irn_expiry_index
+Revises: 3f9f414f7ccb
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '017_irn_expiry_index'
+down_revision = '3f9f414f7ccb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+    
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    
+    if 'irn_records' not in inspector.get_table_names():
+        print("Warning: irn_records table does not exist. Skipping expiry index creation.")
+        return
+    
+    index_names = [idx['name'] for idx in inspector.get_indexes('irn_records')]
+    if 'idx_irn_status_valid_until' in index_names:
+        print("idx_irn_status_valid_until already exists on irn_records. Skipping.")
+        return
+    
+    # Expiry sweeps filter on status and valid_until together
+    op.create_index('idx_irn_status_valid_until', 'irn_records', ['status', 'valid_until'])
+
+
+def downgrade() -> None:
+    from sqlalchemy import inspect
+    
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    
+    if 'irn_records' not in inspector.get_table_names():
+        return
+    
+    index_names = [idx['name'] for idx in inspector.get_indexes('irn_records')]
+    if 'idx_irn_status_valid_until' in index_names:
+        op.drop_index('idx_irn_status_valid_until', table_name='irn_records')
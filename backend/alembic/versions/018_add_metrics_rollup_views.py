@@ -0,0 +1,72 @@
+"""Add hourly rollup materialized views for dashboard metrics
+
+Revision ID: 018_metrics_rollup_views
+Revises: 017_irn_expiry_index
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '018_metrics_rollup_views'
+down_revision = '017_irn_expiry_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        print("Materialized views require PostgreSQL. Skipping metrics rollup views.")
+        return
+
+    inspector = inspect(bind)
+    table_names = inspector.get_table_names()
+
+    # Unique indexes are required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    if 'irn_records' in table_names:
+        op.execute("""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS mv_irn_hourly AS
+            SELECT date_trunc('hour', generated_at) AS hour,
+                   integration_id,
+                   status,
+                   count(*) AS irn_count
+            FROM irn_records
+            GROUP BY 1, 2, 3
+        """)
+        op.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_irn_hourly "
+            "ON mv_irn_hourly (hour, integration_id, status)"
+        )
+    else:
+        print("Warning: irn_records table does not exist. Skipping mv_irn_hourly.")
+
+    if 'validation_records' in table_names:
+        op.execute("""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS mv_validation_hourly AS
+            SELECT date_trunc('hour', validation_time) AS hour,
+                   integration_id,
+                   count(*) AS validation_count,
+                   count(*) FILTER (WHERE is_valid) AS success_count
+            FROM validation_records
+            GROUP BY 1, 2
+        """)
+        op.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_validation_hourly "
+            "ON mv_validation_hourly (hour, integration_id)"
+        )
+    else:
+        print("Warning: validation_records table does not exist. Skipping mv_validation_hourly.")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_validation_hourly")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_irn_hourly")
@@ -0,0 +1,198 @@
+"""Replace metrics rollup views with a trigger-maintained rollup table
+
+Revision ID: 019_dashboard_metrics_rollup
+Revises: 018_metrics_rollup_views
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '019_dashboard_metrics_rollup'
+down_revision = '018_metrics_rollup_views'
+branch_labels = None
+depends_on = None
+
+
+# Statement-level triggers append one aggregated delta row per bucket, so
+# concurrent inserts never contend on a shared counter row. Deltas are
+# compacted periodically by the metrics rollup maintenance task.
+IRN_ROLLUP_FUNCTION = """
+    CREATE OR REPLACE FUNCTION dashboard_rollup_irn_records() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT date_trunc('hour', generated_at), 'irn', integration_id::text, status::text, count(*)
+            FROM new_rows
+            GROUP BY 1, 3, 4;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT date_trunc('hour', generated_at), 'irn', integration_id::text, status::text, -count(*)
+            FROM old_rows
+            GROUP BY 1, 3, 4;
+        ELSE
+            -- Move changed rows from their old bucket to their new one
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT bucket_hour, 'irn', integration_id, dim, sum(delta)
+            FROM (
+                SELECT date_trunc('hour', o.generated_at) AS bucket_hour, o.integration_id::text AS integration_id,
+                       o.status::text AS dim, -1 AS delta
+                FROM old_rows o JOIN new_rows n ON n.irn = o.irn
+                WHERE (n.status, n.generated_at, n.integration_id)
+                      IS DISTINCT FROM (o.status, o.generated_at, o.integration_id)
+                UNION ALL
+                SELECT date_trunc('hour', n.generated_at), n.integration_id::text, n.status::text, 1
+                FROM old_rows o JOIN new_rows n ON n.irn = o.irn
+                WHERE (n.status, n.generated_at, n.integration_id)
+                      IS DISTINCT FROM (o.status, o.generated_at, o.integration_id)
+            ) AS changes
+            GROUP BY 1, 3, 4;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+VALIDATION_ROLLUP_FUNCTION = """
+    CREATE OR REPLACE FUNCTION dashboard_rollup_validation_records() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT date_trunc('hour', validation_time), 'validation', integration_id::text,
+                   CASE WHEN is_valid THEN 'valid' ELSE 'invalid' END, -count(*)
+            FROM old_rows
+            GROUP BY 1, 3, 4;
+        ELSE
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT date_trunc('hour', validation_time), 'validation', integration_id::text,
+                   CASE WHEN is_valid THEN 'valid' ELSE 'invalid' END, count(*)
+            FROM new_rows
+            GROUP BY 1, 3, 4;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        print("Partitioned rollup tables require PostgreSQL. Skipping dashboard metrics rollup.")
+        return
+
+    inspector = inspect(bind)
+    table_names = inspector.get_table_names()
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_validation_hourly")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_irn_hourly")
+
+    # Daily partitions are created ahead of time by the maintenance task;
+    # the default partition holds history and anything that arrives early
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_metrics_rollup (
+            bucket_hour TIMESTAMP NOT NULL,
+            metric TEXT NOT NULL,
+            integration_id TEXT NOT NULL,
+            dim TEXT NOT NULL,
+            cnt BIGINT NOT NULL
+        ) PARTITION BY RANGE (bucket_hour)
+    """)
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS dashboard_metrics_rollup_default "
+        "PARTITION OF dashboard_metrics_rollup DEFAULT"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_dashboard_metrics_rollup_bucket "
+        "ON dashboard_metrics_rollup (metric, bucket_hour)"
+    )
+
+    if 'irn_records' in table_names:
+        op.execute("""
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT date_trunc('hour', generated_at), 'irn', integration_id::text, status::text, count(*)
+            FROM irn_records
+            GROUP BY 1, 3, 4
+        """)
+        op.execute(IRN_ROLLUP_FUNCTION)
+        for event, tables in (
+            ('INSERT', 'NEW TABLE AS new_rows'),
+            ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+            ('DELETE', 'OLD TABLE AS old_rows'),
+        ):
+            op.execute(f"""
+                CREATE TRIGGER trg_irn_records_rollup_{event.lower()}
+                AFTER {event} ON irn_records
+                REFERENCING {tables}
+                FOR EACH STATEMENT EXECUTE FUNCTION dashboard_rollup_irn_records()
+            """)
+    else:
+        print("Warning: irn_records table does not exist. Skipping IRN rollup triggers.")
+
+    if 'validation_records' in table_names:
+        op.execute("""
+            INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+            SELECT date_trunc('hour', validation_time), 'validation', integration_id::text,
+                   CASE WHEN is_valid THEN 'valid' ELSE 'invalid' END, count(*)
+            FROM validation_records
+            GROUP BY 1, 3, 4
+        """)
+        op.execute(VALIDATION_ROLLUP_FUNCTION)
+        for event, tables in (
+            ('INSERT', 'NEW TABLE AS new_rows'),
+            ('DELETE', 'OLD TABLE AS old_rows'),
+        ):
+            op.execute(f"""
+                CREATE TRIGGER trg_validation_records_rollup_{event.lower()}
+                AFTER {event} ON validation_records
+                REFERENCING {tables}
+                FOR EACH STATEMENT EXECUTE FUNCTION dashboard_rollup_validation_records()
+            """)
+    else:
+        print("Warning: validation_records table does not exist. Skipping validation rollup triggers.")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for event in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_irn_records_rollup_{event} ON irn_records")
+    for event in ('insert', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_validation_records_rollup_{event} ON validation_records")
+    op.execute("DROP FUNCTION IF EXISTS dashboard_rollup_irn_records()")
+    op.execute("DROP FUNCTION IF EXISTS dashboard_rollup_validation_records()")
+    op.execute("DROP TABLE IF EXISTS dashboard_metrics_rollup")
+
+    # Restore the 018 materialized views
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_irn_hourly AS
+        SELECT date_trunc('hour', generated_at) AS hour,
+               integration_id,
+               status,
+               count(*) AS irn_count
+        FROM irn_records
+        GROUP BY 1, 2, 3
+    """)
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_irn_hourly "
+        "ON mv_irn_hourly (hour, integration_id, status)"
+    )
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_validation_hourly AS
+        SELECT date_trunc('hour', validation_time) AS hour,
+               integration_id,
+               count(*) AS validation_count,
+               count(*) FILTER (WHERE is_valid) AS success_count
+        FROM validation_records
+        GROUP BY 1, 2
+    """)
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_validation_hourly "
+        "ON mv_validation_hourly (hour, integration_id)"
+    )
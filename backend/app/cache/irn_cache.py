@@ -7,7 +7,7 @@ to improve performance and reduce database load during high-volume operations.
 import json
 import logging
 import hashlib
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import redis
 from redis.exceptions import RedisError
@@ -20,6 +20,9 @@ logger = logging.getLogger(__name__)
 # Default cache expiry (12 hours)
 DEFAULT_CACHE_EXPIRY = 60 * 60 * 12
 
+# Upper bound on how long an IRN verification result is reused (1 hour)
+VERIFICATION_CACHE_EXPIRY = 60 * 60
+
 # Try to connect to Redis if configured, but don't fail if it's not available
 redis_client = None
 
@@ -45,6 +48,17 @@ class IRNCache:
         """Generate a cache key for an IRN."""
         return f"irn:value:{irn_value}"
     
+    @staticmethod
+    def _get_verification_cache_key(irn_value: str) -> str:
+        """Generate the cache key holding verification results for an IRN."""
+        return f"irn:verify:{irn_value}"
+    
+    @staticmethod
+    def _get_verification_field(verification_code: Optional[str], invoice_data: Dict[str, Any]) -> str:
+        """Digest the verification inputs so codes are never stored in plain text."""
+        material = f"{verification_code or ''}|{invoice_data.get('invoice_number')}|{invoice_data.get('total_amount')}"
+        return hashlib.sha256(material.encode()).hexdigest()
+    
     @staticmethod
     def _get_bulk_cache_key(batch_id: str) -> str:
         """Generate a cache key for a bulk generation job."""
@@ -161,12 +175,82 @@ class IRNCache:
             
         try:
             key = IRNCache._get_irn_cache_key(irn_value)
-            redis_client.delete(key)
+            redis_client.delete(key, IRNCache._get_verification_cache_key(irn_value))
             return True
         except (RedisError, Exception) as e:
             logger.error(f"Error invalidating cached IRN {irn_value}: {str(e)}")
             return False
     
+    @staticmethod
+    def cache_verification(
+        irn_value: str,
+        verification_code: Optional[str],
+        invoice_data: Dict[str, Any],
+        result: Tuple[bool, str],
+        expiry: int = VERIFICATION_CACHE_EXPIRY
+    ) -> bool:
+        """
+        Cache the outcome of verifying an IRN with a code and invoice data.
+        
+        Results for one IRN share a hash key, so invalidate_irn_cache drops
+        them all at once.
+        
+        Args:
+            irn_value: The verified IRN value
+            verification_code: The verification code that was checked
+            invoice_data: The invoice data that was checked
+            result: The (is_valid, message) verification result
+            expiry: Cache expiry time in seconds; nothing is cached if not positive
+            
+        Returns:
+            bool: True if caching was successful, False otherwise
+        """
+        if not redis_client or expiry <= 0:
+            return False
+            
+        try:
+            key = IRNCache._get_verification_cache_key(irn_value)
+            field = IRNCache._get_verification_field(verification_code, invoice_data)
+            pipe = redis_client.pipeline()
+            pipe.hset(key, field, json.dumps(list(result)))
+            pipe.expire(key, expiry)
+            pipe.execute()
+            return True
+        except (RedisError, Exception) as e:
+            logger.error(f"Error caching verification of IRN {irn_value}: {str(e)}")
+            return False
+    
+    @staticmethod
+    def get_cached_verification(
+        irn_value: str,
+        verification_code: Optional[str],
+        invoice_data: Dict[str, Any]
+    ) -> Optional[Tuple[bool, str]]:
+        """
+        Get a cached IRN verification result.
+        
+        Args:
+            irn_value: The IRN value to verify
+            verification_code: The verification code provided with the IRN
+            invoice_data: The invoice data to verify against
+            
+        Returns:
+            Optional (is_valid, message) tuple if cached, None otherwise
+        """
+        if not redis_client:
+            return None
+            
+        try:
+            key = IRNCache._get_verification_cache_key(irn_value)
+            data = redis_client.hget(key, IRNCache._get_verification_field(verification_code, invoice_data))
+            if data:
+                is_valid, message = json.loads(data)
+                return is_valid, message
+            return None
+        except (RedisError, Exception) as e:
+            logger.error(f"Error retrieving cached verification of IRN {irn_value}: {str(e)}")
+            return None
+    
     @staticmethod
     def cache_bulk_irn_status(batch_id: str, status: Dict[str, Any], expiry: int = DEFAULT_CACHE_EXPIRY * 2) -> bool:
         """
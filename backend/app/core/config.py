@@ -225,6 +225,9 @@ class Settings(BaseSettings):
     FIRS_API_SECRET: str = os.getenv("FIRS_API_SECRET", "")
     FIRS_SUBMISSION_TIMEOUT: int = int(os.getenv("FIRS_SUBMISSION_TIMEOUT", "30"))
     FIRS_RETRY_ATTEMPTS: int = int(os.getenv("FIRS_RETRY_ATTEMPTS", "3"))
+    FIRS_RATE_LIMIT_PER_SEC: float = float(os.getenv("FIRS_RATE_LIMIT_PER_SEC", "9"))  # Just under the 10 req/s quota
+    FIRS_MAX_CONCURRENCY: int = int(os.getenv("FIRS_MAX_CONCURRENCY", "32"))
+    FIRS_MAX_DOWNLOAD_CONCURRENCY: int = int(os.getenv("FIRS_MAX_DOWNLOAD_CONCURRENCY", "4"))  # PDF payloads are large
     FIRS_MAX_BATCH_SIZE: int = int(os.getenv("FIRS_MAX_BATCH_SIZE", "100"))
     
     # FIRS Sandbox Configuration
@@ -237,6 +240,11 @@ class Settings(BaseSettings):
     FIRS_SERVICE_ID: str = os.getenv("FIRS_SERVICE_ID", "94ND90NR")
     IRN_EXPIRY_DAYS: int = int(os.getenv("IRN_EXPIRY_DAYS", "30"))
     
+    # Dashboard Metrics Configuration
+    METRICS_ROLLUP_ENABLED: bool = os.getenv("METRICS_ROLLUP_ENABLED", "True").lower() in ("true", "1", "t")
+    METRICS_ROLLUP_MAINTENANCE_INTERVAL: int = int(os.getenv("METRICS_ROLLUP_MAINTENANCE_INTERVAL", "300"))
+    METRICS_ROLLUP_RETENTION_DAYS: int = int(os.getenv("METRICS_ROLLUP_RETENTION_DAYS", "0"))  # 0 keeps every partition
+    
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
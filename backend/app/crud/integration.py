@@ -1,14 +1,16 @@
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.models.integration import Integration, IntegrationHistory
 from app.schemas.integration import IntegrationCreate, IntegrationUpdate, IntegrationHistoryCreate
 
 
 def get(db: Session, integration_id: UUID) -> Optional[Integration]:
-    return db.query(Integration).filter(Integration.id == integration_id).first()
+    return db.query(Integration).options(undefer(Integration.config)).filter(
+        Integration.id == integration_id
+    ).first()
 
 
 def get_by_client_id(db: Session, client_id: UUID) -> List[Integration]:
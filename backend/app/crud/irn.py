@@ -7,6 +7,7 @@ from uuid import UUID
 import logging
 
 from app.models.irn import IRNRecord
+from app.cache.irn_cache import IRNCache
 from app.schemas.irn import IRNGenerateRequest, IRNMetricsResponse
 from app.utils.irn_generator import validate_invoice_number, validate_service_id, validate_timestamp, generate_firs_irn as utils_generate_irn
 from fastapi import HTTPException # type: ignore
@@ -357,6 +358,8 @@ def update_irn_status(
     try:
         db.commit()
         db.refresh(irn_record)
+        # Cached verification results reflect the previous status
+        IRNCache.invalidate_irn_cache(irn_value)
         return irn_record
     except Exception as e:
         db.rollback()
@@ -415,19 +418,13 @@ def expire_outdated_irns(db: Session) -> int:
         int: Number of IRNs updated
     """
     try:
-        # Find unused IRNs that have expired
-        expired_irns = db.query(IRNRecord).filter(
+        # Expire unused IRNs past their validity in a single UPDATE
+        count = db.query(IRNRecord).filter(
             and_(
                 IRNRecord.status == "unused",
                 IRNRecord.valid_until < datetime.now()
             )
-        ).all()
-        
-        # Update their status
-        count = 0
-        for irn in expired_irns:
-            irn.status = "expired"
-            count += 1
+        ).update({IRNRecord.status: "expired"}, synchronize_session=False)
         
         # Commit changes
         if count > 0:
@@ -1,5 +1,10 @@
+from contextlib import contextmanager
+from typing import Iterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
+import orjson
 import os
 
 from app.core.config import settings
@@ -12,6 +17,9 @@ def get_engine_kwargs():
         "pool_timeout": 20,
         "pool_recycle": 300,  # 5 minutes
         "pool_pre_ping": True,  # Test connections before use
+        # Compiled-SQL cache; the default 500 entries churns once the IRN,
+        # integration and monitor queries are all in rotation
+        "query_cache_size": 1200,
         "connect_args": {
             "connect_timeout": 10
         }
@@ -28,11 +36,28 @@ def get_engine_kwargs():
             }
         })
     
+    # INSERTs are already batched by insertmanyvalues; also send executemany
+    # UPDATE/DELETE flushes (bulk IRN status changes) through execute_batch
+    if settings.SQLALCHEMY_DATABASE_URI and make_url(settings.SQLALCHEMY_DATABASE_URI).get_driver_name() == "psycopg2":
+        kwargs["executemany_mode"] = "values_plus_batch"
+    
+    # Explicit overrides for hosts whose Postgres allows more connections
+    if os.getenv("DB_POOL_SIZE"):
+        kwargs["pool_size"] = int(os.getenv("DB_POOL_SIZE"))
+    if os.getenv("DB_MAX_OVERFLOW"):
+        kwargs["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW"))
+    
     return kwargs
 
+def _json_serializer(obj) -> str:
+    """Serialize JSON/JSONB column values with orjson; the DBAPI expects text."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
 # Create engine with Railway optimizations
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
     **get_engine_kwargs()
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -47,4 +72,20 @@ def get_db():
 def get_db_session() -> Session:
     """Get a SQLAlchemy session directly for middleware use.
     NOTE: The caller is responsible for closing this session."""
-    return SessionLocal()
\ No newline at end of file
+    return SessionLocal()
+
+
+@contextmanager
+def no_expire_on_commit(db: Session) -> Iterator[Session]:
+    """Keep loaded objects usable after commits made inside the block.
+    
+    Commits normally expire every instance in the session, so the next
+    attribute access reloads it with a SELECT. Use this around write-only
+    commits (audit records) whose rows the caller does not need refreshed.
+    """
+    previous = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield db
+    finally:
+        db.expire_on_commit = previous
@@ -14,13 +14,26 @@ from pathlib import Path
 from typing import List
 import logging
 import traceback
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Configure logging first - before any imports that might use it.
+# Request threads only enqueue records; a listener thread writes them to
+# stdout, so a burst of errors does not block callers on stream I/O.
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stdout),  # Ensure logs go to stdout for Railway
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
-# Configure logging first - before any imports that might use it
 logging.basicConfig(
     level=logging.DEBUG,  # Use DEBUG level to capture more information
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
-        logging.StreamHandler(sys.stdout),  # Ensure logs go to stdout for Railway
+        QueueHandler(_log_queue),  # Formats the record; the listener just writes it
     ]
 )
 
@@ -89,6 +102,8 @@ except Exception as e:
 from app.core.config import settings
 from app.core.config_retry import retry_settings
 from app.services.background_tasks import start_background_tasks
+from app.services.firs_si.irn_generation_service import flush_validation_buffer
+from app.services.firs_certification_service import firs_certification_service
 from app.dependencies.auth import get_current_user_from_token # type: ignore
 from app.middleware import setup_middleware
 
@@ -155,7 +170,11 @@ try:
                 "description": "Organization management endpoints",
             },
         ],
-        on_startup=[start_background_tasks]  # Start background tasks on startup
+        on_startup=[start_background_tasks],  # Start background tasks on startup
+        on_shutdown=[
+            flush_validation_buffer,  # Write any buffered validation records
+            firs_certification_service.aclose  # Close the shared FIRS HTTP client
+        ]
     )
     logger.info("FastAPI application initialized successfully with enhanced OpenAPI documentation")
 except Exception as e:
@@ -2,7 +2,7 @@ import uuid
 import enum
 from sqlalchemy import Column, String, ForeignKey, DateTime, Text, func, Boolean, Enum # type: ignore
 from sqlalchemy.dialects.postgresql import UUID, JSONB # type: ignore
-from sqlalchemy.orm import relationship # type: ignore
+from sqlalchemy.orm import deferred, relationship # type: ignore
 from app.db.base_class import Base # type: ignore
 
 
@@ -21,7 +21,8 @@ class Integration(Base):
     name = Column(String(100), nullable=False)
     description = Column(Text)
     integration_type = Column(Enum(IntegrationType), nullable=False, default=IntegrationType.CUSTOM)
-    config = Column(JSONB, nullable=False)
+    # Config blobs can run to several KB; load them only where they are used
+    config = deferred(Column(JSONB, nullable=False))
     config_encrypted = Column(Boolean, nullable=False, default=False)  # Flag to indicate if config is encrypted
     encryption_key_id = Column(String(100), ForeignKey("encryption_keys.id"))  # Reference to the key used for encryption
     created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Boolean, Float, Enum # type: ignore
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Boolean, Float, Enum, Index # type: ignore
 from sqlalchemy.sql import func # type: ignore
 from sqlalchemy.orm import relationship # type: ignore
 from sqlalchemy.dialects.postgresql import UUID # type: ignore
@@ -44,6 +44,12 @@ class IRNRecord(Base):
     validation_records = relationship("IRNValidationRecord", back_populates="irn_record")
     submission_records = relationship("SubmissionRecord", back_populates="irn_record")
     
+    # Indexes
+    __table_args__ = (
+        # Serves the expiry sweeps, which filter on status and valid_until
+        Index('idx_irn_status_valid_until', status, valid_until),
+    )
+    
     @classmethod
     def create_with_expiry(cls, **kwargs):
         """Factory method to create an IRN record with automatically calculated expiry date"""
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body # type: ignore
+from fastapi.responses import StreamingResponse # type: ignore
 from sqlalchemy.orm import Session # type: ignore
 from typing import Any, Dict
 from uuid import UUID
@@ -59,3 +60,15 @@ async def validate_invoice(
     Validate an invoice against FIRS rules.
     """
     return await firs_service.validate_invoice(invoice_data=invoice_data)
+
+
+@router.get("/invoice/{irn}/download")
+async def download_invoice(
+    irn: str,
+    current_user: Any = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Stream a signed invoice from the FIRS API.
+    """
+    chunks = await firs_service.stream_invoice(irn)
+    return StreamingResponse(chunks, media_type="application/pdf")
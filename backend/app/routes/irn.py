@@ -21,11 +21,10 @@ from app.crud.irn import (
     create_irn,
     get_irn,
     get_irns_by_organization,
-    validate_irn,
     update_irn_status
 )
 from app.dependencies.auth import get_current_user, get_current_organization
-from app.services.firs_si.irn_generation_service import generate_irn, verify_irn
+from app.services.firs_si.irn_generation_service import generate_irn, verify_irn, buffer_validation_record
 
 router = APIRouter(prefix="/irn", tags=["irn"])
 
@@ -132,19 +131,19 @@ async def validate_irn_endpoint(
         validation_request.invoice_data
     )
     
-    # Log the validation attempt
-    validation_record = validate_irn(
-        db,
+    # Log the validation attempt; written with the next buffered batch
+    validation_record = buffer_validation_record(
         validation_request.irn_value,
         is_valid,
         message,
-        validated_by=current_user.email
+        validated_by=current_user.email,
+        validation_source="api"
     )
     
     return {
         "is_valid": is_valid,
         "message": message,
-        "validation_date": validation_record.validation_date
+        "validation_date": validation_record["validation_date"]
     }
 
 
@@ -81,6 +81,7 @@ class IntegrationUpdate(BaseModel):
     config: Optional[Dict[str, Any]] = None
     status: Optional[str] = None
     sync_frequency: Optional[SyncFrequency] = None
+    last_tested: Optional[datetime] = None
 
     @validator('status')
     def validate_status(cls, v):
@@ -113,6 +114,7 @@ class IntegrationInDBBase(IntegrationBase):
 
     class Config:
         from_attributes = True
+        orm_mode = True
 
 
 # Properties to return to client
@@ -369,6 +369,7 @@ class InvoiceValidationResponse(BaseModel):
 class BatchValidationRequest(BaseModel):
     """Batch invoice validation request schema"""
     invoices: List[InvoiceValidationRequest] = Field(..., min_items=1, max_items=100, description="List of invoices to validate")
+    fail_fast: bool = Field(False, description="Stop validating each invoice at its first error")
 
 
 class BatchValidationResponse(BaseModel):
@@ -6,6 +6,8 @@ This module provides background task management for:
 2. Monitoring failed submissions
 3. Cleanup of old records
 4. Certificate expiration monitoring and validation
+5. Batched writes of IRN validation audit records
+6. Maintenance of the dashboard metrics rollup
 """
 
 import asyncio
@@ -21,6 +23,8 @@ from app.core.config import settings
 from app.core.config_retry import retry_settings
 from app.tasks.certificate_tasks import certificate_monitor_task
 from app.tasks.hubspot_tasks import hubspot_deal_processor_task
+from app.services.firs_si.irn_generation_service import flush_validation_buffer, VALIDATION_FLUSH_INTERVAL
+from app.services.metrics_service import maintain_metrics_rollups
 
 logger = get_logger(__name__)
 
@@ -72,6 +76,20 @@ async def start_background_tasks():
         interval_seconds=getattr(settings, "HUBSPOT_SYNC_INTERVAL", 3600)  # Default: hourly
     )
     
+    # Write buffered IRN validation audit records in batches
+    start_task(
+        "irn_validation_flush",
+        flush_validation_buffer,
+        interval_seconds=VALIDATION_FLUSH_INTERVAL
+    )
+    
+    # Compact the dashboard metrics rollup and manage its partitions
+    start_task(
+        "metrics_rollup_maintenance",
+        maintain_metrics_rollups,
+        interval_seconds=settings.METRICS_ROLLUP_MAINTENANCE_INTERVAL
+    )
+    
     # Add more background tasks here as needed
 
 
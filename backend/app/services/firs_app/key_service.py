@@ -15,6 +15,7 @@ APP Role Responsibilities:
 import base64
 import json
 import os
+import tempfile
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any, Union
@@ -37,6 +38,9 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Registry location used when neither KEY_STORAGE_FILE nor BASE_DIR is set
+_DEFAULT_STORAGE_FILE = Path(__file__).resolve().parents[3] / "keys" / "key_registry.enc"
+
 
 class KeyManagementService:
     """
@@ -50,9 +54,15 @@ class KeyManagementService:
     def __init__(self, db: Session = None):
         self.db = db
         self._encryption_key = None
+        # ID of _encryption_key, so encrypting needs no registry scan
+        self._active_key_id: Optional[str] = None
         self._key_registry = {}
+        # Decoded key bytes by key ID, so lookups skip base64 decoding.
+        # Kept out of _key_registry because the registry is persisted as JSON.
+        self._decoded_keys: Dict[str, bytes] = {}
         self._initialized = False
-        self._loaded_keys = False
+        # mtime_ns of the registry file when this instance last read it
+        self._storage_mtime_ns: Optional[int] = None
         
     def initialize(self):
         """Initialize the APP key management service for FIRS security."""
@@ -71,6 +81,8 @@ class KeyManagementService:
                 "app_provider": "TaxPoynt",
                 "key_purpose": "transmission_security"
             }
+            self._decoded_keys[default_key_id] = self._encryption_key
+            self._active_key_id = default_key_id
             
             self._initialized = True
             logger.info("Initialized APP key management service for FIRS transmission security")
@@ -108,43 +120,50 @@ class KeyManagementService:
         """
         self._ensure_initialized()
         
-        if key_id in self._key_registry:
-            key_data = self._key_registry[key_id]
-            return base64.b64decode(key_data["key"])
+        key = self._decoded_keys.get(key_id)
+        if key is not None:
+            return key
         
         # If not in memory, try to load from storage
-        self._load_keys_from_storage()
+        if key_id not in self._key_registry:
+            self._load_keys_from_storage()
         
         if key_id in self._key_registry:
-            key_data = self._key_registry[key_id]
-            return base64.b64decode(key_data["key"])
+            key = base64.b64decode(self._key_registry[key_id]["key"])
+            self._decoded_keys[key_id] = key
+            return key
             
         return None
     
+    def _get_storage_file(self) -> Path:
+        """Resolve the key registry file: KEY_STORAGE_FILE, else keys/ under the backend root."""
+        storage_file = getattr(settings, 'KEY_STORAGE_FILE', None)
+        if storage_file:
+            return Path(storage_file)
+        
+        base_dir = getattr(settings, 'BASE_DIR', None)
+        if base_dir:
+            return Path(base_dir) / "keys" / "key_registry.enc"
+        
+        return _DEFAULT_STORAGE_FILE
+    
     def _load_keys_from_storage(self):
         """
         Load keys from persistent storage for APP operations.
         In production, this would use a secure storage solution like AWS KMS,
         HashiCorp Vault, or Azure Key Vault for FIRS compliance.
         """        
-        # Skip if already loaded
-        if self._loaded_keys:
-            return
-            
-        # First check environment
-        storage_file = None
-        if hasattr(settings, 'KEY_STORAGE_FILE'):
-            storage_file = settings.KEY_STORAGE_FILE
-            
-        # If environment variable not set, use default location
-        if not storage_file:
-            storage_dir = Path(settings.BASE_DIR) / "keys"
-            storage_file = storage_dir / "key_registry.enc"
+        storage_file = self._get_storage_file()
             
         # If storage file exists, load keys
         try:
             if os.path.exists(storage_file):
-                # In production, use a proper secure storage solution for FIRS compliance
+                # Only re-read the file if it has been written since this
+                # instance last loaded it
+                mtime_ns = os.stat(storage_file).st_mtime_ns
+                if mtime_ns == self._storage_mtime_ns:
+                    return
+                    
                 # This is only for development/testing
                 with open(storage_file, "rb") as f:
                     encrypted_data = f.read()
@@ -158,13 +177,14 @@ class KeyManagementService:
                 
                 if decrypted_data and isinstance(decrypted_data, dict):
                     self._key_registry.update(decrypted_data)
-                    
-            self._loaded_keys = True
-            logger.info("Loaded APP encryption keys from secure storage")
+                    # Stored entries may replace keys decoded earlier
+                    self._decoded_keys.clear()
+                self._storage_mtime_ns = mtime_ns
+                logger.info("Loaded APP encryption keys from secure storage")
                 
-        except Exception as e:
+        except Exception:
             # Log the error but don't crash
-            logger.error(f"Error loading APP keys from storage: {e}")
+            logger.exception("Error loading APP keys from storage")
             
     def _save_keys_to_storage(self):
         """
@@ -173,17 +193,11 @@ class KeyManagementService:
         HashiCorp Vault, or Azure Key Vault for FIRS compliance.
         """
         # Get storage location
-        storage_file = None
-        if hasattr(settings, 'KEY_STORAGE_FILE'):
-            storage_file = settings.KEY_STORAGE_FILE
-            
-        # If environment variable not set, use default location
-        if not storage_file:
-            storage_dir = Path(settings.BASE_DIR) / "keys"
-            os.makedirs(storage_dir, exist_ok=True)
-            storage_file = storage_dir / "key_registry.enc"
+        storage_file = self._get_storage_file()
             
         try:
+            os.makedirs(storage_file.parent, exist_ok=True)
+            
             # In production, use a proper secure storage solution for FIRS compliance
             # This is only for development/testing
             
@@ -200,14 +214,22 @@ class KeyManagementService:
             # Encrypt and save the key registry
             encrypted_data = encrypt_with_gcm(self._key_registry, master_key)
             
-            with open(storage_file, "wb") as f:
-                f.write(encrypted_data)
+            # Write a temp file and swap it in, so concurrent readers never
+            # see a partially written registry
+            fd, tmp_path = tempfile.mkstemp(dir=storage_file.parent, prefix=".key_registry.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encrypted_data.encode())
+                os.replace(tmp_path, storage_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
                 
             logger.info("Saved APP encryption keys to secure storage")
                 
-        except Exception as e:
+        except Exception:
             # Log the error but don't crash
-            logger.error(f"Error saving APP keys to storage: {e}")
+            logger.exception("Error saving APP keys to storage")
     
     def rotate_key(self, organization_id: Optional[UUID] = None) -> str:
         """
@@ -243,9 +265,12 @@ class KeyManagementService:
         
         # Add to registry
         self._key_registry[key_id] = key_entry
+        self._decoded_keys.clear()
+        self._decoded_keys[key_id] = new_key
         
         # Update current key
         self._encryption_key = new_key
+        self._active_key_id = key_id
         
         # Persist changes
         self._save_keys_to_storage()
@@ -294,14 +319,8 @@ class KeyManagementService:
         self._ensure_initialized()
         
         # Determine key to use based on context
-        key_id = None
         key = self.get_current_key()
-        
-        # Find the active key ID
-        for k_id, k_data in self._key_registry.items():
-            if k_data.get("active", False):
-                key_id = k_id
-                break
+        key_id = self._active_key_id
         
         if not key_id:
             raise HTTPException(status_code=500, detail="No active encryption key for APP operations")
@@ -379,11 +398,7 @@ class KeyManagementService:
                 raise HTTPException(status_code=400, detail=f"APP key {key_id} not found")
         else:
             key = self.get_current_key()
-            # Find the key ID for the current key
-            for k_id, k_data in self._key_registry.items():
-                if k_data.get("active", False):
-                    key_id = k_id
-                    break
+            key_id = self._active_key_id
         
         # Encrypt the value
         encrypted = encrypt_with_gcm(value, key)
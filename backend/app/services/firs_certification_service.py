@@ -6,8 +6,11 @@ for certification testing, implementing the complete invoice lifecycle
 using the tested sandbox credentials and endpoints.
 """
 
+import asyncio
 import httpx
 import json
+import threading
+import weakref
 from typing import Dict, Any, Optional, List
 from datetime import datetime, date
 from decimal import Decimal
@@ -42,6 +45,38 @@ class FIRSCertificationService(FIRSService):
         self.supplier_name = "TaxPoynt Certification Test Ltd"  # Test supplier name
         self.supplier_email = "certification@taxpoynt.com"  # Test supplier email
         
+        # Shared HTTP/2 client per event loop, created on first use. Its
+        # connections belong to the loop that opened them, and this singleton
+        # is also driven from loops that schedulers and tasks create.
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._http_lock = threading.Lock()
+        
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared client for the certification sandbox on the running loop.
+        
+        A single HTTP/2 connection multiplexes concurrent validate, sign and
+        download calls instead of opening a new connection per request.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None or client.is_closed:
+            with self._http_lock:
+                client = self._http_clients.get(loop)
+                if client is None or client.is_closed:
+                    client = self._http_clients[loop] = httpx.AsyncClient(
+                        http2=True,
+                        base_url=self.sandbox_base_url,
+                        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+                    )
+        return client
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client of the running loop."""
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        
     def _get_certification_headers(self) -> Dict[str, str]:
         """Get headers for FIRS certification API requests."""
         return {
@@ -58,18 +93,18 @@ class FIRSCertificationService(FIRSService):
     
     async def health_check(self) -> Dict[str, Any]:
         """Check FIRS sandbox API health."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api",
-                    headers=self._get_certification_headers(),
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"FIRS health check failed: {e}")
-                return {"healthy": False, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api",
+                headers=self._get_certification_headers(),
+                timeout=30.0
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"FIRS health check failed: {e}")
+            return {"healthy": False, "error": str(e)}
     
     async def validate_irn(
         self, 
@@ -84,90 +119,90 @@ class FIRSCertificationService(FIRSService):
             "irn": irn
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.sandbox_base_url}/api/v1/invoice/irn/validate",
-                    json=payload,
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"IRN validation failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{self.sandbox_base_url}/api/v1/invoice/irn/validate",
+                json=payload,
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"IRN validation failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def validate_complete_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate complete invoice structure with FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.sandbox_base_url}/api/v1/invoice/validate",
-                    json=invoice_data,
-                    headers=self._get_certification_headers(),
-                    timeout=120.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Invoice validation failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{self.sandbox_base_url}/api/v1/invoice/validate",
+                json=invoice_data,
+                headers=self._get_certification_headers(),
+                timeout=120.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Invoice validation failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def sign_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         """Sign invoice with FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.sandbox_base_url}/api/v1/invoice/sign",
-                    json=invoice_data,
-                    headers=self._get_certification_headers(),
-                    timeout=120.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Invoice signing failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{self.sandbox_base_url}/api/v1/invoice/sign",
+                json=invoice_data,
+                headers=self._get_certification_headers(),
+                timeout=120.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Invoice signing failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def transmit_invoice(self, irn: str) -> Dict[str, Any]:
         """Transmit invoice to FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.sandbox_base_url}/api/v1/invoice/transmit/{irn}",
-                    headers=self._get_certification_headers(),
-                    timeout=120.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Invoice transmission failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{self.sandbox_base_url}/api/v1/invoice/transmit/{irn}",
+                headers=self._get_certification_headers(),
+                timeout=120.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Invoice transmission failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def confirm_invoice(self, irn: str) -> Dict[str, Any]:
         """Confirm invoice receipt from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/confirm/{irn}",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Invoice confirmation failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/confirm/{irn}",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Invoice confirmation failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def download_invoice(self, irn: str) -> Dict[str, Any]:
         """Download invoice from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/download/{irn}",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Invoice download failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/download/{irn}",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Invoice download failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def create_party(self, party_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create party in FIRS."""
@@ -176,120 +211,120 @@ class FIRSCertificationService(FIRSService):
             **party_data
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.sandbox_base_url}/api/v1/invoice/party",
-                    json=party_payload,
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Party creation failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{self.sandbox_base_url}/api/v1/invoice/party",
+                json=party_payload,
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Party creation failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def search_parties(self, page: int = 1, size: int = 10) -> Dict[str, Any]:
         """Search parties for the business."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/party/{self.business_id}",
-                    params={"page": page, "size": size, "sort_by": "created_at", "sort_direction_desc": "true"},
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Party search failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/party/{self.business_id}",
+                params={"page": page, "size": size, "sort_by": "created_at", "sort_direction_desc": "true"},
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Party search failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def verify_tin(self, tin: str) -> Dict[str, Any]:
         """Verify TIN with FIRS."""
         payload = {"tin": tin}
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.sandbox_base_url}/api/v1/utilities/verify-tin/",
-                    json=payload,
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"TIN verification failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{self.sandbox_base_url}/api/v1/utilities/verify-tin/",
+                json=payload,
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"TIN verification failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def get_countries(self) -> Dict[str, Any]:
         """Get list of countries from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/resources/countries",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Countries fetch failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/resources/countries",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Countries fetch failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def get_invoice_types(self) -> Dict[str, Any]:
         """Get list of invoice types from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/resources/invoice-types",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Invoice types fetch failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/resources/invoice-types",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Invoice types fetch failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def get_currencies(self) -> Dict[str, Any]:
         """Get list of currencies from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/resources/currencies",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Currencies fetch failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/resources/currencies",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Currencies fetch failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def get_vat_exemptions(self) -> Dict[str, Any]:
         """Get VAT exemption codes from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/resources/vat-exemptions",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"VAT exemptions fetch failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/resources/vat-exemptions",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"VAT exemptions fetch failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     async def get_service_codes(self) -> Dict[str, Any]:
         """Get service codes from FIRS."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.sandbox_base_url}/api/v1/invoice/resources/services-codes",
-                    headers=self._get_certification_headers(),
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Service codes fetch failed: {e}")
-                return {"code": 500, "error": str(e)}
+        client = self._get_http_client()
+        try:
+            response = await client.get(
+                f"{self.sandbox_base_url}/api/v1/invoice/resources/services-codes",
+                headers=self._get_certification_headers(),
+                timeout=60.0
+            )
+            return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Service codes fetch failed: {e}")
+            return {"code": 500, "error": str(e)}
     
     def build_complete_invoice(
         self,
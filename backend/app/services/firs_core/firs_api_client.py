@@ -13,25 +13,98 @@ This service is part of the firs_core package and provides foundation
 API capabilities for both SI and APP specific services.
 """
 
+import asyncio
+import threading
+import time
+import weakref
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import base64
 import hashlib
-from typing import Dict, Any, Optional, List, Union, Tuple
-from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, Hashable, Mapping, Optional, List, Union, Tuple
+from datetime import datetime, timedelta, timezone
+from aiolimiter import AsyncLimiter
 from fastapi import HTTPException, status
 from pydantic import BaseModel, Field, validator
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 from uuid import UUID, uuid4
 
 from app.core.config import settings
 from app.utils.encryption import encrypt_text, decrypt_text
 from app.utils.logger import get_logger
 from app.models.irn import IRNRecord, IRNValidationRecord, IRNStatus
-from app.services.firs_si.irn_generation_service import create_validation_record
+from app.services.firs_si.irn_generation_service import create_validation_records_bulk
 from app.cache.irn_cache import IRNCache
 
 logger = get_logger(__name__)
 
+# Upstream responses that indicate a transient FIRS failure worth retrying
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Upper bound (seconds) on any single backoff, including server-provided Retry-After
+MAX_RETRY_WAIT = 8.0
+
+_exponential_backoff = wait_random_exponential(multiplier=0.5, max=MAX_RETRY_WAIT)
+
+# Default cap on concurrent sandbox calls in validate_irns_with_firs_sandbox
+SANDBOX_VALIDATION_CONCURRENCY = 50
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _wait_for_retry(retry_state: RetryCallState) -> float:
+    """Honor FIRS Retry-After when present, otherwise back off exponentially with jitter."""
+    outcome = retry_state.outcome
+    if outcome is not None and not outcome.failed:
+        retry_after = _parse_retry_after(outcome.result().headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_WAIT)
+    return _exponential_backoff(retry_state)
+
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    """Log each retry of a FIRS request before backing off."""
+    outcome = retry_state.outcome
+    if outcome.failed:
+        reason = f"{type(outcome.exception()).__name__}: {outcome.exception()}"
+    else:
+        reason = f"HTTP {outcome.result().status_code}"
+    logger.warning(
+        f"FIRS request attempt {retry_state.attempt_number} failed ({reason}); "
+        f"retrying in {retry_state.next_action.sleep:.2f}s"
+    )
+
+
+def _last_outcome(retry_state: RetryCallState) -> requests.Response:
+    """Return the final response (or re-raise the final error) once retries are exhausted."""
+    return retry_state.outcome.result()
+
 
 # Response models for FIRS API
 class FIRSUserData(BaseModel):
@@ -91,6 +164,31 @@ class InvoiceSubmissionResponse(BaseModel):
     details: Optional[Dict[str, Any]] = None
 
 
+class _LoopPrimitives:
+    """
+    Throttling and request-sharing state for one event loop.
+    
+    asyncio primitives and AsyncLimiter bind to the loop that first uses them,
+    so FIRSService keeps one set per running loop (see _loop_primitives).
+    """
+    
+    __slots__ = ("auth_lock", "limiter", "sem", "download_sem", "inflight")
+    
+    def __init__(self):
+        # Makes concurrent callers share one token refresh
+        self.auth_lock = asyncio.Lock()
+        
+        # Client-side throttle so bursts and retries stay under the FIRS quota
+        self.limiter = AsyncLimiter(max_rate=settings.FIRS_RATE_LIMIT_PER_SEC, time_period=1)
+        
+        # Caps on simultaneous in-flight calls; the limiter caps their rate
+        self.sem = asyncio.Semaphore(settings.FIRS_MAX_CONCURRENCY or 32)
+        self.download_sem = asyncio.Semaphore(settings.FIRS_MAX_DOWNLOAD_CONCURRENCY or 4)
+        
+        # Identical requests currently in flight, shared by concurrent callers
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+
+
 class FIRSService:
     """
     Service for interacting with FIRS API.
@@ -146,10 +244,34 @@ class FIRSService:
         # Authentication state
         self.token: Optional[str] = None
         self.token_expiry: Optional[datetime] = None
-        
-        # Session configuration for consistent connection handling
+        # Expiry on the monotonic clock, immune to wall-clock adjustments
+        self._token_expiry_mono: float = 0.0
+        
+        # Credentials from the last successful login, used to refresh the token
+        # shortly before it expires (one refresh per loop, see _LoopPrimitives)
+        self._credentials: Optional[Tuple[str, str]] = None
+        self._refresh_slack = 60.0  # seconds
+        
+        # Header dicts are built once per credential/token and shared read-only
+        self._default_headers: Mapping[str, str] = MappingProxyType({})
+        self._default_headers_for: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._auth_headers: Mapping[str, str] = MappingProxyType({})
+        self._auth_headers_base: Optional[Mapping[str, str]] = None
+        self._auth_headers_token: Optional[str] = None
+        
+        # Pooled session so keep-alive connections are reused across calls.
+        # Headers are passed per request; retries are handled by _send, so the
+        # adapter does not retry on its own.
         self.session = requests.Session()
-        self.session.headers.update(self._get_default_headers())
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Auth lock, limiter, concurrency caps and in-flight requests, per event loop. The
+        # module-level firs_service is also driven from loops that schedulers
+        # and tasks create themselves; entries go away with their loop.
+        self._primitives: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopPrimitives]" = weakref.WeakKeyDictionary()
+        self._primitives_lock = threading.Lock()
         
         # Connection settings
         self.default_timeout = 30  # Default timeout in seconds
@@ -190,23 +312,160 @@ class FIRSService:
             "service_codes": "/api/v1/invoice/resources/service-codes"
         }
         
-    def _get_default_headers(self) -> Dict[str, str]:
-        """Get default headers for API requests."""
-        return {
-            "x-api-key": self.api_key,
-            "x-api-secret": self.api_secret,
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "User-Agent": "TaxPoynt-eInvoice/1.0"
-        }
+    def _loop_primitives(self) -> _LoopPrimitives:
+        """Return the auth lock, limiter, semaphores and in-flight requests for the running loop."""
+        loop = asyncio.get_running_loop()
+        primitives = self._primitives.get(loop)
+        if primitives is None:
+            with self._primitives_lock:
+                primitives = self._primitives.get(loop)
+                if primitives is None:
+                    primitives = self._primitives[loop] = _LoopPrimitives()
+        return primitives
+        
+    def _get_default_headers(self) -> Mapping[str, str]:
+        """Get default headers for API requests.
+        
+        The mapping is read-only and rebuilt only when the API credentials
+        change; copy it before adding request-specific headers.
+        """
+        credentials = (self.api_key, self.api_secret)
+        if self._default_headers_for != credentials:
+            self._default_headers = MappingProxyType({
+                "x-api-key": self.api_key,
+                "x-api-secret": self.api_secret,
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "User-Agent": "TaxPoynt-eInvoice/1.0"
+            })
+            self._default_headers_for = credentials
+        return self._default_headers
     
-    def _get_auth_headers(self) -> Dict[str, str]:
-        """Get headers with auth token for API requests."""
-        headers = self._get_default_headers()
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
-        return headers
+    def _get_auth_headers(self) -> Mapping[str, str]:
+        """Get headers with auth token for API requests (read-only, see above)."""
+        default_headers = self._get_default_headers()
+        if not self.token:
+            return default_headers
+        
+        if self._auth_headers_base is not default_headers or self._auth_headers_token != self.token:
+            self._auth_headers = MappingProxyType({
+                **default_headers,
+                "Authorization": f"Bearer {self.token}"
+            })
+            self._auth_headers_base = default_headers
+            self._auth_headers_token = self.token
+        return self._auth_headers
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a single request to the FIRS API, bounded in concurrency and rate.
+        
+        Args:
+            method: HTTP method
+            url: Fully qualified request URL
+            semaphore: Optional tighter cap for this kind of call, taken in
+                addition to the global concurrency cap
+            **kwargs: Passed through to requests
+            
+        Returns:
+            The HTTP response from the FIRS API
+        """
+        if semaphore is not None:
+            async with semaphore:
+                return await self._request(method, url, **kwargs)
+        
+        if "json" in kwargs:
+            # Serialize with orjson rather than letting requests use stdlib json
+            payload = kwargs.pop("json")
+            kwargs["data"] = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        
+        primitives = self._loop_primitives()
+        async with primitives.sem:
+            async with primitives.limiter:
+                # requests is blocking; run it off the event loop
+                return await asyncio.to_thread(self.session.request, method, url, **kwargs)
+
+    async def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request to the FIRS API, retrying transient failures.
+        
+        Connection errors, timeouts and 429/5xx responses are retried with
+        exponential backoff and jitter, honoring any Retry-After header. Once
+        the attempts are exhausted the last response is returned (or the last
+        connection error raised) so callers keep their existing error handling.
+        
+        Args:
+            method: HTTP method
+            url: Fully qualified request URL
+            **kwargs: Passed through to requests
+            
+        Returns:
+            The HTTP response from the FIRS API
+        """
+        async def attempt() -> requests.Response:
+            return await self._request(method, url, **kwargs)
+        
+        retrying = AsyncRetrying(
+            retry=(
+                retry_if_exception_type((requests.ConnectionError, requests.Timeout))
+                | retry_if_result(lambda response: response.status_code in RETRYABLE_STATUS_CODES)
+            ),
+            wait=_wait_for_retry,
+            stop=stop_after_attempt(max(1, settings.FIRS_RETRY_ATTEMPTS)),
+            before_sleep=_log_retry,
+            retry_error_callback=_last_outcome,
+        )
+        return await retrying(attempt)
         
+    @staticmethod
+    def _json(response: requests.Response) -> Any:
+        """Parse a JSON response body with orjson."""
+        return orjson.loads(response.content)
+    
+    async def _coalesce(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``call`` once for concurrent callers sharing the same ``key``.
+        
+        The first caller performs the request; anyone arriving while it is in
+        flight awaits the same future and receives the same result or exception.
+        
+        Args:
+            key: Identifies the request (method name plus arguments)
+            call: Zero-argument coroutine function performing the request
+            
+        Returns:
+            The result of ``call``
+        """
+        inflight_calls = self._loop_primitives().inflight
+        inflight = inflight_calls.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        inflight_calls[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved so a future nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            inflight_calls.pop(key, None)
+
     def _handle_api_response(self, response: requests.Response, operation_name: str, success_codes: List[int] = None) -> Dict[str, Any]:
         """
         Handle API responses consistently with proper error management.
@@ -241,7 +500,7 @@ class FIRSService:
         if response.content:
             try:
                 if 'application/json' in content_type:
-                    result = response.json()
+                    result = self._json(response)
                 elif response.content.strip().startswith(b'{') and response.content.strip().endswith(b'}'): 
                     # Some APIs return JSON without proper content type
                     try:
@@ -348,10 +607,11 @@ class FIRSService:
                 "password": password
             }
             
-            # Use session for consistency
-            response = self.session.post(
+            response = await self._request(
+                "POST",
                 url, 
                 json=payload,
+                headers=self._get_default_headers(),
                 timeout=self.default_timeout
             )
             
@@ -364,7 +624,7 @@ class FIRSService:
             if response.status_code != 200:
                 logger.error(f"FIRS authentication failed: {response.text}")
                 try:
-                    error_data = response.json()
+                    error_data = self._json(response)
                     error_detail = error_data.get("message", "Authentication failed")
                     error_code = error_data.get("code", response.status_code)
                 except ValueError:
@@ -381,14 +641,14 @@ class FIRSService:
                 )
             
             try:
-                auth_response = response.json()
+                auth_response = self._json(response)
                 
                 # Store token and set expiry
                 self.token = auth_response["data"]["access_token"]
-                self.token_expiry = datetime.now() + timedelta(seconds=auth_response["data"]["expires_in"])
-                
-                # Update session headers with the new token
-                self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+                expires_in = auth_response["data"]["expires_in"]
+                self._token_expiry_mono = time.monotonic() + expires_in
+                self.token_expiry = datetime.now() + timedelta(seconds=expires_in)
+                self._credentials = (email, password)
                 
                 logger.info(f"Successfully authenticated with FIRS API as {email}")
                 logger.info(f"Token will expire at {self.token_expiry.isoformat()}")
@@ -411,78 +671,38 @@ class FIRSService:
                 }
             )
     
+    def _token_valid_for(self, margin: float) -> bool:
+        """Check whether the current token stays valid for at least ``margin`` seconds."""
+        return bool(self.token) and self._token_expiry_mono - time.monotonic() > margin
+    
     async def _ensure_authenticated(self) -> None:
         """Ensure we have a valid authentication token.
         
         This is a helper method and should be used internally before making
-        API calls that require authentication. If no credentials are provided,
-        it will raise an exception.
+        API calls that require authentication. A token that is missing or
+        within the refresh slack of its expiry is renewed with the credentials
+        of the last successful login; only one coroutine performs the refresh.
+        If no credentials are known, it will raise an exception.
         """
-        if not self.token or not self.token_expiry or datetime.now() >= self.token_expiry:
-            # In a production environment, this would attempt to refresh the token
-            # rather than immediately failing
-            logger.warning("Authentication token missing or expired")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="No valid authentication token. Please authenticate first."
-            )
-    
-    async def validate_irn(self, business_id: str, irn: str, invoice_reference: str) -> Dict[str, Any]:
-        """Validate an Invoice Reference Number (IRN).
-        
-        Args:
-            business_id: The business ID of the invoice
-            irn: The IRN to validate
-            invoice_reference: The invoice reference number
-            
-        Returns:
-            Dictionary with validation results
-        """
-        try:
-            await self._ensure_authenticated()
-            
-            url = f"{self.base_url}{self.endpoints['irn_validate']}"
-            
-            payload = {
-                "invoice_reference": invoice_reference,
-                "business_id": business_id,
-                "irn": irn
-            }
-            
-            response = requests.post(
-                url, 
-                json=payload, 
-                headers=self._get_auth_headers()
-            )
-            
-            # Handle response based on status code
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 400:
-                error_data = response.json()
-                error_detail = error_data.get("message", "IRN validation failed")
+        if self._token_valid_for(self._refresh_slack):
+            return
+        
+        async with self._loop_primitives().auth_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._token_valid_for(self._refresh_slack):
+                return
+            
+            if self._credentials is None:
+                if self._token_valid_for(0.0):
+                    return
+                logger.warning("Authentication token missing or expired")
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"FIRS API IRN validation failed: {error_detail}"
-                )
-            elif response.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="IRN not found"
-                )
-            else:
-                logger.error(f"IRN validation failed: {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="FIRS API IRN validation failed with unexpected status code"
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="No valid authentication token. Please authenticate first."
                 )
             
-        except requests.RequestException as e:
-            logger.error(f"FIRS API request failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"FIRS API service unavailable: {str(e)}"
-            )
+            logger.info("FIRS authentication token missing or about to expire, refreshing")
+            await self.authenticate(*self._credentials)
     
     async def validate_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate an invoice against FIRS rules.
@@ -498,7 +718,8 @@ class FIRSService:
             
             url = f"{self.base_url}/api/v1/invoice/validate"
             
-            response = requests.post(
+            response = await self._send(
+                "POST",
                 url, 
                 json=invoice_data, 
                 headers=self._get_auth_headers()
@@ -506,9 +727,9 @@ class FIRSService:
             
             # Handle response based on status code
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 400:
-                error_data = response.json()
+                error_data = self._json(response)
                 error_detail = error_data.get("message", "Invoice validation failed")
                 # Return the validation errors to provide details to the client
                 raise HTTPException(
@@ -549,7 +770,8 @@ class FIRSService:
             
             url = f"{self.base_url}/api/v1/invoice/sign"
             
-            response = requests.post(
+            response = await self._send(
+                "POST",
                 url, 
                 json=invoice_data, 
                 headers=self._get_auth_headers()
@@ -557,9 +779,9 @@ class FIRSService:
             
             # Handle response based on status code
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 400:
-                error_data = response.json()
+                error_data = self._json(response)
                 error_detail = error_data.get("message", "Invoice signing failed")
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -585,6 +807,8 @@ class FIRSService:
     async def download_invoice(self, irn: str) -> Dict[str, Any]:
         """Download a signed invoice PDF from FIRS API.
         
+        Concurrent downloads of the same IRN share a single request.
+        
         Args:
             irn: Invoice Reference Number (IRN) as path parameter
             
@@ -594,19 +818,25 @@ class FIRSService:
         Raises:
             HTTPException: If the download fails
         """
+        return await self._coalesce(("download_invoice", irn), lambda: self._download_invoice(irn))
+    
+    async def _download_invoice(self, irn: str) -> Dict[str, Any]:
+        """Fetch a signed invoice PDF from FIRS API (see download_invoice)."""
         try:
             await self._ensure_authenticated()
             
             url = f"{self.base_url}{self.endpoints['download_invoice'].replace('{IRN}', irn)}"
             
-            response = requests.get(
+            response = await self._send(
+                "GET",
                 url, 
+                semaphore=self._loop_primitives().download_sem,
                 headers=self._get_auth_headers(),
                 timeout=60  # Longer timeout for potentially large PDF downloads
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 404:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -626,6 +856,70 @@ class FIRSService:
                 detail=f"FIRS API service unavailable: {str(e)}"
             )
     
+    async def stream_invoice(self, irn: str, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """Open a signed invoice download from FIRS API as a byte stream.
+        
+        Unlike download_invoice the body is never held in memory as a whole;
+        chunks are read off the socket in a worker thread as they are consumed.
+        
+        Args:
+            irn: Invoice Reference Number (IRN) as path parameter
+            chunk_size: Size of the chunks yielded by the stream
+            
+        Returns:
+            Async iterator over the raw response body
+            
+        Raises:
+            HTTPException: If the download fails
+        """
+        try:
+            await self._ensure_authenticated()
+            
+            url = f"{self.base_url}{self.endpoints['download_invoice'].replace('{IRN}', irn)}"
+            
+            response = await self._send(
+                "GET",
+                url, 
+                semaphore=self._loop_primitives().download_sem,
+                headers=self._get_auth_headers(),
+                timeout=60,
+                stream=True
+            )
+        except requests.RequestException as e:
+            logger.error(f"FIRS API request failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"FIRS API service unavailable: {str(e)}"
+            )
+        
+        if response.status_code != 200:
+            response.close()
+            if response.status_code == 404:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Invoice with IRN {irn} not found"
+                )
+            logger.error(f"Invoice download failed with status {response.status_code}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="FIRS API invoice download failed"
+            )
+        
+        return self._iter_body(response, chunk_size)
+    
+    @staticmethod
+    async def _iter_body(response: requests.Response, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield a streamed response body without blocking the event loop."""
+        chunks = response.iter_content(chunk_size)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            response.close()
+    
     async def check_health(self) -> Dict[str, Any]:
         """Check the health status of the FIRS API.
         
@@ -638,14 +932,15 @@ class FIRSService:
         try:
             url = f"{self.base_url}{self.endpoints['health_check']}"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url,
                 headers=self._get_default_headers(),
                 timeout=15
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             else:
                 logger.error(f"Health check failed: {response.text}")
                 raise HTTPException(
@@ -677,14 +972,15 @@ class FIRSService:
             
             url = f"{self.base_url}{self.endpoints['entity_get'].replace('{ENTITY_ID}', entity_id)}"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_auth_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 404:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -731,14 +1027,15 @@ class FIRSService:
                 query_params = "&".join([f"{key}={value}" for key, value in search_params.items()])
                 url = f"{url}?{query_params}"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_auth_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             else:
                 logger.error(f"Entity search failed: {response.text}")
                 raise HTTPException(
@@ -770,7 +1067,8 @@ class FIRSService:
             
             url = f"{self.base_url}{self.endpoints['create_party']}"
             
-            response = requests.post(
+            response = await self._request(
+                "POST",
                 url, 
                 json=party_data, 
                 headers=self._get_auth_headers(),
@@ -778,9 +1076,9 @@ class FIRSService:
             )
             
             if response.status_code == 200 or response.status_code == 201:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 400:
-                error_data = response.json()
+                error_data = self._json(response)
                 error_detail = error_data.get("message", "Party creation failed")
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -820,14 +1118,15 @@ class FIRSService:
             
             url = f"{self.base_url}{self.endpoints['get_party'].replace('{PARTY_ID}', party_id)}"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_auth_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 404:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -864,14 +1163,15 @@ class FIRSService:
             
             url = f"{self.base_url}{self.endpoints['confirm_invoice'].replace('{IRN}', irn)}"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_auth_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 404:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -921,14 +1221,15 @@ class FIRSService:
                 query_params = "&".join([f"{key}={value}" for key, value in search_params.items()])
                 url = f"{url}?{query_params}"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_auth_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             else:
                 logger.error(f"Invoice search failed: {response.text}")
                 raise HTTPException(
@@ -961,7 +1262,8 @@ class FIRSService:
             
             url = f"{self.base_url}{self.endpoints['update_invoice'].replace('{IRN}', irn)}"
             
-            response = requests.patch(
+            response = await self._request(
+                "PATCH",
                 url, 
                 json=invoice_data, 
                 headers=self._get_auth_headers(),
@@ -969,9 +1271,9 @@ class FIRSService:
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._json(response)
             elif response.status_code == 400:
-                error_data = response.json()
+                error_data = self._json(response)
                 error_detail = error_data.get("message", "Invoice update failed")
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -1005,10 +1307,10 @@ class FIRSService:
         """Get list of countries from FIRS API."""
         try:
             url = f"{self.base_url}/api/v1/invoice/resources/countries"
-            response = requests.get(url)
+            response = await self._request("GET", url)
             
             if response.status_code == 200:
-                result = response.json()
+                result = self._json(response)
                 return result.get("data", [])
             else:
                 logger.error(f"Countries fetch failed: {response.text}")
@@ -1017,30 +1319,14 @@ class FIRSService:
             logger.error(f"FIRS API request failed: {str(e)}")
             return []
     
-    async def get_currencies(self) -> List[FIRSResourceItem]:
-        """Get list of currencies from FIRS API."""
-        try:
-            url = f"{self.base_url}/api/v1/invoice/resources/currencies"
-            response = requests.get(url)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("data", [])
-            else:
-                logger.error(f"Currencies fetch failed: {response.text}")
-                return []
-        except requests.RequestException as e:
-            logger.error(f"FIRS API request failed: {str(e)}")
-            return []
-    
     async def get_tax_categories(self) -> List[FIRSTaxCategory]:
         """Get list of tax categories from FIRS API."""
         try:
             url = f"{self.base_url}/api/v1/invoice/resources/tax-categories"
-            response = requests.get(url)
+            response = await self._request("GET", url)
             
             if response.status_code == 200:
-                result = response.json()
+                result = self._json(response)
                 return result.get("data", [])
             else:
                 logger.error(f"Tax categories fetch failed: {response.text}")
@@ -1053,10 +1339,10 @@ class FIRSService:
         """Get list of payment means from FIRS API."""
         try:
             url = f"{self.base_url}/api/v1/invoice/resources/payment-means"
-            response = requests.get(url)
+            response = await self._request("GET", url)
             
             if response.status_code == 200:
-                result = response.json()
+                result = self._json(response)
                 return result.get("data", [])
             else:
                 logger.error(f"Payment means fetch failed: {response.text}")
@@ -1065,22 +1351,6 @@ class FIRSService:
             logger.error(f"FIRS API request failed: {str(e)}")
             return []
     
-    async def get_invoice_types(self) -> List[FIRSCodeResourceItem]:
-        """Get list of invoice types from FIRS API."""
-        try:
-            url = f"{self.base_url}/api/v1/invoice/resources/invoice-types"
-            response = requests.get(url)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("data", [])
-            else:
-                logger.error(f"Invoice types fetch failed: {response.text}")
-                return []
-        except requests.RequestException as e:
-            logger.error(f"FIRS API request failed: {str(e)}")
-            return []
-    
     # === Invoice Submission Endpoints ===
     
     async def submit_invoice(self, invoice_data: Dict[str, Any]) -> InvoiceSubmissionResponse:
@@ -1141,7 +1411,8 @@ class FIRSService:
             # Submit the invoice with comprehensive error handling
             try:
                 # Use session for consistent connection handling
-                response = self.session.post(
+                response = await self._request(
+                    "POST",
                     url, 
                     json=invoice_data, 
                     headers=headers,
@@ -1163,7 +1434,7 @@ class FIRSService:
                     content_type = response.headers.get('content-type', '')
                     if 'application/json' in content_type:
                         try:
-                            result = response.json()
+                            result = self._json(response)
                         except ValueError as json_err:
                             logger.warning(f"Could not parse JSON response: {str(json_err)}")
                             result = {"message": f"Invalid JSON response: {response.text[:200]}"}
@@ -1314,7 +1585,8 @@ class FIRSService:
             # Submit the batch
             try:
                 logger.info(f"Submitting batch to {url}")
-                response = requests.post(
+                response = await self._request(
+                    "POST",
                     url, 
                     json=payload, 
                     headers=self._get_auth_headers(),
@@ -1325,7 +1597,7 @@ class FIRSService:
                 result = {}
                 if response.content:
                     try:
-                        result = response.json()
+                        result = self._json(response)
                     except ValueError as json_err:
                         logger.warning(f"Could not parse JSON response: {str(json_err)}")
                         result = {"message": f"Invalid response format: {response.text[:200]}"}
@@ -1379,6 +1651,8 @@ class FIRSService:
         """
         Validate an IRN with the FIRS API.
         
+        Concurrent validations of the same IRN share a single request.
+        
         Args:
             invoice_reference: The reference number of the invoice
             business_id: The business ID that issued the invoice
@@ -1387,6 +1661,11 @@ class FIRSService:
         Returns:
             Dictionary with validation result
         """
+        key = ("validate_irn", invoice_reference, business_id, irn_value)
+        return await self._coalesce(key, lambda: self._validate_irn(invoice_reference, business_id, irn_value))
+    
+    async def _validate_irn(self, invoice_reference: str, business_id: str, irn_value: str) -> Dict[str, Any]:
+        """Validate an IRN with the FIRS API (see validate_irn)."""
         try:
             # Skip authentication for IRN validation as it uses API key/secret
             # This aligns with our test findings that showed API key authentication works
@@ -1418,7 +1697,8 @@ class FIRSService:
                 "signature": signature
             }
                 
-            response = requests.post(
+            response = await self._send(
+                "POST",
                 url, 
                 json=payload, 
                 headers=self._get_default_headers(),  # Use API key auth for IRN validation
@@ -1430,7 +1710,7 @@ class FIRSService:
                 error_data = {}
                 try:
                     if response.content:
-                        error_data = response.json()
+                        error_data = self._json(response)
                 except ValueError:
                     error_data = {"message": f"Error parsing response: {response.text[:200]}"}
                 
@@ -1445,7 +1725,7 @@ class FIRSService:
             result = {}
             try:
                 if response.content:
-                    result = response.json()
+                    result = self._json(response)
                     
                 # Record the validation in our system
                 validation_record = {
@@ -1590,7 +1870,8 @@ class FIRSService:
             logger.info(f"Checking submission status for ID: {submission_id} at {url}")
             
             # Make the request with session for consistency
-            response = self.session.get(
+            response = await self._request(
+                "GET",
                 url,
                 headers=self._get_auth_headers(),
                 timeout=self.default_timeout
@@ -1606,7 +1887,7 @@ class FIRSService:
             if response.status_code == 200:
                 # Successfully retrieved status
                 try:
-                    result = response.json()
+                    result = self._json(response)
                     status_data = result.get("data", {})
                     
                     # Extract status information
@@ -1741,13 +2022,14 @@ class FIRSService:
             
             url = f"{self.base_url}/api/v1/invoice/submission/{submission_id}/status"
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url,
                 headers=self._get_auth_headers()
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = self._json(response)
                 data = result.get("data", {})
                 
                 return SubmissionStatus(
@@ -1793,7 +2075,8 @@ class FIRSService:
             url = f"{self.base_url}{self.endpoints['currencies']}"
             logger.info(f"Fetching currencies from FIRS API: {url}")
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_default_headers(),
                 timeout=30
@@ -1807,7 +2090,7 @@ class FIRSService:
                 )
                 
             try:
-                result = response.json()
+                result = self._json(response)
                 currencies = result.get("data", [])
                 logger.info(f"Retrieved {len(currencies)} currencies from FIRS API")
                 
@@ -1858,7 +2141,8 @@ class FIRSService:
             url = f"{self.base_url}{self.endpoints['invoice_types']}"
             logger.info(f"Fetching invoice types from FIRS API: {url}")
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_default_headers(),
                 timeout=30
@@ -1872,7 +2156,7 @@ class FIRSService:
                 )
                 
             try:
-                result = response.json()
+                result = self._json(response)
                 invoice_types = result.get("data", [])
                 logger.info(f"Retrieved {len(invoice_types)} invoice types from FIRS API")
                 
@@ -1923,7 +2207,8 @@ class FIRSService:
             url = f"{self.base_url}{self.endpoints['vat_exemptions']}"
             logger.info(f"Fetching VAT exemptions from FIRS API: {url}")
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_default_headers(),
                 timeout=30
@@ -1937,7 +2222,7 @@ class FIRSService:
                 )
                 
             try:
-                result = response.json()
+                result = self._json(response)
                 vat_exemptions = result.get("data", [])
                 logger.info(f"Retrieved {len(vat_exemptions)} VAT exemptions from FIRS API")
                 
@@ -1988,7 +2273,8 @@ class FIRSService:
             url = f"{self.base_url}{self.endpoints['service_codes']}"
             logger.info(f"Fetching service codes from FIRS API: {url}")
             
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 url, 
                 headers=self._get_default_headers(),
                 timeout=30
@@ -2002,7 +2288,7 @@ class FIRSService:
                 )
                 
             try:
-                result = response.json()
+                result = self._json(response)
                 service_codes = result.get("data", [])
                 logger.info(f"Retrieved {len(service_codes)} service codes from FIRS API")
                 
@@ -2057,8 +2343,10 @@ class FIRSService:
             }
             
             # Add custom headers for UBL submission
-            headers = self._get_auth_headers()
-            headers["Content-Type"] = "application/xml"  # Override for XML content
+            headers = {
+                **self._get_auth_headers(),
+                "Content-Type": "application/xml"  # Override for XML content
+            }
             
             invoice_type_code = invoice_type_codes.get(invoice_type, "380")
             headers["X-FIRS-InvoiceType"] = invoice_type_code
@@ -2070,10 +2358,10 @@ class FIRSService:
             headers["X-FIRS-SubmissionID"] = submission_id
             
             # Submit the XML directly
-            response = requests.post(url, headers=headers, data=ubl_xml)
+            response = await self._request("POST", url, headers=headers, data=ubl_xml)
             
             if response.status_code in (200, 201, 202):
-                result = response.json() if response.content else {"message": "UBL invoice submitted successfully"}
+                result = self._json(response) if response.content else {"message": "UBL invoice submitted successfully"}
                 return InvoiceSubmissionResponse(
                     success=True,
                     message=result.get("message", "UBL invoice submitted successfully"),
@@ -2082,7 +2370,7 @@ class FIRSService:
                     details=result.get("data", {})
                 )
             else:
-                error_data = response.json() if response.content else {"message": "Unknown error"}
+                error_data = self._json(response) if response.content else {"message": "Unknown error"}
                 logger.error(f"FIRS UBL submission failed: {response.status_code} - {response.text}")
                 
                 return InvoiceSubmissionResponse(
@@ -2117,21 +2405,20 @@ class FIRSService:
             
             url = f"{self.base_url}/api/v1/invoice/ubl/validate"
             
-            headers = self._get_auth_headers()
-            headers["Content-Type"] = "application/xml"
+            headers = {**self._get_auth_headers(), "Content-Type": "application/xml"}
             
             # Submit the XML directly
-            response = requests.post(url, headers=headers, data=ubl_xml)
+            response = await self._request("POST", url, headers=headers, data=ubl_xml)
             
             if response.status_code == 200:
-                result = response.json() if response.content else {"message": "UBL invoice is valid"}
+                result = self._json(response) if response.content else {"message": "UBL invoice is valid"}
                 return InvoiceSubmissionResponse(
                     success=True,
                     message=result.get("message", "UBL invoice validation successful"),
                     details=result.get("data", {})
                 )
             else:
-                error_data = response.json() if response.content else {"message": "Unknown error"}
+                error_data = self._json(response) if response.content else {"message": "Unknown error"}
                 logger.error(f"FIRS UBL validation failed: {response.status_code} - {response.text}")
                 
                 # Special handling for validation errors
@@ -2159,14 +2446,24 @@ class FIRSService:
             )
 
 
-async def validate_irns_with_firs_sandbox(db, irn_values: List[str], user_id: Optional[UUID] = None) -> Dict[str, Any]:
+async def validate_irns_with_firs_sandbox(
+    db,
+    irn_values: List[str],
+    user_id: Optional[UUID] = None,
+    max_concurrency: int = SANDBOX_VALIDATION_CONCURRENCY
+) -> Dict[str, Any]:
     """
     Validate a batch of IRNs with the FIRS sandbox API.
     
+    The sandbox calls run concurrently, at most ``max_concurrency`` at a time;
+    the IRN records are loaded with one query and the validation records are
+    written with one insert once every call has finished.
+    
     Args:
         db: Database session
         irn_values: List of IRNs to validate
         user_id: ID of the user requesting validation
+        max_concurrency: Maximum number of sandbox calls in flight
         
     Returns:
         Dictionary with validation results
@@ -2176,54 +2473,58 @@ async def validate_irns_with_firs_sandbox(db, irn_values: List[str], user_id: Op
     # Create FIRS service instance
     firs_service = FIRSService()
     
-    results = []
-    for irn_value in irn_values:
+    irn_records = {
+        record.irn: record
+        for record in db.query(IRNRecord).filter(IRNRecord.irn.in_(irn_values)).all()
+    }
+    
+    sem = asyncio.Semaphore(max_concurrency)
+    validation_records: List[Dict[str, Any]] = []
+    
+    async def validate_one(irn_value: str) -> Dict[str, Any]:
         try:
-            # Get IRN record if it exists
-            irn_record = db.query(IRNRecord).filter(IRNRecord.irn == irn_value).first()
-            
-            # Validate with FIRS sandbox
-            validation_result = await firs_service.validate_irn_sandbox(irn_value)
+            async with sem:
+                validation_result = await firs_service.validate_irn_sandbox(irn_value)
             
             # Record validation in database if IRN exists
+            irn_record = irn_records.get(irn_value)
             if irn_record:
-                validation_record = create_validation_record(
-                    db=db,
-                    irn_id=irn_value,
-                    is_valid=validation_result["success"],
-                    message=validation_result["message"],
-                    validated_by=str(user_id) if user_id else None,
-                    validation_source="firs_sandbox",
-                    request_data={"irn": irn_value},
-                    response_data=validation_result["details"]
-                )
-            
-            # Add IRN record details if available
-            if irn_record:
+                validation_records.append({
+                    "irn": irn_value,
+                    "validation_status": validation_result["success"],
+                    "validation_message": validation_result["message"],
+                    "validated_by": str(user_id) if user_id else None,
+                    "validation_source": "firs_sandbox",
+                    "request_data": {"irn": irn_value},
+                    "response_data": dict(validation_result["details"])
+                })
+                
+                # Add IRN record details
                 validation_result["details"]["irn_record"] = {
                     "invoice_number": irn_record.invoice_number,
                     "status": irn_record.status.value,
                     "valid_until": irn_record.valid_until.isoformat()
                 }
             
-            results.append({
+            return {
                 "irn": irn_value,
                 "success": validation_result["success"],
                 "message": validation_result["message"],
                 "details": validation_result["details"]
-            })
+            }
             
         except Exception as e:
             logger.error(f"Error validating IRN {irn_value} with FIRS sandbox: {str(e)}")
-            results.append({
+            return {
                 "irn": irn_value,
                 "success": False,
                 "message": f"Error during validation: {str(e)}",
                 "details": {"error_type": type(e).__name__}
-            })
+            }
+    
+    results = await asyncio.gather(*(validate_one(irn_value) for irn_value in irn_values))
     
-    # Commit database changes
-    db.commit()
+    create_validation_records_bulk(db, validation_records)
     
     return {
         "source": "firs_sandbox",
@@ -13,12 +13,14 @@ Core FIRS Responsibilities:
 - Core system health monitoring and FIRS service availability metrics
 """
 
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple, Union
 from uuid import uuid4
-from sqlalchemy import func, desc, and_, or_, text
-from sqlalchemy.orm import Session
+from sqlalchemy import case, cast, func, desc, and_, or_, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Query, Session
 
 from app.models.irn import IRNRecord, IRNValidationRecord, IRNStatus
 from app.models.validation import ValidationRecord
@@ -32,6 +34,168 @@ from app.models.transmission_status_log import TransmissionStatusLog
 
 logger = logging.getLogger(__name__)
 
+# Status keys reported in IRN metrics. "used" and "cancelled" are not IRNStatus
+# members but are part of the dashboard payload, so they are always reported.
+IRN_METRIC_STATUSES = tuple(status.value for status in IRNStatus) + ("used", "cancelled")
+
+
+# Look-back window of each dashboard time range; "all" has no lower bound
+_TIME_DELTAS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30)
+}
+
+
+def _time_threshold(now: datetime, time_range: str) -> datetime:
+    """Start of the ``time_range`` window ending at ``now``."""
+    delta = _TIME_DELTAS.get(time_range)
+    return now - delta if delta is not None else datetime.min
+
+
+def _hour_buckets(now: datetime, hours: int = 24) -> List[Tuple[datetime, datetime]]:
+    """Return the [start, end) ranges of the past ``hours`` hours, newest first."""
+    return [
+        (now - timedelta(hours=offset + 1), now - timedelta(hours=offset))
+        for offset in range(hours)
+    ]
+
+
+def _day_buckets(now: datetime, days: int = 30) -> List[Tuple[datetime, datetime]]:
+    """Return the [start, end) ranges of the past ``days`` whole days, newest first."""
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        (midnight - timedelta(days=offset + 1), midnight - timedelta(days=offset))
+        for offset in range(days)
+    ]
+
+
+def _bucket_totals(
+    db: Session,
+    query: Query,
+    column: Any,
+    buckets: List[Tuple[datetime, datetime]],
+    *sum_columns: Any
+) -> List[Tuple[int, ...]]:
+    """
+    Aggregate ``query`` over contiguous time buckets with a single GROUP BY.
+    
+    Each row is assigned the index of the first bucket (newest first) whose
+    start it is not before, so one statement replaces a COUNT per bucket.
+    
+    Args:
+        db: Database session
+        query: Filtered query to aggregate
+        column: Timestamp column the buckets apply to
+        buckets: Contiguous [start, end) ranges, newest first
+        sum_columns: Expressions to sum per bucket alongside the row count
+        
+    Returns:
+        For each bucket, the row count followed by each column's sum
+    """
+    bucket = case(
+        *((column >= start, index) for index, (start, _) in enumerate(buckets))
+    ).label("bucket")
+    values = [expr.label(f"value_{i}") for i, expr in enumerate(sum_columns)]
+    
+    windowed = query.filter(column >= buckets[-1][0], column < buckets[0][1])
+    rows_per_bucket = windowed.with_entities(bucket, *values).subquery()
+    
+    grouped = db.query(
+        rows_per_bucket.c.bucket,
+        func.count(),
+        *(func.coalesce(func.sum(rows_per_bucket.c[value.name]), 0) for value in values)
+    ).group_by(rows_per_bucket.c.bucket).all()
+    
+    totals = [(0,) * (len(values) + 1) for _ in buckets]
+    for index, *aggregates in grouped:
+        totals[index] = tuple(int(aggregate) for aggregate in aggregates)
+    return totals
+
+
+def _is_postgresql(db: Session) -> bool:
+    """Whether the session is bound to a PostgreSQL database."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _common_error_counts(
+    db: Session,
+    failed_query: Query,
+    issues_column: Any,
+    time_column: Any,
+    sample_size: int = 100,
+    limit: int = 10
+) -> List[Tuple[str, int]]:
+    """
+    Count error codes across the issues of the most recent failed validations.
+    
+    On PostgreSQL the issues arrays are unnested with jsonb_array_elements and
+    grouped in the database, so only the top ``limit`` codes are returned.
+    Other dialects parse the sampled issues in Python.
+    """
+    recent = failed_query.with_entities(issues_column.label("issues")).order_by(
+        desc(time_column)
+    ).limit(sample_size)
+    
+    if _is_postgresql(db):
+        sample = recent.subquery()
+        issues = cast(sample.c.issues, JSONB)
+        elements = select(func.jsonb_array_elements(issues).label("issue")).where(
+            func.jsonb_typeof(issues) == "array"
+        ).subquery()
+        error_code = func.coalesce(elements.c.issue.op("->>")("error_code"), "unknown").label("error_code")
+        error_count = func.count().label("error_count")
+        statement = select(error_code, error_count).group_by(error_code).order_by(
+            desc(error_count)
+        ).limit(limit)
+        return [(code, int(count)) for code, count in db.execute(statement).all()]
+    
+    error_counts: Dict[str, int] = {}
+    for (issues,) in recent.all():
+        if isinstance(issues, str):
+            # If stored as string, try to parse
+            try:
+                issues = json.loads(issues)
+            except ValueError:
+                issues = []
+        for issue in issues or []:
+            error_type = issue.get("error_code", "unknown")
+            error_counts[error_type] = error_counts.get(error_type, 0) + 1
+    return sorted(error_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def _latest_rows(
+    db: Session,
+    key_column: Any,
+    time_column: Any,
+    keys: List[Any],
+    *columns: Any
+) -> Dict[Any, Tuple[Any, ...]]:
+    """
+    Most recent values of ``columns`` for each key, fetched in one query.
+    
+    Rows are ranked per key with ROW_NUMBER() ordered by ``time_column``, which
+    works on both PostgreSQL and SQLite. Keys without rows are left out.
+    """
+    if not keys:
+        return {}
+    
+    ranked = db.query(
+        key_column.label("key"),
+        *(column.label(f"value_{index}") for index, column in enumerate(columns)),
+        func.row_number().over(
+            partition_by=key_column,
+            order_by=desc(time_column)
+        ).label("row_number")
+    ).filter(key_column.in_(keys)).subquery()
+    
+    rows = db.query(
+        ranked.c.key,
+        *(ranked.c[f"value_{index}"] for index in range(len(columns)))
+    ).filter(ranked.c.row_number == 1).all()
+    return {key: tuple(values) for key, *values in rows}
+
+
 # Core FIRS metrics configuration
 CORE_METRICS_SERVICE_VERSION = "1.0"
 DEFAULT_METRICS_CACHE_DURATION_MINUTES = 15
@@ -198,14 +362,7 @@ class MetricsService:
         try:
             # Calculate time threshold based on time_range
             now = datetime.utcnow()
-            if time_range == "24h":
-                time_threshold = now - timedelta(hours=24)
-            elif time_range == "7d":
-                time_threshold = now - timedelta(days=7)
-            elif time_range == "30d":
-                time_threshold = now - timedelta(days=30)
-            else:
-                time_threshold = datetime.min  # All time
+            time_threshold = _time_threshold(now, time_range)
                 
             # Base query
             query = db.query(IRNRecord)
@@ -221,16 +378,16 @@ class MetricsService:
                     IRNRecord.integration_id == Integration.id.cast(str)
                 ).filter(Integration.organization_id == organization_id)
             
-            # Get total count
-            total_count = query.count()
-            
-            # Get count by status with FIRS compliance tracking
+            # Count by status in one grouped query; the total is their sum
+            status_rows = (
+                query.with_entities(IRNRecord.status, func.count())
+                .group_by(IRNRecord.status)
+                .all()
+            )
+            counts_by_status = {getattr(status, "value", status): count for status, count in status_rows}
+            total_count = sum(counts_by_status.values())
             status_counts = {
-                "unused": query.filter(IRNRecord.status == IRNStatus.UNUSED.value).count(),
-                "active": query.filter(IRNRecord.status == IRNStatus.ACTIVE.value).count(),
-                "used": query.filter(IRNRecord.status == IRNStatus.USED.value).count(),
-                "expired": query.filter(IRNRecord.status == IRNStatus.EXPIRED.value).count(),
-                "cancelled": query.filter(IRNRecord.status == IRNStatus.CANCELLED.value).count()
+                status: counts_by_status.get(status, 0) for status in IRN_METRIC_STATUSES
             }
             
             # Calculate FIRS compliance metrics
@@ -244,17 +401,9 @@ class MetricsService:
             
             # Get generation rate (per hour) over time with performance tracking
             hourly_generation = []
-            for hour_offset in range(24):
-                hour_start = now - timedelta(hours=hour_offset + 1)
-                hour_end = now - timedelta(hours=hour_offset)
-                
-                hour_query = query.filter(
-                    IRNRecord.generated_at >= hour_start,
-                    IRNRecord.generated_at < hour_end
-                )
-                
-                hour_count = hour_query.count()
-                
+            hour_buckets = _hour_buckets(now)
+            hourly_totals = _bucket_totals(db, query, IRNRecord.generated_at, hour_buckets)
+            for hour_offset, ((_, hour_end), (hour_count,)) in enumerate(zip(hour_buckets, hourly_totals)):
                 hourly_generation.append({
                     "hour": hour_offset,
                     "timestamp": hour_end.isoformat(),
@@ -264,21 +413,9 @@ class MetricsService:
                 
             # Get daily generation for the past 30 days with trend analysis
             daily_generation = []
-            for day_offset in range(30):
-                day_start = (now - timedelta(days=day_offset + 1)).replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                day_end = (now - timedelta(days=day_offset)).replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                
-                day_query = query.filter(
-                    IRNRecord.generated_at >= day_start,
-                    IRNRecord.generated_at < day_end
-                )
-                
-                day_count = day_query.count()
-                
+            day_buckets = _day_buckets(now)
+            daily_totals = _bucket_totals(db, query, IRNRecord.generated_at, day_buckets)
+            for day_offset, ((_, day_end), (day_count,)) in enumerate(zip(day_buckets, daily_totals)):
                 daily_generation.append({
                     "day": day_offset,
                     "date": day_end.date().isoformat(),
@@ -369,14 +506,7 @@ class MetricsService:
         try:
             # Calculate time threshold based on time_range
             now = datetime.utcnow()
-            if time_range == "24h":
-                time_threshold = now - timedelta(hours=24)
-            elif time_range == "7d":
-                time_threshold = now - timedelta(days=7)
-            elif time_range == "30d":
-                time_threshold = now - timedelta(days=30)
-            else:
-                time_threshold = datetime.min  # All time
+            time_threshold = _time_threshold(now, time_range)
             
             # Base query for validation records
             query = db.query(ValidationRecord)
@@ -391,12 +521,15 @@ class MetricsService:
                     ValidationRecord.integration_id == Integration.id
                 ).filter(Integration.organization_id == organization_id)
             
-            # Get total count
-            total_count = query.count()
-            
-            # Get validation success vs. failure with FIRS compliance tracking
-            success_count = query.filter(ValidationRecord.is_valid == True).count()
-            failure_count = query.filter(ValidationRecord.is_valid == False).count()
+            # Get total and success vs. failure counts with FIRS compliance tracking in one row
+            total_count, success_count = (
+                int(value or 0)
+                for value in query.with_entities(
+                    func.count(),
+                    func.sum(case((ValidationRecord.is_valid == True, 1), else_=0))
+                ).one()
+            )
+            failure_count = total_count - success_count
             
             # Calculate success rate with FIRS compliance thresholds
             success_rate = (success_count / total_count * 100) if total_count > 0 else 0
@@ -419,43 +552,33 @@ class MetricsService:
             # Get common validation errors with enhanced analysis
             common_errors = []
             try:
-                failed_validations = query.filter(
-                    ValidationRecord.is_valid == False
-                ).order_by(desc(ValidationRecord.validation_time)).limit(100).all()
-                
-                # Extract and count error types with FIRS categorization
-                error_counts = {}
-                firs_specific_errors = {}
+                # Error codes are counted over the 100 most recent failures
+                sample_count = min(failure_count, 100)
+                error_counts = _common_error_counts(
+                    db,
+                    query.filter(ValidationRecord.is_valid == False),
+                    ValidationRecord.issues,
+                    ValidationRecord.validation_time
+                )
                 
-                for validation in failed_validations:
-                    issues = validation.issues or []
-                    if isinstance(issues, str):
-                        import json
-                        try:
-                            issues = json.loads(issues)
-                        except:
-                            issues = []
-                            
-                    for issue in issues:
-                        error_type = issue.get("error_code", "unknown")
-                        error_counts[error_type] = error_counts.get(error_type, 0) + 1
-                        
-                        # Categorize FIRS-specific errors
-                        if any(firs_keyword in error_type.lower() for firs_keyword in 
-                               ["firs", "tax", "irn", "invoice", "validation"]):
-                            firs_specific_errors[error_type] = firs_specific_errors.get(error_type, 0) + 1
+                # Categorize FIRS-specific errors
+                firs_specific_errors = {
+                    code for code, _ in error_counts
+                    if any(firs_keyword in code.lower() for firs_keyword in
+                           ["firs", "tax", "irn", "invoice", "validation"])
+                }
                 
                 # Convert to sorted list with FIRS impact analysis
                 common_errors = [
                     {
                         "error_code": code, 
                         "count": count, 
-                        "percentage": (count / len(failed_validations) * 100) if len(failed_validations) > 0 else 0,
+                        "percentage": (count / sample_count * 100) if sample_count > 0 else 0,
                         "firs_related": code in firs_specific_errors,
-                        "impact_level": "high" if count > len(failed_validations) * 0.3 else "medium" if count > len(failed_validations) * 0.1 else "low"
+                        "impact_level": "high" if count > sample_count * 0.3 else "medium" if count > sample_count * 0.1 else "low"
                     }
-                    for code, count in sorted(error_counts.items(), key=lambda x: x[1], reverse=True)
-                ][:10]  # Top 10 errors
+                    for code, count in error_counts
+                ]
                 
             except Exception as e:
                 logger.error(f"Core FIRS: Error calculating common validation errors: {str(e)}")
@@ -463,18 +586,12 @@ class MetricsService:
             
             # Get validation rate (per hour) over time with performance tracking
             hourly_validation = []
-            for hour_offset in range(24):
-                hour_start = now - timedelta(hours=hour_offset + 1)
-                hour_end = now - timedelta(hours=hour_offset)
-                
-                hour_query = query.filter(
-                    ValidationRecord.validation_time >= hour_start,
-                    ValidationRecord.validation_time < hour_end
-                )
-                
-                total = hour_query.count()
-                success = hour_query.filter(ValidationRecord.is_valid == True).count()
-                
+            hour_buckets = _hour_buckets(now)
+            hourly_totals = _bucket_totals(
+                db, query, ValidationRecord.validation_time, hour_buckets,
+                case((ValidationRecord.is_valid == True, 1), else_=0)
+            )
+            for hour_offset, ((_, hour_end), (total, success)) in enumerate(zip(hour_buckets, hourly_totals)):
                 hourly_validation.append({
                     "hour": hour_offset,
                     "timestamp": hour_end.isoformat(),
@@ -574,14 +691,7 @@ class MetricsService:
         try:
             # Calculate time threshold based on time_range
             now = datetime.utcnow()
-            if time_range == "24h":
-                time_threshold = now - timedelta(hours=24)
-            elif time_range == "7d":
-                time_threshold = now - timedelta(days=7)
-            elif time_range == "30d":
-                time_threshold = now - timedelta(days=30)
-            else:
-                time_threshold = datetime.min  # All time
+            time_threshold = _time_threshold(now, time_range)
             
             # Get all integrations (not just Odoo)
             query = db.query(Integration)
@@ -592,8 +702,8 @@ class MetricsService:
             all_integrations = query.all()
             
             # Get integration status and counts with FIRS compliance tracking
-            active_count = query.filter(Integration.is_active == True).count()
-            inactive_count = query.filter(Integration.is_active == False).count()
+            active_count = sum(1 for integration in all_integrations if integration.is_active is True)
+            inactive_count = sum(1 for integration in all_integrations if integration.is_active is False)
             
             # Get integration breakdown by type
             integration_types = {}
@@ -617,12 +727,14 @@ class MetricsService:
                     Integration.organization_id == organization_id
                 )
                 
-            total_invoices = invoice_query.count()
-            
-            # Get success rate with FIRS compliance assessment
-            successful_invoices = invoice_query.filter(
-                ValidationRecord.is_valid == True
-            ).count()
+            # Get total and successful invoices in one aggregate row for the FIRS compliance assessment
+            total_invoices, successful_invoices = (
+                int(value or 0)
+                for value in invoice_query.with_entities(
+                    func.count(),
+                    func.sum(case((ValidationRecord.is_valid == True, 1), else_=0))
+                ).one()
+            )
             
             success_rate = (successful_invoices / total_invoices * 100) if total_invoices > 0 else 0
             
@@ -644,26 +756,40 @@ class MetricsService:
             
             # Get integration statuses with enhanced FIRS metadata
             integration_statuses = []
-            for integration in all_integrations:
-                # Get last validation record for this integration
-                last_validation = db.query(ValidationRecord).filter(
-                    ValidationRecord.integration_id == integration.id
-                ).order_by(desc(ValidationRecord.validation_time)).first()
-                
-                # Calculate integration-specific metrics
-                integration_validations = db.query(ValidationRecord).filter(
-                    ValidationRecord.integration_id == integration.id
-                )
+            integration_ids = [integration.id for integration in all_integrations]
+            last_validations = _latest_rows(
+                db,
+                ValidationRecord.integration_id,
+                ValidationRecord.validation_time,
+                integration_ids,
+                ValidationRecord.validation_time,
+                ValidationRecord.is_valid
+            )
+            
+            # Calculate integration-specific metrics with one grouped query
+            validation_totals = {}
+            if integration_ids:
+                integration_validations = db.query(
+                    ValidationRecord.integration_id,
+                    func.count(),
+                    func.coalesce(func.sum(case((ValidationRecord.is_valid == True, 1), else_=0)), 0)
+                ).filter(ValidationRecord.integration_id.in_(integration_ids))
                 
                 if time_range != "all":
                     integration_validations = integration_validations.filter(
                         ValidationRecord.validation_time >= time_threshold
                     )
                 
-                int_total = integration_validations.count()
-                int_successful = integration_validations.filter(
-                    ValidationRecord.is_valid == True
-                ).count()
+                validation_totals = {
+                    integration_id: (int(total), int(successful))
+                    for integration_id, total, successful in integration_validations.group_by(
+                        ValidationRecord.integration_id
+                    ).all()
+                }
+            
+            for integration in all_integrations:
+                last_validation = last_validations.get(integration.id)
+                int_total, int_successful = validation_totals.get(integration.id, (0, 0))
                 
                 int_success_rate = (int_successful / int_total * 100) if int_total > 0 else 0
                 
@@ -674,8 +800,8 @@ class MetricsService:
                     "integration_type": integration.integration_type.value if integration.integration_type else "unknown",
                     "is_active": integration.is_active,
                     "created_at": integration.created_at.isoformat(),
-                    "last_validated": last_validation.validation_time.isoformat() if last_validation else None,
-                    "last_validation_success": last_validation.is_valid if last_validation else None,
+                    "last_validated": last_validation[0].isoformat() if last_validation else None,
+                    "last_validation_success": last_validation[1] if last_validation else None,
                     "total_validations": int_total,
                     "successful_validations": int_successful,
                     "success_rate_percent": int_success_rate,
@@ -691,18 +817,12 @@ class MetricsService:
             
             # Get hourly invoice count with performance analysis
             hourly_counts = []
-            for hour_offset in range(24):
-                hour_start = now - timedelta(hours=hour_offset + 1)
-                hour_end = now - timedelta(hours=hour_offset)
-                
-                hour_query = invoice_query.filter(
-                    ValidationRecord.validation_time >= hour_start,
-                    ValidationRecord.validation_time < hour_end
-                )
-                
-                hour_total = hour_query.count()
-                hour_successful = hour_query.filter(ValidationRecord.is_valid == True).count()
-                
+            hour_buckets = _hour_buckets(now)
+            hourly_totals = _bucket_totals(
+                db, invoice_query, ValidationRecord.validation_time, hour_buckets,
+                case((ValidationRecord.is_valid == True, 1), else_=0)
+            )
+            for hour_offset, ((_, hour_end), (hour_total, hour_successful)) in enumerate(zip(hour_buckets, hourly_totals)):
                 hourly_counts.append({
                     "hour": hour_offset,
                     "timestamp": hour_end.isoformat(),
@@ -22,7 +22,7 @@ from fastapi import BackgroundTasks
 
 from app.models.irn import IRNRecord, InvoiceData, IRNStatus, IRNValidationRecord
 from app.schemas.irn import IRNBatchGenerateRequest
-from app.services.firs_si.irn_generation_service import generate_irn, get_irn_expiration_date, create_validation_record
+from app.services.firs_si.irn_generation_service import generate_irns_batch, get_irn_expiration_date, create_validation_records_bulk
 from app.cache.irn_cache import IRNCache
 from app.core.config import settings
 
@@ -143,22 +143,24 @@ async def process_bulk_irn_job(
     if not timestamp:
         timestamp = datetime.utcnow().strftime("%Y%m%d")
     
+    # Generate all IRNs up front so per-call setup is shared by the batch
+    generated_irns = generate_irns_batch([
+        {
+            "invoice_number": invoice_number,
+            "timestamp": timestamp,
+            "integration_id": str(batch_request.integration_id)
+        }
+        for invoice_number in batch_request.invoice_numbers
+    ])
+    
+    # Create expiration date
+    valid_until = get_irn_expiration_date()
+    
     # Process each invoice number asynchronously
-    for invoice_number in batch_request.invoice_numbers:
+    for invoice_number, (irn_value, verification_code, hash_value) in zip(
+        batch_request.invoice_numbers, generated_irns
+    ):
         try:
-            # Generate basic invoice data
-            invoice_data = {
-                "invoice_number": invoice_number,
-                "timestamp": timestamp,
-                "integration_id": str(batch_request.integration_id)
-            }
-            
-            # Generate IRN
-            irn_value, verification_code, hash_value = generate_irn(invoice_data)
-            
-            # Create expiration date
-            valid_until = get_irn_expiration_date()
-            
             # Create IRN record
             irn_record = IRNRecord(
                 irn=irn_value,
@@ -311,6 +313,7 @@ async def validate_multiple_irns(
         Dictionary with validation results
     """
     results = []
+    validation_records = []
     
     for irn_value in irn_values:
         try:
@@ -337,7 +340,6 @@ async def validate_multiple_irns(
                         is_valid = False
                         message = "IRN has expired"
                         irn_record.status = IRNStatus.EXPIRED
-                        db.add(irn_record)
                     
                     result = {
                         "irn": irn_value,
@@ -367,7 +369,6 @@ async def validate_multiple_irns(
                     irn_record = db.query(IRNRecord).filter(IRNRecord.irn == irn_value).first()
                     if irn_record:
                         irn_record.status = IRNStatus.EXPIRED
-                        db.add(irn_record)
                         
                         # Update cache
                         cached_irn["status"] = IRNStatus.EXPIRED.value
@@ -384,15 +385,14 @@ async def validate_multiple_irns(
                     }
                 }
             
-            # Create validation record
-            create_validation_record(
-                db,
-                irn_value,
-                result["is_valid"],
-                result["message"],
-                str(user_id) if user_id else None,
-                "batch_validation"
-            )
+            # Queue validation record; the whole batch is inserted at once below
+            validation_records.append({
+                "irn": irn_value,
+                "validation_status": result["is_valid"],
+                "validation_message": result["message"],
+                "validated_by": user_id,
+                "validation_source": "batch_validation"
+            })
             
             results.append(result)
             
@@ -404,7 +404,8 @@ async def validate_multiple_irns(
                 "message": f"Error during validation: {str(e)}"
             })
     
-    # Commit database changes
+    # Record all validation attempts in one INSERT and commit database changes
+    create_validation_records_bulk(db, validation_records)
     db.commit()
     
     return {
@@ -20,24 +20,38 @@ import uuid
 import hashlib
 import hmac
 import base64
-import json
+import orjson
 import logging
 import secrets
 import asyncio
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Tuple, Dict, Any, Optional, List, Union, Set
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.db.session import SessionLocal, no_expire_on_commit
 from app.models.irn import IRNRecord, InvoiceData, IRNValidationRecord, IRNStatus
 from app.models.user import User
 from app.models.organization import Organization
 from app.schemas.irn import IRNCreate, IRNBatchGenerateRequest
-from app.cache.irn_cache import IRNCache
+from app.cache.irn_cache import IRNCache, VERIFICATION_CACHE_EXPIRY
 from app.services.firs_si.odoo_service import fetch_odoo_invoices
 
 logger = logging.getLogger(__name__)
 
+# Audit-only validation records are buffered by request handlers and written
+# in batches by the flush_validation_buffer background task
+VALIDATION_FLUSH_BATCH_SIZE = 500  # rows per insert
+VALIDATION_FLUSH_INTERVAL = 1.0  # seconds
+# Records kept for retry after a failed flush; the oldest are dropped beyond this
+VALIDATION_BUFFER_MAX_PENDING = 50000
+
+_validation_buffer: List[Dict[str, Any]] = []
+_validation_buffer_lock = threading.Lock()
+
 
 def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
     """
@@ -50,7 +64,7 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         Tuple containing (irn_value, verification_code, hash_value)
     """
     # Import the IRN generator
-    from app.utils.irn_generator import generate_firs_irn
+    from app.utils.irn_generator import generate_firs_irn, generate_verification_code, HASH_V2_PREFIX
     
     try:
         # Generate IRN using the enhanced FIRS-compliant generator
@@ -72,8 +86,8 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         
         # Fallback to legacy method if new implementation fails
         # This ensures backward compatibility
-        unique_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        unique_id = uuid.uuid4().hex
+        timestamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
         
         # Extract key invoice fields for the hash
         invoice_number = invoice_data.get('invoice_number', '')
@@ -85,18 +99,15 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         data_to_hash = f"{invoice_number}|{invoice_date}|{customer_tax_id}|{total_amount}|{timestamp}|{unique_id}"
         
         # Create a hash of the invoice data for verification
-        hash_value = hashlib.sha256(data_to_hash.encode()).hexdigest()
+        hash_value = HASH_V2_PREFIX + hashlib.blake2b(data_to_hash.encode(), digest_size=32).hexdigest()
         
-        # Generate a verification code using HMAC and a secret key
-        verification_code = hmac.new(
-            settings.SECRET_KEY.encode(),
-            hash_value.encode(),
-            hashlib.sha256
-        ).hexdigest()[:12]  # Take first 12 characters for brevity
+        # Generate a verification code from the shared, pre-keyed generator
+        # instead of re-deriving the HMAC key schedule per invoice
+        verification_code = generate_verification_code(hash_value, 12)
         
         # Construct the IRN value with legacy format
-        # Format: IRN-{timestamp}-{first 8 chars of unique_id}-{first 6 chars of hash}
-        irn_value = f"IRN-{timestamp}-{unique_id[:8]}-{hash_value[:6]}".upper()
+        # Format: IRN-{timestamp}-{first 8 chars of unique_id}-{first 6 chars of the digest}
+        irn_value = f"IRN-{timestamp}-{unique_id[:8]}-{hash_value[len(HASH_V2_PREFIX):][:6]}".upper()
         
         # Log fallback to legacy method
         logger.warning(f"Used legacy IRN generation for invoice: {invoice_data.get('invoice_number', '')}")  
@@ -104,6 +115,88 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         return irn_value, verification_code, hash_value
 
 
+def generate_irns_batch(invoice_data_list: List[Dict[str, Any]]) -> List[Tuple[str, str, str]]:
+    """
+    Generate IRNs for a batch of invoices.
+    
+    Per-batch setup (timestamps, validation, key material) is shared across
+    the batch; invoices the FIRS generator rejects go through generate_irn
+    individually so they get the same legacy fallback as single generation.
+    
+    Args:
+        invoice_data_list: Dictionaries containing invoice details
+        
+    Returns:
+        List of (irn_value, verification_code, hash_value) tuples in input order
+    """
+    from app.utils.irn_generator import generate_firs_irns
+    
+    try:
+        irn_results = generate_firs_irns(invoice_data_list)
+    except Exception as e:
+        logger.error(f"Error generating IRN batch: {str(e)}")
+        irn_results = [None] * len(invoice_data_list)
+    
+    generated = []
+    for invoice_data, irn_result in zip(invoice_data_list, irn_results):
+        if irn_result is None:
+            generated.append(generate_irn(invoice_data))
+        else:
+            generated.append((irn_result['irn'], irn_result['verification_code'], irn_result['hash_value']))
+    
+    logger.info(f"Generated {len(generated)} IRNs in batch")
+    
+    return generated
+
+
+def _verify_irn_record(
+    irn_record: IRNRecord,
+    verification_code: str,
+    invoice_data: Dict[str, Any]
+) -> Tuple[bool, str]:
+    """Check a stored IRN against the provided verification code and invoice data."""
+    # Status checks come first so expired/revoked IRNs are rejected
+    # without touching the verification code
+    if irn_record.valid_until and irn_record.valid_until < datetime.utcnow():
+        return False, "IRN has expired"
+    
+    # Check if the IRN is revoked
+    if irn_record.status == IRNStatus.REVOKED:
+        return False, "IRN has been revoked"
+    
+    # Compare against the code stored at generation time, in constant
+    # time; nothing is re-derived from SECRET_KEY per request
+    stored_code = irn_record.verification_code
+    if not stored_code or not hmac.compare_digest(
+        (verification_code or "").encode(),
+        stored_code.encode()
+    ):
+        return False, "Invalid verification code"
+    
+    # If stored invoice data exists, verify it against the provided data
+    stored_data = irn_record.invoice_data
+    if stored_data:
+        # Verify key invoice details
+        if stored_data.invoice_number != invoice_data.get('invoice_number'):
+            return False, "Invoice number mismatch"
+    
+        if stored_data.total_amount != invoice_data.get('total_amount'):
+            return False, "Invoice amount mismatch"
+    
+        # More detailed validations could be added here
+    
+    return True, "IRN verification successful"
+
+
+def _verification_cache_expiry(irn_record: IRNRecord) -> int:
+    """Seconds a verification result for this IRN may be reused; never past valid_until."""
+    if not irn_record.valid_until:
+        return VERIFICATION_CACHE_EXPIRY
+    
+    remaining = (irn_record.valid_until - datetime.utcnow()).total_seconds()
+    return min(VERIFICATION_CACHE_EXPIRY, int(remaining))
+
+
 def verify_irn(
     db: Session,
     irn_value: str,
@@ -123,36 +216,23 @@ def verify_irn(
         Tuple containing (is_valid, message)
     """
     try:
-        # First, check if this IRN exists in the database for quick validation
-        irn_record = db.query(IRNRecord).filter(IRNRecord.irn_value == irn_value).first()
+        # Results are cached per IRN, code and invoice data, so repeated
+        # verifications skip the database
+        cached = IRNCache.get_cached_verification(irn_value, verification_code, invoice_data)
+        if cached is not None:
+            return cached
+        
+        # First, check if this IRN exists in the database for quick validation;
+        # the IRN is the primary key, so this checks the identity map first
+        irn_record = db.get(IRNRecord, irn_value)
         
         if irn_record:
-            # Check if the IRN has expired
-            if irn_record.expiration_date and irn_record.expiration_date < datetime.utcnow():
-                return False, "IRN has expired"
-            
-            # Check if the IRN is revoked
-            if irn_record.status == IRNStatus.REVOKED:
-                return False, "IRN has been revoked"
-            
-            # Check if verification code matches
-            if verification_code != irn_record.verification_code:
-                return False, "Invalid verification code"
-            
-            # If stored invoice data exists, verify it against the provided data
-            if irn_record.invoice_data:
-                stored_data = decode_invoice_data(irn_record.invoice_data)
-                
-                # Verify key invoice details
-                if stored_data.get('invoice_number') != invoice_data.get('invoice_number'):
-                    return False, "Invoice number mismatch"
-                
-                if stored_data.get('total_amount') != invoice_data.get('total_amount'):
-                    return False, "Invoice amount mismatch"
-                
-                # More detailed validations could be added here
-            
-            return True, "IRN verification successful"
+            result = _verify_irn_record(irn_record, verification_code, invoice_data)
+            IRNCache.cache_verification(
+                irn_value, verification_code, invoice_data, result,
+                expiry=_verification_cache_expiry(irn_record)
+            )
+            return result
         
         # If not in database, determine if it's a FIRS-formatted IRN or a legacy IRN
         if irn_value.startswith("IRN-"):
@@ -208,25 +288,20 @@ def expire_outdated_irns(db: Session) -> int:
     """
     now = datetime.utcnow()
     
-    # Find all active IRNs that have expired
-    expired_irns = (
+    # Expire all active IRNs past their validity in a single UPDATE
+    expired_count = (
         db.query(IRNRecord)
         .filter(
             IRNRecord.status == IRNStatus.ACTIVE,
-            IRNRecord.expires_at < now
+            IRNRecord.valid_until < now
         )
-        .all()
+        .update({IRNRecord.status: IRNStatus.EXPIRED}, synchronize_session=False)
     )
     
-    # Update their status to expired
-    for irn in expired_irns:
-        irn.status = IRNStatus.EXPIRED
-        db.add(irn)
-    
-    if expired_irns:
+    if expired_count:
         db.commit()
     
-    return len(expired_irns)
+    return expired_count
 
 
 def encode_invoice_data(invoice_data: Dict[str, Any]) -> str:
@@ -242,8 +317,9 @@ def encode_invoice_data(invoice_data: Dict[str, Any]) -> str:
     """
     # For simplicity, we'll just create a string representation
     # In a production environment, this would use encryption
-    import json
-    return json.dumps(invoice_data)
+    # orjson also handles the datetimes/UUIDs invoice payloads carry; non-str
+    # keys are stringified as json.dumps did
+    return orjson.dumps(invoice_data, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 def decode_invoice_data(encoded_data: str) -> Dict[str, Any]:
@@ -258,8 +334,7 @@ def decode_invoice_data(encoded_data: str) -> Dict[str, Any]:
     """
     # For simplicity, we'll just parse the JSON
     # In a production environment, this would use decryption
-    import json
-    return json.loads(encoded_data)
+    return orjson.loads(encoded_data)
 
 
 def create_validation_record(
@@ -306,13 +381,140 @@ def create_validation_record(
         response_data=response_data
     )
     
+    # Every column is set above, so the row needs no refresh, and the
+    # caller's loaded IRN record stays usable after the commit
     db.add(validation_record)
-    db.commit()
-    db.refresh(validation_record)
+    with no_expire_on_commit(db):
+        db.commit()
     
     return validation_record
 
 
+def create_validation_records_bulk(db: Session, records: List[Dict[str, Any]]) -> int:
+    """
+    Insert many IRN validation records with a single statement and commit.
+    
+    Use this for batch validation; create_validation_record remains the API
+    for single verifications, where the created ORM object is needed.
+    
+    Args:
+        db: Database session
+        records: IRNValidationRecord column values (irn, validation_status,
+            validation_message, ...); id and validation_date are filled in
+            when absent
+        
+    Returns:
+        Number of records inserted
+    """
+    if not records:
+        return 0
+    
+    now = datetime.utcnow()
+    rows = [
+        {"id": uuid.uuid4(), "validation_date": now, **record}
+        for record in records
+    ]
+    
+    logger.info(f"Recording {len(rows)} IRN validation attempts")
+    
+    with no_expire_on_commit(db):
+        db.execute(insert(IRNValidationRecord), rows)
+        db.commit()
+    
+    return len(rows)
+
+
+def buffer_validation_record(
+    irn_id: str,
+    is_valid: bool,
+    message: str,
+    validated_by: Optional[str] = None,
+    validation_source: str = "system",
+    request_data: Optional[Dict[str, Any]] = None,
+    response_data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Queue an audit-only IRN validation record for a later batched insert.
+    
+    Use create_validation_record instead where the record must be durable
+    before the caller returns. This only enqueues the record, so it is safe
+    to call from async request handlers; the database write happens in the
+    flush_validation_buffer background task.
+    
+    Args:
+        irn_id: ID of the IRN
+        is_valid: Whether the validation was successful
+        message: Validation message
+        validated_by: User ID that performed the validation (if applicable)
+        validation_source: Source of validation (system, api, user, firs)
+        request_data: Data used in the validation request (for audit)
+        response_data: Response data from validation (for audit)
+        
+    Returns:
+        The queued record's column values
+    """
+    record = {
+        "id": uuid.uuid4(),
+        "irn": irn_id,
+        "validation_date": datetime.utcnow(),
+        "validation_status": is_valid,
+        "validation_message": message,
+        "validated_by": validated_by,
+        "validation_source": validation_source,
+        "request_data": request_data,
+        "response_data": response_data
+    }
+    
+    with _validation_buffer_lock:
+        _validation_buffer.append(record)
+    
+    return record
+
+
+def _flush_validation_buffer() -> int:
+    """Write every buffered validation record, VALIDATION_FLUSH_BATCH_SIZE rows per insert."""
+    with _validation_buffer_lock:
+        if not _validation_buffer:
+            return 0
+        records = _validation_buffer[:]
+        _validation_buffer.clear()
+    
+    written = 0
+    db = SessionLocal()
+    try:
+        for start in range(0, len(records), VALIDATION_FLUSH_BATCH_SIZE):
+            written += create_validation_records_bulk(db, records[start:start + VALIDATION_FLUSH_BATCH_SIZE])
+    except Exception:
+        # Put the unwritten records back in front of anything queued since,
+        # so the next flush retries them in order
+        unwritten = records[written:]
+        with _validation_buffer_lock:
+            _validation_buffer[:0] = unwritten
+            dropped = max(0, len(_validation_buffer) - VALIDATION_BUFFER_MAX_PENDING)
+            del _validation_buffer[:dropped]
+        logger.exception(f"Failed to write {len(unwritten)} buffered IRN validation records; retrying on the next flush")
+        if dropped:
+            logger.error(f"Dropped {dropped} buffered IRN validation records over the pending limit")
+        db.rollback()
+    finally:
+        db.close()
+    return written
+
+
+async def flush_validation_buffer() -> int:
+    """
+    Flush buffered IRN validation records.
+    
+    Runs as a periodic background task every VALIDATION_FLUSH_INTERVAL
+    seconds and once more on shutdown. The insert runs in a worker thread
+    so the event loop is not blocked.
+    
+    Returns:
+        Number of records written
+    """
+    return await asyncio.to_thread(_flush_validation_buffer)
+
+
 class IRNService:
     """
     IRN (Invoice Reference Number) service class for generating, validating, and managing IRNs.
@@ -337,3 +539,7 @@ class IRNService:
     def create_validation_record(self, irn_id: str, is_valid: bool, message: str, **kwargs) -> IRNValidationRecord:
         """Create validation record using the module function."""
         return create_validation_record(self.db, irn_id, is_valid, message, **kwargs)
+    
+    def create_validation_records_bulk(self, records: List[Dict[str, Any]]) -> int:
+        """Create validation records in bulk using the module function."""
+        return create_validation_records_bulk(self.db, records)
@@ -5,12 +5,14 @@ This module provides functions to monitor the status of integrations,
 with enhanced capabilities for Odoo 18+ integrations.
 """
 import logging
+import random
 import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
 
+from cachetools import TTLCache
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -23,8 +25,17 @@ logger = logging.getLogger(__name__)
 
 # Global dictionary to track integration monitoring threads
 _monitoring_threads = {}
-# Cache for status info to reduce database load
-_status_cache = {}
+# Cache for status info to reduce database load; bounded and aged out so
+# entries for long-gone integrations don't pile up
+_status_cache: TTLCache = TTLCache(maxsize=10_000, ttl=24 * 3600)
+# Guards both dictionaries above (cachetools caches aren't thread-safe)
+_monitor_state_lock = threading.RLock()
+
+
+def _get_cached_status(status_key: str) -> Optional["MonitoringStatus"]:
+    """Return the cached status for an integration, if any."""
+    with _monitor_state_lock:
+        return _status_cache.get(status_key)
 
 
 class MonitoringStatus(BaseModel):
@@ -57,8 +68,9 @@ def get_integration_monitoring_status(db: Session, integration_id: UUID) -> Moni
     
     # Check if we have a cached status
     status_key = str(integration_id)
-    if status_key in _status_cache:
-        return _status_cache[status_key]
+    cached = _get_cached_status(status_key)
+    if cached is not None:
+        return cached
     
     # Create a new status object if not in cache
     status = MonitoringStatus(
@@ -72,7 +84,8 @@ def get_integration_monitoring_status(db: Session, integration_id: UUID) -> Moni
     
     # Calculate next check time if monitoring is active
     if status.is_being_monitored:
-        thread_info = _monitoring_threads.get(status_key)
+        with _monitor_state_lock:
+            thread_info = _monitoring_threads.get(status_key)
         if thread_info and thread_info.get("interval_minutes"):
             if status.last_checked:
                 status.next_check = status.last_checked + timedelta(
@@ -80,7 +93,8 @@ def get_integration_monitoring_status(db: Session, integration_id: UUID) -> Moni
                 )
     
     # Cache the status
-    _status_cache[status_key] = status
+    with _monitor_state_lock:
+        _status_cache[status_key] = status
     return status
 
 
@@ -121,7 +135,13 @@ def _monitor_integration(db_session_factory, integration_id: UUID, interval_minu
     
     logger.info(f"Starting monitoring for integration {integration_id} every {interval_minutes} minutes")
     
-    while status_key in _monitoring_threads and _monitoring_threads[status_key]["active"]:
+    # Hold on to this thread's own entry; stop_integration_monitoring removes
+    # it from the registry and clears "active"
+    with _monitor_state_lock:
+        thread_info = _monitoring_threads.get(status_key) or {"active": False}
+    
+    while thread_info["active"]:
+        db = None
         try:
             # Create a new database session for this check
             db = db_session_factory()
@@ -166,13 +186,14 @@ def _monitor_integration(db_session_factory, integration_id: UUID, interval_minu
                     integration.status_message = "Connection successful"
                 
                 # Update cache
-                if status_key in _status_cache:
-                    _status_cache[status_key].status = new_status
-                    _status_cache[status_key].last_checked = datetime.now()
-                    _status_cache[status_key].next_check = datetime.now() + timedelta(minutes=interval_minutes)
-                    _status_cache[status_key].consecutive_failures = consecutive_failures
+                cached = _get_cached_status(status_key)
+                if cached is not None:
+                    cached.status = new_status
+                    cached.last_checked = datetime.now()
+                    cached.next_check = datetime.now() + timedelta(minutes=interval_minutes)
+                    cached.consecutive_failures = consecutive_failures
                     if not result.get("success", False):
-                        _status_cache[status_key].last_error = result.get("message", "Unknown error")
+                        cached.last_error = result.get("message", "Unknown error")
             
                 # Commit changes
                 db.commit()
@@ -181,34 +202,42 @@ def _monitor_integration(db_session_factory, integration_id: UUID, interval_minu
                 log_level = logging.INFO if result.get("success", False) else logging.ERROR
                 logger.log(log_level, f"Integration check result for {integration.name}: {result.get('message', 'No message')}")
             
-            # Close the database session
-            db.close()
-            
         except Exception as e:
             logger.exception(f"Error monitoring integration {integration_id}: {str(e)}")
             consecutive_failures += 1
             
             # Update cache if available
-            if status_key in _status_cache:
-                _status_cache[status_key].consecutive_failures = consecutive_failures
-                _status_cache[status_key].last_error = str(e)
-                _status_cache[status_key].status = "error"
+            cached = _get_cached_status(status_key)
+            if cached is not None:
+                cached.consecutive_failures = consecutive_failures
+                cached.last_error = str(e)
+                cached.status = "error"
             
+            error_db = None
             try:
                 # Try to update the database
-                db = db_session_factory()
-                integration = db.query(Integration).filter(Integration.id == integration_id).first()
+                error_db = db_session_factory()
+                integration = error_db.query(Integration).filter(Integration.id == integration_id).first()
                 if integration:
                     integration.status = "error"
                     integration.last_tested = func.now()
                     integration.status_message = str(e)
-                    db.commit()
-                db.close()
+                    error_db.commit()
             except Exception:
                 logger.exception(f"Error updating integration status in database for {integration_id}")
+            finally:
+                if error_db is not None:
+                    error_db.close()
+        
+        finally:
+            # Always hand the connection back to the pool, including when the
+            # check raised or the integration has disappeared
+            if db is not None:
+                db.close()
         
-        # Sleep until next check
-        time.sleep(interval_minutes * 60)
+        # Sleep until next check, jittered by +/-10% so integrations started
+        # together do not poll in lockstep
+        time.sleep(interval_minutes * 60 * random.uniform(0.9, 1.1))
 
 
 def start_integration_monitoring(
@@ -235,7 +264,9 @@ def start_integration_monitoring(
     
     # Check if already being monitored
     status_key = str(integration_id)
-    if status_key in _monitoring_threads and _monitoring_threads[status_key]["active"]:
+    with _monitor_state_lock:
+        thread_info = _monitoring_threads.get(status_key)
+    if thread_info and thread_info["active"]:
         logger.info(f"Integration {integration.name} ({integration_id}) is already being monitored")
         return True
     
@@ -250,12 +281,13 @@ def start_integration_monitoring(
     )
     
     # Store thread info
-    _monitoring_threads[status_key] = {
-        "thread": thread,
-        "active": True,
-        "interval_minutes": interval_minutes,
-        "started_at": datetime.now()
-    }
+    with _monitor_state_lock:
+        _monitoring_threads[status_key] = {
+            "thread": thread,
+            "active": True,
+            "interval_minutes": interval_minutes,
+            "started_at": datetime.now()
+        }
     
     # Start the thread
     thread.start()
@@ -289,12 +321,14 @@ def stop_integration_monitoring(db: Session, integration_id: UUID) -> bool:
     
     # Check if being monitored
     status_key = str(integration_id)
-    if status_key not in _monitoring_threads or not _monitoring_threads[status_key]["active"]:
+    with _monitor_state_lock:
+        thread_info = _monitoring_threads.pop(status_key, None)
+    if not thread_info or not thread_info["active"]:
         logger.info(f"Integration {integration.name} ({integration_id}) is not being monitored")
         return False
     
-    # Stop the monitoring thread
-    _monitoring_threads[status_key]["active"] = False
+    # Stop the monitoring thread; it exits once it no longer finds its entry
+    thread_info["active"] = False
     
     # Update integration status in database
     integration.status = "unknown"
@@ -355,12 +389,12 @@ def run_integration_health_check(db: Session, integration_id: UUID) -> Integrati
         db.commit()
         
         # Update cache if it exists
-        status_key = str(integration_id)
-        if status_key in _status_cache:
-            _status_cache[status_key].status = integration.status
-            _status_cache[status_key].last_checked = datetime.now()
+        cached = _get_cached_status(str(integration_id))
+        if cached is not None:
+            cached.status = integration.status
+            cached.last_checked = datetime.now()
             if not test_result.success:
-                _status_cache[status_key].last_error = test_result.message
+                cached.last_error = test_result.message
         
         return test_result
     
@@ -374,11 +408,11 @@ def run_integration_health_check(db: Session, integration_id: UUID) -> Integrati
         db.commit()
         
         # Update cache if it exists
-        status_key = str(integration_id)
-        if status_key in _status_cache:
-            _status_cache[status_key].status = "error"
-            _status_cache[status_key].last_checked = datetime.now()
-            _status_cache[status_key].last_error = str(e)
+        cached = _get_cached_status(str(integration_id))
+        if cached is not None:
+            cached.status = "error"
+            cached.last_checked = datetime.now()
+            cached.last_error = str(e)
         
         return IntegrationTestResult(
             success=False,
@@ -1,26 +1,51 @@
-from typing import Dict, Any, List, Optional, Tuple # type: ignore
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
+import hashlib
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple # type: ignore
 from uuid import UUID # type: ignore
 from datetime import datetime
+import asyncio
 import requests # type: ignore
+from cachetools import TTLCache # type: ignore
+from requests.adapters import HTTPAdapter # type: ignore
 from requests.exceptions import RequestException, Timeout, ConnectionError # type: ignore
 import json
+import orjson
 import jsonschema # type: ignore
-from jsonschema import validate, ValidationError # type: ignore
+from jsonschema import Draft7Validator # type: ignore
 import logging
+import random
+import re
 import time
-from sqlalchemy.orm import Session # type: ignore
+from sqlalchemy.orm import Session, undefer # type: ignore
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from fastapi.encoders import jsonable_encoder # For update_integration and object serialization
 
 from app import crud
-from app.schemas.integration import IntegrationCreate, IntegrationUpdate, Integration, IntegrationTestResult, OdooIntegrationCreate, OdooConnectionTestRequest, IntegrationExport, IntegrationImport, FIRSEnvironment # type: ignore
+from app.schemas.integration import IntegrationCreate, IntegrationUpdate, Integration, IntegrationTestResult, OdooIntegrationCreate, OdooConnectionTestRequest, IntegrationExport, IntegrationImport, FIRSEnvironment, OdooConfig # type: ignore
 from app.utils.encryption import encrypt_sensitive_value, decrypt_sensitive_value, get_app_encryption_key # type: ignore
-from app.models.integration import IntegrationType  # type: ignore
+from app.models.integration import Integration as IntegrationModel, IntegrationType  # type: ignore
 from app.services.firs_si.odoo_service import test_odoo_connection as test_odoo, fetch_odoo_invoices
 
-# List of config fields that should be encrypted
-SENSITIVE_CONFIG_FIELDS = [
+logger = logging.getLogger(__name__)
+
+# Shared session so repeated connection tests reuse pooled keep-alive connections
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Upper bound on concurrent probes in test_integrations_bulk
+_BULK_TEST_MAX_WORKERS = 16
+
+# Connection tests only report a response size; stop counting past this
+_RESPONSE_SIZE_CAP = 64 * 1024
+
+# Config fields that should be encrypted
+SENSITIVE_CONFIG_FIELDS = frozenset({
     "api_key", 
     "client_secret", 
     "secret_key", 
@@ -30,74 +55,289 @@ SENSITIVE_CONFIG_FIELDS = [
     "access_token",
     "refresh_token",
     "private_key"
-]
+})
+
+
+def _transform_sensitive_fields(
+    config: Dict[str, Any],
+    transform: Callable[[Any, bytes], Any],
+    key: Optional[bytes] = None,
+    *,
+    stored: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Apply ``transform`` to sensitive fields, copying only the dicts that change.
+    
+    The tree is walked once with an explicit stack to find the sensitive paths;
+    subtrees without sensitive values are shared rather than copied, so the
+    caller's config is never mutated. The key is only looked up once a
+    sensitive value has actually been found.
+    
+    If ``stored`` (the encrypted config already saved) is given, values that
+    are its ciphertext, or the plaintext behind it, keep the stored ciphertext.
+    """
+    found = list(_iter_sensitive_values(config))
+    if not found:
+        return config
+    
+    encryption_key = key or get_app_encryption_key()
+    replacements = {}
+    for path, value in found:
+        ciphertext = _stored_ciphertext(stored, path, value, encryption_key) if stored else None
+        replacements[path] = ciphertext if ciphertext is not None else transform(value, encryption_key)
+    
+    return _replace_at_paths(config, replacements)
+
+
+def _stored_ciphertext(
+    stored: Dict[str, Any],
+    path: Tuple[str, ...],
+    value: Any,
+    key: bytes
+) -> Optional[str]:
+    """Return the stored ciphertext at ``path`` if ``value`` is it or decrypts from it."""
+    node: Any = stored
+    for name in path:
+        if not isinstance(node, dict) or name not in node:
+            return None
+        node = node[name]
+    
+    if not node or not isinstance(node, str):
+        return None
+    
+    plaintext = _decrypt_value(node, key)
+    if plaintext == node:
+        # Legacy plaintext passes through decryption and must still be encrypted
+        return None
+    if value == node or value == plaintext:
+        return node
+    return None
+
 
-def encrypt_sensitive_config_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+def _iter_sensitive_values(
+    config: Dict[str, Any]
+) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    """Yield ``(path, value)`` for every non-empty sensitive value in a config."""
+    stack = [((), config)]
+    while stack:
+        path, node = stack.pop()
+        for key, value in node.items():
+            if key in SENSITIVE_CONFIG_FIELDS:
+                if value:
+                    yield path + (key,), value
+            elif isinstance(value, dict):
+                stack.append((path + (key,), value))
+
+
+def _replace_at_paths(
+    config: Dict[str, Any],
+    replacements: Dict[Tuple[str, ...], Any]
+) -> Dict[str, Any]:
+    """
+    Return ``config`` with values swapped in at the given key paths.
+    
+    Only the dicts along the replaced paths are copied; other branches are shared.
+    """
+    if not replacements:
+        return config
+    
+    result = dict(config)
+    copied = {(): result}
+    for path, value in replacements.items():
+        node = result
+        for depth in range(1, len(path)):
+            child = copied.get(path[:depth])
+            if child is None:
+                child = dict(node[path[depth - 1]])
+                node[path[depth - 1]] = child
+                copied[path[:depth]] = child
+            node = child
+        node[path[-1]] = value
+    return result
+
+
+def batch_decrypt_configs(
+    configs: List[Dict[str, Any]],
+    *,
+    key: Optional[bytes] = None
+) -> List[Dict[str, Any]]:
+    """
+    Decrypt sensitive fields across many integration configs in one pass.
+    
+    Every ciphertext on the page is collected first and decrypted in a single
+    loop, then written back by path, instead of walking each config separately.
+    
+    Args:
+        configs: Integration configuration dictionaries with encrypted fields
+        key: Pre-resolved encryption key; looked up once if not given
+        
+    Returns:
+        Configurations, in the same order, with sensitive fields decrypted
+    """
+    pending = [
+        (row, path, ciphertext)
+        for row, config in enumerate(configs) if config
+        for path, ciphertext in _iter_sensitive_values(config)
+    ]
+    if not pending:
+        return list(configs)
+    
+    encryption_key = key or get_app_encryption_key()
+    replacements: Dict[int, Dict[Tuple[str, ...], Any]] = {}
+    for row, path, ciphertext in pending:
+        replacements.setdefault(row, {})[path] = _decrypt_value(ciphertext, encryption_key)
+    
+    return [
+        _replace_at_paths(config, replacements[row]) if row in replacements else config
+        for row, config in enumerate(configs)
+    ]
+
+
+def encrypt_sensitive_config_fields(
+    config: Dict[str, Any],
+    *,
+    key: Optional[bytes] = None,
+    stored: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Encrypt sensitive fields in integration configuration.
     
     Args:
         config: The integration configuration dictionary
+        key: Pre-resolved encryption key; looked up once if not given
+        stored: Currently saved (encrypted) config; unchanged secrets sent back
+            from it keep their existing ciphertext instead of being re-encrypted
         
     Returns:
         Updated configuration with sensitive fields encrypted
     """
     if not config:
         return config
-        
-    encryption_key = get_app_encryption_key()
-    encrypted_config = config.copy()
-    
-    # Encrypt top-level sensitive fields
-    for field in SENSITIVE_CONFIG_FIELDS:
-        if field in encrypted_config and encrypted_config[field]:
-            encrypted_config[field] = encrypt_sensitive_value(
-                str(encrypted_config[field]), 
-                encryption_key
-            )
     
-    # Check for nested objects that might contain sensitive fields
-    for key, value in encrypted_config.items():
-        if isinstance(value, dict):
-            encrypted_config[key] = encrypt_sensitive_config_fields(value)
-            
-    return encrypted_config
+    return _transform_sensitive_fields(config, _encrypt_value, key, stored=stored)
+
 
+def _encrypt_value(value: Any, key: bytes) -> str:
+    """Encrypt a single config value, stringifying non-string values first."""
+    return encrypt_sensitive_value(str(value), key)
 
-def decrypt_sensitive_config_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+
+def decrypt_sensitive_config_fields(
+    config: Dict[str, Any],
+    *,
+    key: Optional[bytes] = None
+) -> Dict[str, Any]:
     """
     Decrypt sensitive fields in integration configuration.
     
     Args:
         config: The integration configuration dictionary with encrypted fields
+        key: Pre-resolved encryption key; looked up once if not given
         
     Returns:
         Configuration with sensitive fields decrypted
     """
     if not config:
         return config
+    
+    return _transform_sensitive_fields(config, _decrypt_value, key)
+
+
+# Ciphertext -> plaintext for recently decrypted config values, keyed by
+# (ciphertext, key fingerprint) so a different key never sees another's entries
+_DECRYPTED_VALUE_CACHE_SIZE = 2048
+_decrypted_value_cache: "OrderedDict[Tuple[str, bytes], Any]" = OrderedDict()
+_decrypted_value_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _key_id(key: bytes) -> bytes:
+    """Short fingerprint of an encryption key for scoping cache entries."""
+    return hashlib.blake2b(key, digest_size=8).digest()
+
+
+def clear_decrypted_value_cache() -> None:
+    """Drop all cached plaintext config values."""
+    with _decrypted_value_cache_lock:
+        _decrypted_value_cache.clear()
+
+
+def _decrypt_value(value: Any, key: bytes) -> Any:
+    """Decrypt a single config value, passing through values that are not encrypted."""
+    if not isinstance(value, str):
+        return _decrypt_value_uncached(value, key)
+    
+    cache_key = (value, _key_id(key))
+    with _decrypted_value_cache_lock:
+        if cache_key in _decrypted_value_cache:
+            _decrypted_value_cache.move_to_end(cache_key)
+            return _decrypted_value_cache[cache_key]
+    
+    plaintext = _decrypt_value_uncached(value, key)
+    with _decrypted_value_cache_lock:
+        _decrypted_value_cache[cache_key] = plaintext
+        if len(_decrypted_value_cache) > _DECRYPTED_VALUE_CACHE_SIZE:
+            _decrypted_value_cache.popitem(last=False)
+    return plaintext
+
+
+def _decrypt_value_uncached(value: Any, key: bytes) -> Any:
+    try:
+        return decrypt_sensitive_value(value, key)
+    except Exception:
+        # If decryption fails, it might not be encrypted yet
+        return value
+
+
+class LazyDecryptedConfig(Mapping):
+    """
+    Read-only view of an integration config that decrypts on access.
+    
+    Sensitive values are decrypted the first time they are read and then
+    memoized, so callers that never touch credentials never pay for them.
+    Nested dicts are wrapped the same way.
+    """
+    
+    __slots__ = ("_raw", "_key", "_cache")
+    
+    def __init__(self, raw: Dict[str, Any], key: Optional[bytes] = None):
+        self._raw = raw
+        self._key = key
+        self._cache: Dict[str, Any] = {}
+    
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
         
-    encryption_key = get_app_encryption_key()
-    decrypted_config = config.copy()
-    
-    # Decrypt top-level sensitive fields
-    for field in SENSITIVE_CONFIG_FIELDS:
-        if field in decrypted_config and decrypted_config[field]:
-            try:
-                decrypted_config[field] = decrypt_sensitive_value(
-                    decrypted_config[field], 
-                    encryption_key
-                )
-            except Exception:
-                # If decryption fails, it might not be encrypted yet
-                pass
-    
-    # Check for nested objects that might contain sensitive fields
-    for key, value in decrypted_config.items():
-        if isinstance(value, dict):
-            decrypted_config[key] = decrypt_sensitive_config_fields(value)
-            
-    return decrypted_config
+        value = self._raw[name]
+        if name in SENSITIVE_CONFIG_FIELDS and value:
+            if self._key is None:
+                self._key = get_app_encryption_key()
+            value = _decrypt_value(value, self._key)
+        elif isinstance(value, dict):
+            value = LazyDecryptedConfig(value, self._key)
+        
+        self._cache[name] = value
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+    
+    def __len__(self) -> int:
+        return len(self._raw)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a plain, fully decrypted copy, e.g. for JSON serialization."""
+        return {
+            name: value.to_dict() if isinstance(value, LazyDecryptedConfig) else value
+            for name, value in self.items()
+        }
+    
+    def __repr__(self) -> str:
+        # Never render secrets, decrypted or not
+        return f"{type(self).__name__}(keys={list(self._raw)})"
 
 
 def create_integration(
@@ -119,10 +359,8 @@ def create_integration(
     # Encrypt sensitive fields in config
     if obj_in.config:
         encrypted_config = encrypt_sensitive_config_fields(obj_in.config)
-        # Create a new object with the updated config
-        obj_in_data = obj_in.dict()
-        obj_in_data["config"] = encrypted_config
-        obj_in_encrypted = IntegrationCreate(**obj_in_data)
+        # Swap in the encrypted config without re-running validation
+        obj_in_encrypted = obj_in.copy(update={"config": encrypted_config})
         integration = crud.integration.create(db=db, obj_in=obj_in_encrypted, user_id=user_id)
     else:
         integration = crud.integration.create(db=db, obj_in=obj_in, user_id=user_id)
@@ -150,12 +388,14 @@ def update_integration(
         Updated integration object
     """
     # If we're updating the config, encrypt sensitive fields
-    update_data = obj_in.dict(exclude_unset=True)
-    
-    if "config" in update_data and update_data["config"]:
-        update_data["config"] = encrypt_sensitive_config_fields(update_data["config"])
-        obj_in_encrypted = IntegrationUpdate(**update_data)
+    if obj_in.config:
+        encrypted_config = encrypt_sensitive_config_fields(obj_in.config, stored=db_obj.config)
+        # Swap in the encrypted config without re-running validation
+        obj_in_encrypted = obj_in.copy(update={"config": encrypted_config})
         integration = crud.integration.update(db=db, db_obj=db_obj, obj_in=obj_in_encrypted, user_id=user_id)
+        # Secrets were replaced; don't keep their old plaintext around
+        clear_decrypted_value_cache()
+        invalidate_test_cache(db_obj.id)
     else:
         integration = crud.integration.update(db=db, db_obj=db_obj, obj_in=obj_in, user_id=user_id)
     
@@ -178,7 +418,7 @@ def delete_integration(
         None
     """
     # First, stop any monitoring if it exists
-    if integration_id in _monitoring_threads:
+    if str(integration_id) in _monitoring_tasks:
         stop_integration_monitoring(db, integration_id)
     
     # Get the integration from the database
@@ -191,12 +431,18 @@ def delete_integration(
     db.commit()
     
     # Clean up any cached status
-    if integration_id in _status_cache:
-        del _status_cache[integration_id]
+    with _monitor_state_lock:
+        _status_cache.pop(str(integration_id), None)
+    invalidate_test_cache(integration_id)
     
     return None
 
 
+# Decrypted integrations served by get_integration, keyed by (id, updated_at)
+_integration_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_integration_cache_lock = threading.Lock()
+
+
 def get_integration(
     db: Session,
     integration_id: UUID
@@ -214,8 +460,25 @@ def get_integration(
     integration = crud.integration.get(db=db, integration_id=integration_id)
     if not integration:
         return None
-        
-    return decrypt_integration_config(integration)
+    
+    # Any write bumps updated_at, so a stale entry can never be hit
+    cache_key = (integration.id, integration.updated_at)
+    with _integration_cache_lock:
+        cached = _integration_cache.get(cache_key)
+    if cached is None:
+        cached = decrypt_integration_config(integration)
+        with _integration_cache_lock:
+            _integration_cache[cache_key] = cached
+    
+    # Callers may set attributes (e.g. status on update), so each gets its own
+    # object; a shallow copy is enough as the decrypted config is read-only
+    return cached.copy()
+
+
+def clear_integration_cache() -> None:
+    """Drop all cached decrypted integrations."""
+    with _integration_cache_lock:
+        _integration_cache.clear()
 
 
 def get_integrations(
@@ -238,15 +501,15 @@ def get_integrations(
     Returns:
         List of integration objects with decrypted sensitive config fields
     """
-    # Build query
-    query = db.query(crud.integration.model)
+    # Build query; config is a deferred column, but listed rows return it
+    query = db.query(IntegrationModel).options(undefer(IntegrationModel.config))
     
     # Apply filters
     if client_id:
-        query = query.filter(crud.integration.model.client_id == client_id)
+        query = query.filter(IntegrationModel.client_id == client_id)
     
     if integration_type:
-        query = query.filter(crud.integration.model.integration_type == integration_type)
+        query = query.filter(IntegrationModel.integration_type == integration_type)
     
     # Apply pagination
     query = query.offset(skip).limit(limit)
@@ -254,34 +517,42 @@ def get_integrations(
     # Execute query
     integrations = query.all()
     
-    # Decrypt sensitive fields in configs
-    for integration in integrations:
-        decrypt_integration_config(integration)
-        
-    return integrations
+    # Listed configs are serialized in full, so decrypt the whole page in one batch
+    configs = batch_decrypt_configs([integration.config for integration in integrations])
+    return [
+        _integration_with_config(integration, config)
+        for integration, config in zip(integrations, configs)
+    ]
+
 
+# Response schema fields, read off ORM rows by name rather than via __dict__
+_INTEGRATION_FIELDS = tuple(Integration.__fields__)
 
-def decrypt_integration_config(integration: Any) -> Any:
+
+def decrypt_integration_config(integration: Any, *, key: Optional[bytes] = None) -> Any:
     """
     Decrypt sensitive fields in an integration's config.
     
     Args:
         integration: Integration object from database
+        key: Pre-resolved encryption key; looked up once if not given
         
     Returns:
-        Integration with decrypted config
+        Integration whose config decrypts sensitive fields when they are read
     """
-    # Don't modify the original object
-    integration_dict = {
-        key: getattr(integration, key) 
-        for key in integration.__dict__ 
-        if not key.startswith('_')
-    }
-    
-    if "config" in integration_dict and integration_dict["config"]:
-        integration_dict["config"] = decrypt_sensitive_config_fields(integration_dict["config"])
-        
-    return Integration(**integration_dict)
+    config = integration.config
+    if config:
+        config = LazyDecryptedConfig(config, key)
+    return _integration_with_config(integration, config)
+
+
+def _integration_with_config(integration: Any, config: Any) -> Integration:
+    """Build the response schema for a row with ``config`` swapped in."""
+    # Rows come from our own database, so skip re-validating every field.
+    # The config is set on the schema object; the row is never modified.
+    values = {field: getattr(integration, field, None) for field in _INTEGRATION_FIELDS}
+    values["config"] = config
+    return Integration.construct(**values)
 
 
 def test_integration(
@@ -298,42 +569,43 @@ def test_integration(
     Returns:
         Test result with success status, message, and details
     """
-    # Get the integration type from config
-    integration_type = integration.config.get("type", "").lower()
-    
     # Update last_tested timestamp
     now = datetime.utcnow()
     crud.integration.update(
         db=db, 
-        db_obj=crud.integration.get(db=db, id=integration.id),
+        db_obj=crud.integration.get(db=db, integration_id=integration.id),
         obj_in=IntegrationUpdate(last_tested=now),
         user_id=None
     )
     
-    # Test based on integration type
-    if integration_type == "rest_api":
-        return _test_rest_api_connection(integration)
-    elif integration_type == "soap":
-        return _test_soap_connection(integration)
-    elif integration_type == "database":
-        return _test_database_connection(integration)
-    elif integration_type == "file_system":
-        return _test_file_system_connection(integration)
-    elif integration_type == "erp":
-        return _test_erp_connection(integration)
-    elif integration_type == "odoo":
-        return test_integration_odoo_connection(integration)
-    else:
-        return IntegrationTestResult(
-            success=False,
-            message=f"Unsupported integration type: {integration_type}",
-            details={"error": "unsupported_integration_type"}
-        )
+    return _run_connection_test(integration)
+
+
+# Recent connection test results, keyed by (id, stored config digest) so a
+# config change never serves a stale result; entries hold (monotonic time, result)
+_test_result_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_test_result_cache_lock = threading.Lock()
+
+
+def _config_digest(config: Any) -> bytes:
+    """Return a short, key-order independent digest of a stored config."""
+    payload = orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(payload, digest_size=8).digest()
+
+
+def invalidate_test_cache(integration_id: UUID) -> None:
+    """Drop cached connection test results for an integration."""
+    str_id = str(integration_id)
+    with _test_result_cache_lock:
+        for key in [key for key in _test_result_cache if key[0] == str_id]:
+            _test_result_cache.pop(key, None)
 
 
 def test_integration_connection(
     db: Session,
-    integration_id: UUID
+    integration_id: UUID,
+    *,
+    max_age: Optional[float] = None
 ) -> IntegrationTestResult:
     """
     Test the connection for an integration.
@@ -341,49 +613,107 @@ def test_integration_connection(
     Args:
         db: Database session
         integration_id: ID of the integration to test
+        max_age: If given, reuse a result for the same config that is at
+            most this many seconds old instead of probing again
         
     Returns:
         Test result with success status, message, and details
     """
-    integration = get_integration(db=db, integration_id=integration_id)
-    if not integration:
+    # Fetch the row once and reuse it for both the test and the timestamp update
+    db_obj = crud.integration.get(db=db, integration_id=integration_id)
+    if not db_obj:
         return IntegrationTestResult(
             success=False,
             message="Integration not found",
             details={"error": "integration_not_found"}
         )
     
-    # Get the integration type from config
-    integration_type = integration.config.get("type", "").lower()
+    cache_key = (str(integration_id), _config_digest(db_obj.config))
+    if max_age is not None:
+        with _test_result_cache_lock:
+            cached = _test_result_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] <= max_age:
+            return cached[1]
+    
+    integration = decrypt_integration_config(db_obj)
     
     # Update last_tested timestamp
     now = datetime.utcnow()
     crud.integration.update(
         db=db, 
-        db_obj=crud.integration.get(db=db, integration_id=integration_id),
+        db_obj=db_obj,
         obj_in=IntegrationUpdate(last_tested=now),
         user_id=None
     )
     
+    result = _run_connection_test(integration)
+    with _test_result_cache_lock:
+        _test_result_cache[cache_key] = (time.monotonic(), result)
+    return result
+
+
+def test_integrations_bulk(
+    db: Session,
+    integration_ids: List[UUID]
+) -> Dict[UUID, IntegrationTestResult]:
+    """
+    Test the connections for several integrations concurrently.
+    
+    Rows are loaded and their last_tested timestamps saved on the calling
+    thread; only the network probes run in the worker pool, so the session
+    is never shared across threads.
+    
+    Args:
+        db: Database session
+        integration_ids: IDs of the integrations to test
+        
+    Returns:
+        Test result for each requested integration ID
+    """
+    db_objs = db.query(IntegrationModel).options(undefer(IntegrationModel.config)).filter(
+        IntegrationModel.id.in_(integration_ids)
+    ).all()
+    integrations = {db_obj.id: decrypt_integration_config(db_obj) for db_obj in db_objs}
+    
+    results: Dict[UUID, IntegrationTestResult] = {}
+    if integrations:
+        with ThreadPoolExecutor(max_workers=min(_BULK_TEST_MAX_WORKERS, len(integrations))) as executor:
+            futures = {
+                integration_id: executor.submit(_run_connection_test, integration)
+                for integration_id, integration in integrations.items()
+            }
+            for integration_id, future in futures.items():
+                results[integration_id] = future.result()
+        
+        now = datetime.utcnow()
+        for db_obj in db_objs:
+            db_obj.last_tested = now
+        db.commit()
+    
+    for integration_id in integration_ids:
+        if integration_id not in results:
+            results[integration_id] = IntegrationTestResult(
+                success=False,
+                message="Integration not found",
+                details={"error": "integration_not_found"}
+            )
+    return results
+
+
+def _run_connection_test(integration: Integration) -> IntegrationTestResult:
+    """Run the connection test matching the integration's configured type."""
+    # Get the integration type from config
+    integration_type = integration.config.get("type", "").lower()
+    
     # Test based on integration type
-    if integration_type == "rest_api":
-        return _test_rest_api_connection(integration)
-    elif integration_type == "soap":
-        return _test_soap_connection(integration)
-    elif integration_type == "database":
-        return _test_database_connection(integration)
-    elif integration_type == "file_system":
-        return _test_file_system_connection(integration)
-    elif integration_type == "erp":
-        return _test_erp_connection(integration)
-    elif integration_type == "odoo":
-        return test_odoo_connection(integration)
-    else:
+    run_test = _CONNECTION_TESTS.get(integration_type)
+    if run_test is None:
         return IntegrationTestResult(
             success=False,
             message=f"Unsupported integration type: {integration_type}",
             details={"error": "unsupported_type"}
         )
+    return run_test(integration)
 
 
 def _test_rest_api_connection(integration: Integration) -> IntegrationTestResult:
@@ -394,7 +724,8 @@ def _test_rest_api_connection(integration: Integration) -> IntegrationTestResult
     base_url = config.get("api_url")
     test_endpoint = config.get("test_endpoint", "")
     method = config.get("test_method", "GET").upper()
-    headers = config.get("headers", {})
+    # Copy so auth headers never leak back into the (possibly read-only) config
+    headers = dict(config.get("headers") or {})
     timeout = config.get("timeout", 10)
     
     # Add authentication if provided
@@ -420,10 +751,12 @@ def _test_rest_api_connection(integration: Integration) -> IntegrationTestResult
         start_time = time.time()
         
         if method == "GET":
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = _HTTP_SESSION.get(url, headers=headers, timeout=timeout, stream=True)
         elif method == "POST":
             test_data = config.get("test_data", {})
-            response = requests.post(url, json=test_data, headers=headers, timeout=timeout)
+            if isinstance(test_data, LazyDecryptedConfig):
+                test_data = test_data.to_dict()
+            response = _HTTP_SESSION.post(url, json=test_data, headers=headers, timeout=timeout, stream=True)
         else:
             return IntegrationTestResult(
                 success=False,
@@ -433,27 +766,30 @@ def _test_rest_api_connection(integration: Integration) -> IntegrationTestResult
         
         elapsed_ms = int((time.time() - start_time) * 1000)
         
-        # Check if response is successful
-        if response.status_code < 400:
-            return IntegrationTestResult(
-                success=True,
-                message=f"Connection successful (HTTP {response.status_code})",
-                details={
-                    "status_code": response.status_code,
-                    "latency_ms": elapsed_ms,
-                    "response_size": len(response.content)
-                }
-            )
-        else:
-            return IntegrationTestResult(
-                success=False,
-                message=f"API returned error: HTTP {response.status_code}",
-                details={
-                    "status_code": response.status_code,
-                    "latency_ms": elapsed_ms,
-                    "error": "api_error"
-                }
-            )
+        # The body is streamed and only sized, never buffered; closing the
+        # response releases (or drops) its connection deterministically
+        with response:
+            # Check if response is successful
+            if response.status_code < 400:
+                return IntegrationTestResult(
+                    success=True,
+                    message=f"Connection successful (HTTP {response.status_code})",
+                    details={
+                        "status_code": response.status_code,
+                        "latency_ms": elapsed_ms,
+                        "response_size": _response_size(response)
+                    }
+                )
+            else:
+                return IntegrationTestResult(
+                    success=False,
+                    message=f"API returned error: HTTP {response.status_code}",
+                    details={
+                        "status_code": response.status_code,
+                        "latency_ms": elapsed_ms,
+                        "error": "api_error"
+                    }
+                )
     
     except Timeout:
         return IntegrationTestResult(
@@ -482,6 +818,26 @@ def _test_rest_api_connection(integration: Integration) -> IntegrationTestResult
         )
 
 
+def _response_size(response: requests.Response) -> int:
+    """
+    Size a streamed response body without holding it in memory.
+    
+    Bodies that declare a Content-Length above the cap are not read at all.
+    Anything else is counted chunk by chunk up to the cap; reading a small
+    body to the end lets its connection go back to the pool.
+    """
+    content_length = response.headers.get("Content-Length", "")
+    if content_length.isdigit() and int(content_length) > _RESPONSE_SIZE_CAP:
+        return int(content_length)
+    
+    size = 0
+    for chunk in response.iter_content(chunk_size=8192):
+        size += len(chunk)
+        if size > _RESPONSE_SIZE_CAP:
+            break
+    return size
+
+
 def _test_soap_connection(integration: Integration) -> IntegrationTestResult:
     """Test connection to a SOAP service."""
     # Placeholder for SOAP connection test
@@ -651,6 +1007,17 @@ def test_integration_odoo_connection(integration: Integration) -> IntegrationTes
         )
 
 
+# Connection tests by configured integration type, used by _run_connection_test
+_CONNECTION_TESTS: Dict[str, Callable[[Integration], IntegrationTestResult]] = {
+    "rest_api": _test_rest_api_connection,
+    "soap": _test_soap_connection,
+    "database": _test_database_connection,
+    "file_system": _test_file_system_connection,
+    "erp": _test_erp_connection,
+    "odoo": test_integration_odoo_connection,
+}
+
+
 def sync_odoo_invoices(
     db: Session,
     integration_id: UUID,
@@ -695,11 +1062,9 @@ def sync_odoo_invoices(
                 "message": "Missing configuration for Odoo integration",
                 "invoices_synced": 0
             }
-            
-        # Ensure sensitive fields are decrypted
-        config = decrypt_sensitive_config_fields(config)
         
-        # Create OdooConfig object
+        # Create OdooConfig object. The config from get_integration decrypts on
+        # read, so only the credential for the chosen auth method is decrypted.
         odoo_config = OdooConfig(
             url=config.get("url", ""),
             database=config.get("database", ""),
@@ -953,15 +1318,23 @@ INTEGRATION_TEMPLATES = {
     }
 }
 
+# Read-only view handed to callers, and serialized template configs that are
+# cheaper to turn into fresh deep copies than copy.deepcopy
+_INTEGRATION_TEMPLATES_VIEW = MappingProxyType(INTEGRATION_TEMPLATES)
+_TEMPLATE_CONFIG_BLOBS = {
+    template_id: orjson.dumps(template["config"])
+    for template_id, template in INTEGRATION_TEMPLATES.items()
+}
+
 
-def get_integration_templates() -> Dict[str, Any]:
+def get_integration_templates() -> Mapping[str, Any]:
     """
     Get all available integration templates.
     
     Returns:
-        Dictionary of integration templates
+        Read-only mapping of integration templates
     """
-    return INTEGRATION_TEMPLATES
+    return _INTEGRATION_TEMPLATES_VIEW
 
 
 def get_integration_template(template_id: str) -> Optional[Dict[str, Any]]:
@@ -1001,8 +1374,9 @@ def create_integration_from_template(
     if not template:
         return None
     
-    # Create a copy of the template config
-    config = template["config"].copy()
+    # Create a deep copy of the template config so nested headers/endpoints
+    # are never shared with the template itself
+    config = orjson.loads(_TEMPLATE_CONFIG_BLOBS[template_id])
     
     # Update with provided values
     if config_values:
@@ -1021,6 +1395,66 @@ def create_integration_from_template(
     return create_integration(db, integration_in, user_id)
 
 
+# Allowed values for enumerated config fields
+_VALID_CONFIG_TYPES = frozenset({"rest_api", "soap", "database", "file_system", "erp", "odoo"})
+_VALID_TEST_METHODS = frozenset({"GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"})
+_VALID_AUTH_TYPES = frozenset({"none", "basic", "header", "query", "bearer", "oauth1", "oauth2"})
+_API_KEY_AUTH_TYPES = frozenset({"bearer", "header"})
+
+# Config schemas, compiled into validators once at import time
+_GENERAL_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["type"],
+    "properties": {
+        "type": {"type": "string", "enum": sorted(_VALID_CONFIG_TYPES)},
+        "timeout": {"type": "number", "minimum": 1, "maximum": 300}
+    }
+}
+
+_REST_API_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["api_url"],
+    "properties": {
+        "api_url": {"type": "string", "minLength": 1},
+        "test_endpoint": {"type": "string"},
+        "test_method": {"type": "string", "enum": sorted(_VALID_TEST_METHODS)},
+        "auth_type": {"type": "string", "enum": sorted(_VALID_AUTH_TYPES)},
+        "headers": {"type": "object"},
+        "test_data": {"type": "object"}
+    }
+}
+
+_SOAP_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["service_url"],
+    "properties": {
+        "service_url": {"type": "string", "minLength": 1},
+        "test_endpoint": {"type": "string"},
+        "headers": {"type": "object"}
+    }
+}
+
+# Top-level config fields accepted for any integration type
+_KNOWN_CONFIG_FIELDS = frozenset({
+    "type", "api_url", "service_url", "test_endpoint", "test_method", 
+    "auth_type", "headers", "timeout", "required_fields", "endpoints",
+    "database", "server", "port", "username", "password", "api_key",
+    "client_id", "client_secret", "access_token", "refresh_token",
+    "tenant_id", "organization_id", "account_id", "realm_id",
+    "test_data", "api_key_name", "consumer_key", "consumer_secret",
+    "token", "token_secret", "company_id", "company_db",
+    "url", "auth_method", "version", "rpc_path", "sync_frequency",
+    "invoice_filters", "field_mappings"
+})
+
+# Absolute http(s) URL with a non-empty remainder and no whitespace
+_URL_RE = re.compile(r"^https?://\S+$")
+
+_GENERAL_VALIDATOR = Draft7Validator(_GENERAL_CONFIG_SCHEMA)
+_REST_API_VALIDATOR = Draft7Validator(_REST_API_CONFIG_SCHEMA)
+_SOAP_VALIDATOR = Draft7Validator(_SOAP_CONFIG_SCHEMA)
+
+
 def validate_integration_config(
     config: Dict[str, Any], 
     integration_type: Optional[str] = None
@@ -1045,35 +1479,14 @@ def validate_integration_config(
     if not integration_type and "type" in config:
         integration_type = config.get("type", "").lower()
     
-    # Define general schema that applies to all integration types
-    general_schema = {
-        "type": "object",
-        "required": ["type"],
-        "properties": {
-            "type": {"type": "string", "enum": ["rest_api", "soap", "database", "file_system", "erp", "odoo"]},
-            "timeout": {"type": "number", "minimum": 1, "maximum": 300}
-        }
-    }
-    
-    # Try to validate against general schema
-    try:
-        validate(instance=config, schema=general_schema)
-    except ValidationError as e:
-        errors.append(f"General validation error: {e.message}")
+    # Validate against the general schema, collecting every violation
+    for error in _GENERAL_VALIDATOR.iter_errors(config):
+        errors.append(f"General validation error: {error.message}")
     
     # Specific validation based on integration type
-    if integration_type == "rest_api":
-        errors.extend(_validate_rest_api_config(config))
-    elif integration_type == "soap":
-        errors.extend(_validate_soap_config(config))
-    elif integration_type == "database":
-        errors.extend(_validate_database_config(config))
-    elif integration_type == "file_system":
-        errors.extend(_validate_file_system_config(config))
-    elif integration_type == "erp":
-        errors.extend(_validate_erp_config(config))
-    elif integration_type == "odoo":
-        errors.extend(_validate_odoo_config(config))
+    validate_type = _CONFIG_VALIDATORS.get(integration_type)
+    if validate_type is not None:
+        errors.extend(validate_type(config))
     
     # Check for required fields based on config
     required_fields = config.get("required_fields", [])
@@ -1081,22 +1494,12 @@ def validate_integration_config(
         if field not in config or not config[field]:
             errors.append(f"Required field '{field}' is missing or empty")
     
-    # Check for any unexpected top-level fields
-    known_fields = [
-        "type", "api_url", "service_url", "test_endpoint", "test_method", 
-        "auth_type", "headers", "timeout", "required_fields", "endpoints",
-        "database", "server", "port", "username", "password", "api_key",
-        "client_id", "client_secret", "access_token", "refresh_token",
-        "tenant_id", "organization_id", "account_id", "realm_id",
-        "test_data", "api_key_name", "consumer_key", "consumer_secret",
-        "token", "token_secret", "company_id", "company_db",
-        "url", "auth_method", "version", "rpc_path", "sync_frequency",
-        "invoice_filters", "field_mappings"
-    ]
-    
-    for field in config:
-        if field not in known_fields and not field.startswith("custom_"):
-            errors.append(f"Unknown configuration field: '{field}'")
+    # Check for any unexpected top-level fields; the subset test settles the
+    # usual all-known case without a Python-level loop
+    if not _KNOWN_CONFIG_FIELDS.issuperset(config):
+        for field in config:
+            if field not in _KNOWN_CONFIG_FIELDS and not field.startswith("custom_"):
+                errors.append(f"Unknown configuration field: '{field}'")
     
     return len(errors) == 0, errors
 
@@ -1105,28 +1508,12 @@ def _validate_rest_api_config(config: Dict[str, Any]) -> List[str]:
     """Validate REST API configuration."""
     errors = []
     
-    # Schema for REST API
-    rest_schema = {
-        "type": "object",
-        "required": ["api_url"],
-        "properties": {
-            "api_url": {"type": "string", "minLength": 1},
-            "test_endpoint": {"type": "string"},
-            "test_method": {"type": "string", "enum": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"]},
-            "auth_type": {"type": "string", "enum": ["none", "basic", "header", "query", "bearer", "oauth1", "oauth2"]},
-            "headers": {"type": "object"},
-            "test_data": {"type": "object"}
-        }
-    }
-    
-    try:
-        validate(instance=config, schema=rest_schema)
-    except ValidationError as e:
-        errors.append(f"REST API validation error: {e.message}")
+    for error in _REST_API_VALIDATOR.iter_errors(config):
+        errors.append(f"REST API validation error: {error.message}")
     
     # Check if URL is valid
     api_url = config.get("api_url", "")
-    if api_url and not (api_url.startswith("http://") or api_url.startswith("https://")):
+    if api_url and not _is_http_url(api_url):
         errors.append("API URL must start with http:// or https://")
     
     # Additional auth-specific validation
@@ -1148,36 +1535,28 @@ def _validate_rest_api_config(config: Dict[str, Any]) -> List[str]:
             if field not in config or not config[field]:
                 errors.append(f"OAuth2 requires '{field}'")
     
-    elif auth_type == "bearer" or auth_type == "header":
+    elif auth_type in _API_KEY_AUTH_TYPES:
         if "api_key" not in config or not config["api_key"]:
             errors.append(f"{auth_type.capitalize()} auth requires 'api_key'")
     
     return errors
 
 
+def _is_http_url(value: Any) -> bool:
+    """Check a configured URL is an absolute http(s) URL."""
+    return isinstance(value, str) and _URL_RE.match(value) is not None
+
+
 def _validate_soap_config(config: Dict[str, Any]) -> List[str]:
     """Validate SOAP configuration."""
     errors = []
     
-    # Schema for SOAP
-    soap_schema = {
-        "type": "object",
-        "required": ["service_url"],
-        "properties": {
-            "service_url": {"type": "string", "minLength": 1},
-            "test_endpoint": {"type": "string"},
-            "headers": {"type": "object"}
-        }
-    }
-    
-    try:
-        validate(instance=config, schema=soap_schema)
-    except ValidationError as e:
-        errors.append(f"SOAP validation error: {e.message}")
+    for error in _SOAP_VALIDATOR.iter_errors(config):
+        errors.append(f"SOAP validation error: {error.message}")
     
     # Check if URL is valid
     service_url = config.get("service_url", "")
-    if service_url and not (service_url.startswith("http://") or service_url.startswith("https://")):
+    if service_url and not _is_http_url(service_url):
         errors.append("Service URL must start with http:// or https://")
     
     return errors
@@ -1238,6 +1617,17 @@ def _validate_odoo_config(config: Dict[str, Any]) -> List[str]:
     return errors
 
 
+# Type-specific config validators used by validate_integration_config
+_CONFIG_VALIDATORS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "rest_api": _validate_rest_api_config,
+    "soap": _validate_soap_config,
+    "database": _validate_database_config,
+    "file_system": _validate_file_system_config,
+    "erp": _validate_erp_config,
+    "odoo": _validate_odoo_config,
+}
+
+
 def validate_and_create_integration(
     db: Session, 
     obj_in: IntegrationCreate, 
@@ -1308,12 +1698,17 @@ def get_all_monitored_integrations(db: Session) -> List[Dict[str, Any]]:
     """
     result = []
     
-    for integration_id in _monitoring_threads:
-        thread = _monitoring_threads[integration_id]
-        status = _status_cache.get(integration_id, {})
-        
-        # Only include active monitoring threads
-        if thread.is_alive():
+    # Work from a snapshot so monitors starting or stopping meanwhile can't
+    # break the iteration
+    with _monitor_state_lock:
+        monitored = [
+            (integration_id, task, _status_cache.get(integration_id, {}))
+            for integration_id, task in _monitoring_tasks.items()
+        ]
+    
+    for integration_id, task, status in monitored:
+        # Only include monitors that are still scheduled
+        if not task.done():
             integration = get_integration(db=db, integration_id=UUID(integration_id))
             if integration:
                 result.append({
@@ -1328,69 +1723,119 @@ def get_all_monitored_integrations(db: Session) -> List[Dict[str, Any]]:
     return result
 
 
-def _monitor_integration(db_session, integration_id: UUID, interval_minutes: int):
+def _check_integration_status(integration_id: UUID, interval_minutes: int) -> None:
     """
-    Background task to periodically check integration status.
+    Run one monitoring check for an integration and record the result.
+    
+    Runs on the monitor loop's executor since the connection test and the
+    database session are synchronous.
     
     Args:
-        db_session: SQLAlchemy session factory
-        integration_id: ID of the integration to monitor
-        interval_minutes: Interval between checks in minutes
+        integration_id: ID of the integration to check
+        interval_minutes: Monitoring interval, used to bound how old a shared
+            connection test result may be
     """
+    from app.db.session import SessionLocal
+
     str_id = str(integration_id)
-    
-    while str_id in _monitoring_threads:
-        try:
-            # Create new session for this thread
-            db = db_session()
-            
-            # Test the integration
-            result = test_integration_connection(db=db, integration_id=integration_id)
-            
-            # Update status cache
+
+    # Create new session for this check
+    db = SessionLocal()
+    try:
+        # Test the integration
+        result = test_integration_connection(
+            db=db,
+            integration_id=integration_id,
+            max_age=min(interval_minutes * 60 / 4, 60)
+        )
+        
+        new_status = "active" if result.success else "failed"
+        
+        # Update status cache
+        with _monitor_state_lock:
             _status_cache[str_id] = {
-                "status": "active" if result.success else "failed",
+                "status": new_status,
                 "last_checked": datetime.utcnow(),
                 "message": result.message,
                 "details": result.details or {}
             }
+        
+        # Update integration status in database with a single UPDATE rather than
+        # re-reading the row; steady-state ticks (status unchanged) write nothing
+        updated = db.query(IntegrationModel).filter(
+            IntegrationModel.id == integration_id,
+            IntegrationModel.status != new_status
+        ).update({IntegrationModel.status: new_status}, synchronize_session=False)
+        if updated:
+            db.commit()
+    finally:
+        # Close session even if the test or the update raised
+        db.close()
+
+
+async def _monitor_integration(integration_id: UUID, interval_minutes: int):
+    """
+    Periodically check integration status on the shared monitor loop.
+    
+    Args:
+        integration_id: ID of the integration to monitor
+        interval_minutes: Interval between checks in minutes
+    """
+    str_id = str(integration_id)
+    loop = asyncio.get_running_loop()
+    
+    # Runs until stop_integration_monitoring cancels the task
+    while True:
+        try:
+            await loop.run_in_executor(None, _check_integration_status, integration_id, interval_minutes)
             
-            # Update integration status in database
-            integration = get_integration(db=db, integration_id=integration_id)
-            if integration:
-                update_integration(
-                    db=db,
-                    db_obj=integration,
-                    obj_in=IntegrationUpdate(
-                        status="active" if result.success else "failed"
-                    ),
-                    user_id=None
-                )
-            
-            # Close session
-            db.close()
-            
-            # Sleep until next check
-            time.sleep(interval_minutes * 60)
+            # Sleep until next check, jittered so monitors started together
+            # drift apart instead of waking in lockstep
+            delay = interval_minutes * 60 * random.uniform(0.9, 1.1)
             
         except Exception as e:
             logging.error(f"Error monitoring integration {integration_id}: {str(e)}")
             
             # Update status cache with error
-            _status_cache[str_id] = {
-                "status": "error",
-                "last_checked": datetime.utcnow(),
-                "message": f"Monitoring error: {str(e)}",
-                "details": {"error": "monitoring_error"}
-            }
+            with _monitor_state_lock:
+                _status_cache[str_id] = {
+                    "status": "error",
+                    "last_checked": datetime.utcnow(),
+                    "message": f"Monitoring error: {str(e)}",
+                    "details": {"error": "monitoring_error"}
+                }
             
-            # Sleep before retry
-            time.sleep(300)  # 5 minutes 
-
-
-# Global dictionary to track integration status monitoring
-_monitoring_threads = {}
-_status_cache = {}
+            # Sleep before retry (around 5 minutes)
+            delay = random.uniform(240, 360)
+        
+        await asyncio.sleep(delay)
+
+
+def _get_monitor_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared monitor event loop, starting its thread on first use."""
+    global _monitor_loop
+    with _monitor_loop_lock:
+        if _monitor_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="integration-monitor",
+                daemon=True
+            ).start()
+            _monitor_loop = loop
+        return _monitor_loop
+
+
+# All monitored integrations share one event loop on one daemon thread;
+# _monitoring_tasks maps integration id to its scheduled monitor future
+_monitor_loop: Optional[asyncio.AbstractEventLoop] = None
+_monitor_loop_lock = threading.Lock()
+_monitoring_tasks: Dict[str, Future] = {}
+# Last known status per integration; bounded and aged out so entries for
+# integrations nobody asks about anymore don't accumulate
+_status_cache: TTLCache = TTLCache(maxsize=10_000, ttl=24 * 3600)
+# Guards _monitoring_tasks and _status_cache (cachetools caches aren't thread-safe)
+_monitor_state_lock = threading.RLock()
 
 
 def get_integration_status(
@@ -1416,17 +1861,18 @@ def get_integration_status(
         }
     
     # Get status from cache if available
-    status_info = _status_cache.get(str(integration_id))
-    
-    if not status_info:
-        # If not in cache, create basic status info
-        status_info = {
-            "status": integration.status,
-            "last_checked": integration.last_tested,
-            "message": "Status has not been checked yet",
-            "details": {}
-        }
-        _status_cache[str(integration_id)] = status_info
+    with _monitor_state_lock:
+        status_info = _status_cache.get(str(integration_id))
+        
+        if not status_info:
+            # If not in cache, create basic status info
+            status_info = {
+                "status": integration.status,
+                "last_checked": integration.last_tested,
+                "message": "Status has not been checked yet",
+                "details": {}
+            }
+            _status_cache[str(integration_id)] = status_info
     
     return status_info
 
@@ -1451,20 +1897,17 @@ def start_integration_monitoring(
     if not integration:
         return False
     
-    # Don't start a new thread if already monitoring
+    # Don't schedule a second monitor if already monitoring
     str_id = str(integration_id)
-    if str_id in _monitoring_threads and _monitoring_threads[str_id].is_alive():
-        return True
-    
-    # Create and start monitoring thread
-    monitor_thread = threading.Thread(
-        target=_monitor_integration,
-        args=(db, integration_id, interval_minutes),
-        daemon=True
-    )
-    monitor_thread.start()
-    
-    _monitoring_threads[str_id] = monitor_thread
+    with _monitor_state_lock:
+        task = _monitoring_tasks.get(str_id)
+        if task is not None and not task.done():
+            return True
+        
+        _monitoring_tasks[str_id] = asyncio.run_coroutine_threadsafe(
+            _monitor_integration(integration_id, interval_minutes),
+            _get_monitor_loop()
+        )
     
     # Update integration status
     update_integration(
@@ -1491,6 +1934,28 @@ def stop_integration_monitoring(
     Returns:
         True if monitoring stopped, False otherwise
     """
+    str_id = str(integration_id)
+    
+    # Check if a monitor is scheduled
+    with _monitor_state_lock:
+        task = _monitoring_tasks.pop(str_id, None)
+    if task is None:
+        return False
+    
+    task.cancel()
+    
+    # Get the integration
+    integration = get_integration(db=db, integration_id=integration_id)
+    if integration:
+        # Update status to paused
+        update_integration(
+            db=db,
+            db_obj=integration,
+            obj_in=IntegrationUpdate(status="paused"),
+            user_id=None
+        )
+    
+    return True
 
 
 def export_integration_config(db: Session, integration_id: UUID) -> IntegrationExport:
@@ -1504,24 +1969,19 @@ def export_integration_config(db: Session, integration_id: UUID) -> IntegrationE
     Returns:
         IntegrationExport object with configuration details
     """
-    # Get the integration with decrypted config
-    integration = get_integration(db, integration_id)
+    # Secrets are redacted anyway, so export from the stored (encrypted)
+    # config rather than decrypting it first
+    integration = crud.integration.get(db=db, integration_id=integration_id)
     if not integration:
         raise ValueError(f"Integration with ID {integration_id} not found")
     
-    # Create a copy of the config to modify
-    export_config = integration.config.copy() if integration.config else {}
-    
-    # Remove sensitive fields from the export
-    for field in SENSITIVE_CONFIG_FIELDS:
-        if field in export_config:
-            # Replace with a placeholder to indicate this needs to be provided again
-            export_config[field] = "<REQUIRES_INPUT>"
-        
-        # Also check for nested fields
-        for key in list(export_config.keys()):
-            if isinstance(export_config[key], dict) and field in export_config[key]:
-                export_config[key][field] = "<REQUIRES_INPUT>"
+    # Replace sensitive fields with a placeholder to indicate they need to be
+    # provided again; only the dicts along those paths are copied
+    stored_config = integration.config or {}
+    export_config = _replace_at_paths(
+        dict(stored_config),
+        {path: "<REQUIRES_INPUT>" for path, _ in _iter_sensitive_values(stored_config)}
+    )
     
     # Create the export object
     return IntegrationExport(
@@ -1567,24 +2027,3 @@ def import_integration_config(db: Session, import_data: IntegrationImport, user_
     
     # Create the integration
     return create_integration(db, integration_create, user_id)
-    str_id = str(integration_id)
-    
-    # Check if monitoring thread exists
-    if str_id not in _monitoring_threads:
-        return False
-    
-    # Thread will terminate on its own (daemon)
-    _monitoring_threads.pop(str_id, None)
-    
-    # Get the integration
-    integration = get_integration(db=db, integration_id=integration_id)
-    if integration:
-        # Update status to paused
-        update_integration(
-            db=db,
-            db_obj=integration,
-            obj_in=IntegrationUpdate(status="paused"),
-            user_id=None
-        )
-    
-    return True
\ No newline at end of file
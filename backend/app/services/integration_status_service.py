@@ -8,7 +8,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from sqlalchemy import func, desc, and_, text
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.models.submission import SubmissionRecord, SubmissionStatus
 from app.models.integration import Integration, IntegrationType
@@ -40,7 +40,7 @@ class IntegrationStatusService:
             Dictionary with Odoo connection status
         """
         # Query active Odoo integrations
-        query = db.query(Integration).filter(
+        query = db.query(Integration).options(undefer(Integration.config)).filter(
             Integration.integration_type == IntegrationType.ODOO,
             Integration.is_active == True
         )
@@ -5,8 +5,9 @@ This module provides validation services for invoice data against
 the BIS Billing 3.0 UBL schema and specific Nigerian tax/business rules.
 """
 import logging
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import Callable, List, Dict, Any, FrozenSet, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
+from decimal import Decimal
 from uuid import UUID
 
 from app.schemas.invoice_validation import (
@@ -20,6 +21,68 @@ from app.schemas.invoice_validation import (
 
 logger = logging.getLogger(__name__)
 
+# Rounding tolerance for line amount checks (BIS3-NUM-001)
+_LINE_AMOUNT_TOLERANCE = Decimal("0.01")
+
+
+class CompiledRule(NamedTuple):
+    """
+    Flattened form of a rule dict, as evaluated by validate_invoice.
+    
+    Rule dicts stay the public format (custom rules and the rule management
+    routes use them); these are derived from them.
+    """
+    validator: Callable[[Any], bool]
+    is_error: bool
+    field_path: str
+    error_message: str
+    id: str
+    requires: FrozenSet[str]
+
+
+# Rule validators that need no engine state. These are plain module-level
+# functions rather than lambdas so a call is a single global lookup.
+
+def _rule_invoice_number_present(invoice) -> bool:
+    return bool(invoice.invoice_number.strip())
+
+
+def _rule_invoice_date_present(invoice) -> bool:
+    return invoice.invoice_date is not None
+
+
+def _rule_supplier_present(invoice) -> bool:
+    return invoice.accounting_supplier_party is not None
+
+
+def _rule_customer_present(invoice) -> bool:
+    return invoice.accounting_customer_party is not None
+
+
+def _rule_has_invoice_lines(invoice) -> bool:
+    return len(invoice.invoice_lines) > 0
+
+
+def _rule_checked_by_schema(invoice) -> bool:
+    # Format is already enforced by the Pydantic request model
+    return True
+
+
+def _rule_invoice_date_not_in_future(invoice) -> bool:
+    return invoice.invoice_date <= datetime.now().date()
+
+
+def _rule_standard_vat_rate(invoice) -> bool:
+    for ts in invoice.tax_total.tax_subtotals:
+        if ts.tax_percent == 7.5 and ts.tax_category != "S":
+            return False
+    return True
+
+
+def _rule_supplier_taxid_present(invoice) -> bool:
+    tax_scheme = invoice.accounting_supplier_party.party_tax_scheme
+    return "taxid" in tax_scheme and len(tax_scheme["taxid"]) >= 10
+
 
 class ValidationRuleEngine:
     """
@@ -32,6 +95,8 @@ class ValidationRuleEngine:
     def __init__(self):
         """Initialize the validation rule engine with default rules."""
         self.rules = []
+        self._compiled_rules: Tuple[CompiledRule, ...] = ()
+        self._rule_models: Tuple[ValidationRule, ...] = ()
         self.rule_categories = {
             "required_fields": "Validates presence of required fields",
             "format_validation": "Validates correct format of field values",
@@ -59,6 +124,40 @@ class ValidationRuleEngine:
         
         # Load consistency validation rules
         self._load_consistency_rules()
+
+        self._compile_rules()
+
+    def _compile_rules(self):
+        """
+        Flatten the rule dicts into CompiledRule tuples for validate_invoice.
+
+        The per-invoice loop unpacks these positionally instead of doing five
+        dict lookups and a severity string compare per rule.
+        """
+        self._compiled_rules = tuple(
+            CompiledRule(
+                validator=rule["validator"],
+                is_error=rule["severity"] == "error",
+                field_path=rule["field_path"],
+                error_message=rule["error_message"],
+                id=rule["id"],
+                requires=frozenset(rule.get("requires", ())),
+            )
+            for rule in self.rules
+        )
+        # Rule metadata served by get_all_rules, built once per compile
+        self._rule_models = tuple(
+            ValidationRule(
+                id=rule["id"],
+                name=rule["name"],
+                description=rule["description"],
+                severity=rule["severity"],
+                category=rule["category"],
+                field_path=rule["field_path"],
+                source=rule["source"]
+            )
+            for rule in self.rules
+        )
         
     def _load_bis3_required_field_rules(self):
         """Load required field validation rules from BIS Billing 3.0 standard."""
@@ -70,7 +169,7 @@ class ValidationRuleEngine:
             "category": "required_fields",
             "field_path": "invoice_number",
             "source": "BIS3",
-            "validator": lambda invoice: bool(invoice.invoice_number.strip()),
+            "validator": _rule_invoice_number_present,
             "error_message": "Invoice number is required and cannot be empty"
         })
         
@@ -82,7 +181,7 @@ class ValidationRuleEngine:
             "category": "required_fields",
             "field_path": "invoice_date",
             "source": "BIS3",
-            "validator": lambda invoice: invoice.invoice_date is not None,
+            "validator": _rule_invoice_date_present,
             "error_message": "Invoice date is required"
         })
         
@@ -94,7 +193,7 @@ class ValidationRuleEngine:
             "category": "required_fields",
             "field_path": "accounting_supplier_party",
             "source": "BIS3",
-            "validator": lambda invoice: invoice.accounting_supplier_party is not None,
+            "validator": _rule_supplier_present,
             "error_message": "Seller information is required"
         })
         
@@ -106,7 +205,7 @@ class ValidationRuleEngine:
             "category": "required_fields",
             "field_path": "accounting_customer_party",
             "source": "BIS3",
-            "validator": lambda invoice: invoice.accounting_customer_party is not None,
+            "validator": _rule_customer_present,
             "error_message": "Buyer information is required"
         })
         
@@ -118,7 +217,7 @@ class ValidationRuleEngine:
             "category": "required_fields",
             "field_path": "invoice_lines",
             "source": "BIS3",
-            "validator": lambda invoice: len(invoice.invoice_lines) > 0,
+            "validator": _rule_has_invoice_lines,
             "error_message": "At least one invoice line is required"
         })
         
@@ -134,6 +233,7 @@ class ValidationRuleEngine:
             "field_path": "accounting_supplier_party.party_legal_entity.company_id",
             "source": "FIRS",
             "validator": self._validate_tin,
+            "requires": ["accounting_supplier_party"],
             "error_message": "Seller must have a valid 14-digit Nigerian TIN"
         })
         
@@ -146,6 +246,7 @@ class ValidationRuleEngine:
             "field_path": "accounting_customer_party.party_legal_entity.company_id",
             "source": "FIRS",
             "validator": self._validate_buyer_tin,
+            "requires": ["accounting_customer_party"],
             "error_message": "B2B invoices require buyer to have a valid Nigerian TIN"
         })
         
@@ -159,6 +260,7 @@ class ValidationRuleEngine:
             "field_path": "invoice_number",
             "source": "FIRS",
             "validator": self._validate_invoice_number_format,
+            "requires": ["invoice_number"],
             "error_message": "Invoice number must contain only alphanumeric characters, maximum 50 characters"
         })
         
@@ -171,7 +273,7 @@ class ValidationRuleEngine:
             "category": "firs_specific",
             "field_path": "currency_code",
             "source": "FIRS",
-            "validator": lambda invoice: self._validate_primary_currency(invoice),
+            "validator": self._validate_primary_currency,
             "error_message": "Primary currency must be NGN for domestic transactions"
         })
         
@@ -185,6 +287,7 @@ class ValidationRuleEngine:
             "field_path": "accounting_supplier_party.postal_address",
             "source": "FIRS",
             "validator": self._validate_nigerian_address,
+            "requires": ["accounting_supplier_party"],
             "error_message": "Seller must have a valid Nigerian address with state and LGA for domestic invoices"
         })
         
@@ -239,7 +342,7 @@ class ValidationRuleEngine:
             "category": "ubl_schema",
             "field_path": "invoice_date,due_date,tax_point_date,delivery_date",
             "source": "UBL",
-            "validator": lambda invoice: True,  # Date validation handled by Pydantic
+            "validator": _rule_checked_by_schema,  # Date validation handled by Pydantic
             "error_message": "Dates must conform to ISO 8601 format (YYYY-MM-DD)"
         })
         
@@ -252,7 +355,7 @@ class ValidationRuleEngine:
             "category": "ubl_schema",
             "field_path": "legal_monetary_total,invoice_lines",
             "source": "UBL",
-            "validator": lambda invoice: True,  # Decimal validation handled by Pydantic
+            "validator": _rule_checked_by_schema,  # Decimal validation handled by Pydantic
             "error_message": "Monetary values must have maximum 2 decimal places"
         })
     
@@ -267,7 +370,8 @@ class ValidationRuleEngine:
             "category": "date_validation",
             "field_path": "invoice_date",
             "source": "BIS3",
-            "validator": lambda invoice: invoice.invoice_date <= datetime.now().date(),
+            "validator": _rule_invoice_date_not_in_future,
+            "requires": ["invoice_date"],
             "error_message": "Invoice date cannot be in the future"
         })
         
@@ -280,10 +384,7 @@ class ValidationRuleEngine:
             "category": "tax_validation",
             "field_path": "tax_total.tax_subtotals",
             "source": "FIRS",
-            "validator": lambda invoice: all(
-                ts.tax_percent != 7.5 or ts.tax_category == "S" 
-                for ts in invoice.tax_total.tax_subtotals
-            ),
+            "validator": _rule_standard_vat_rate,
             "error_message": "Standard VAT rate in Nigeria must be 7.5%"
         })
         
@@ -296,10 +397,8 @@ class ValidationRuleEngine:
             "category": "numeric_validation",
             "field_path": "invoice_lines",
             "source": "BIS3",
-            "validator": lambda invoice: all(
-                abs((line.invoiced_quantity * line.price_amount / line.base_quantity) - line.line_extension_amount) <= 0.01
-                for line in invoice.invoice_lines
-            ),
+            "validator": self._validate_line_amounts,
+            "requires": ["invoice_lines"],
             "error_message": "Line amount calculation is incorrect"
         })
         
@@ -312,8 +411,8 @@ class ValidationRuleEngine:
             "category": "identification",
             "field_path": "accounting_supplier_party.party_tax_scheme",
             "source": "FIRS",
-            "validator": lambda invoice: "taxid" in invoice.accounting_supplier_party.party_tax_scheme 
-                and len(invoice.accounting_supplier_party.party_tax_scheme["taxid"]) >= 10,
+            "validator": _rule_supplier_taxid_present,
+            "requires": ["accounting_supplier_party"],
             "error_message": "Seller must have a valid Nigerian Tax Identification Number (TIN)"
         })
     
@@ -324,55 +423,67 @@ class ValidationRuleEngine:
         Returns:
             List of ValidationRule objects
         """
-        return [
-            ValidationRule(
-                id=rule["id"],
-                name=rule["name"],
-                description=rule["description"],
-                severity=rule["severity"],
-                category=rule["category"],
-                field_path=rule["field_path"],
-                source=rule["source"]
-            )
-            for rule in self.rules
-        ]
+        if len(self._rule_models) != len(self.rules):
+            self._compile_rules()
+        return list(self._rule_models)
     
-    def validate_invoice(self, invoice: InvoiceValidationRequest) -> InvoiceValidationResponse:
+    def validate_invoice(
+        self,
+        invoice: InvoiceValidationRequest,
+        fail_fast: bool = False
+    ) -> InvoiceValidationResponse:
         """
         Validate an invoice against all rules.
         
+        Rules listing fields under "requires" are skipped once an error rule
+        on one of those fields has failed, since they would only report the
+        same problem again (usually as an exception).
+        
         Args:
             invoice: Invoice data to validate
+            fail_fast: Stop at the first error instead of collecting them all
             
         Returns:
             Validation response with errors and warnings
         """
         errors = []
         warnings = []
-        
-        for rule in self.rules:
+        failed_fields = set()
+
+        # Rules appended to self.rules after load (custom rules) trigger a
+        # recompile so they are never skipped.
+        if len(self._compiled_rules) != len(self.rules):
+            self._compile_rules()
+
+        for validator, is_error, field_path, error_message, rule_id, requires in self._compiled_rules:
+            if requires and not failed_fields.isdisjoint(requires):
+                continue
             try:
-                is_valid = rule["validator"](invoice)
-                if not is_valid:
+                if not validator(invoice):
                     validation_error = ValidationError(
-                        field=rule["field_path"],
-                        error=rule["error_message"],
-                        error_code=rule["id"]
+                        field=field_path,
+                        error=error_message,
+                        error_code=rule_id
                     )
                     
-                    if rule["severity"] == "error":
+                    if is_error:
                         errors.append(validation_error)
+                        failed_fields.add(field_path)
                     else:
                         warnings.append(validation_error)
             except Exception as e:
-                logger.error(f"Error applying rule {rule['id']}: {str(e)}")
+                logger.error(f"Error applying rule {rule_id}: {str(e)}")
                 errors.append(
                     ValidationError(
-                        field=rule["field_path"],
+                        field=field_path,
                         error=f"Validation error: {str(e)}",
-                        error_code=rule["id"]
+                        error_code=rule_id
                     )
                 )
+                failed_fields.add(field_path)
+            
+            if fail_fast and errors:
+                break
         
         # Create validation response
         return InvoiceValidationResponse(
@@ -393,20 +504,16 @@ class ValidationRuleEngine:
         Returns:
             Batch validation response
         """
-        results = []
-        valid_count = 0
-        
-        for invoice in batch_request.invoices:
-            validation_result = self.validate_invoice(invoice)
-            results.append(validation_result)
-            
-            if validation_result.valid:
-                valid_count += 1
+        invoices = batch_request.invoices
+        fail_fast = batch_request.fail_fast
+        results = [self.validate_invoice(invoice, fail_fast=fail_fast) for invoice in invoices]
+
+        valid_count = sum(1 for result in results if result.valid)
         
         return BatchValidationResponse(
-            total_count=len(batch_request.invoices),
+            total_count=len(invoices),
             valid_count=valid_count,
-            invalid_count=len(batch_request.invoices) - valid_count,
+            invalid_count=len(invoices) - valid_count,
             validation_timestamp=datetime.utcnow(),
             results=results
         )
@@ -482,6 +589,15 @@ class ValidationRuleEngine:
             
         return True
     
+    def _validate_line_amounts(self, invoice):
+        """Validate that each line amount equals quantity * unit price / base quantity."""
+        tolerance = _LINE_AMOUNT_TOLERANCE
+        for line in invoice.invoice_lines:
+            expected = line.invoiced_quantity * line.price_amount / line.base_quantity
+            if abs(expected - line.line_extension_amount) > tolerance:
+                return False
+        return True
+    
     def _validate_primary_currency(self, invoice):
         """Validate that primary currency is NGN for domestic transactions."""
         # If both parties are Nigerian, currency should be NGN
@@ -598,17 +714,21 @@ class ValidationRuleEngine:
 validation_engine = ValidationRuleEngine()
 
 
-def validate_invoice(invoice: InvoiceValidationRequest) -> InvoiceValidationResponse:
+def validate_invoice(
+    invoice: InvoiceValidationRequest,
+    fail_fast: bool = False
+) -> InvoiceValidationResponse:
     """
     Validate an invoice against BIS Billing 3.0 and FIRS requirements.
     
     Args:
         invoice: Invoice data to validate
+        fail_fast: Stop at the first error instead of collecting them all
         
     Returns:
         Validation response with errors and warnings
     """
-    return validation_engine.validate_invoice(invoice)
+    return validation_engine.validate_invoice(invoice, fail_fast=fail_fast)
 
 
 def validate_invoice_batch(batch_request: BatchValidationRequest) -> BatchValidationResponse:
@@ -14,20 +14,22 @@ import uuid
 import hashlib
 import hmac
 import base64
-import json
+import orjson
 import logging
 import secrets
 import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import Tuple, Dict, Any, Optional, List, Union, Set
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.db.session import no_expire_on_commit
 from app.models.irn import IRNRecord, InvoiceData, IRNValidationRecord, IRNStatus
 from app.models.user import User
 from app.models.organization import Organization
 from app.schemas.irn import IRNCreate, IRNBatchGenerateRequest
-from app.cache.irn_cache import IRNCache
+from app.cache.irn_cache import IRNCache, VERIFICATION_CACHE_EXPIRY
 from app.services.firs_si.odoo_service import fetch_odoo_invoices
 
 logger = logging.getLogger(__name__)
@@ -44,7 +46,7 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         Tuple containing (irn_value, verification_code, hash_value)
     """
     # Import the IRN generator
-    from app.utils.irn_generator import generate_firs_irn
+    from app.utils.irn_generator import generate_firs_irn, generate_verification_code, HASH_V2_PREFIX
     
     try:
         # Generate IRN using the enhanced FIRS-compliant generator
@@ -66,8 +68,8 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         
         # Fallback to legacy method if new implementation fails
         # This ensures backward compatibility
-        unique_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        unique_id = uuid.uuid4().hex
+        timestamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
         
         # Extract key invoice fields for the hash
         invoice_number = invoice_data.get('invoice_number', '')
@@ -79,18 +81,14 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         data_to_hash = f"{invoice_number}|{invoice_date}|{customer_tax_id}|{total_amount}|{timestamp}|{unique_id}"
         
         # Create a hash of the invoice data for verification
-        hash_value = hashlib.sha256(data_to_hash.encode()).hexdigest()
+        hash_value = HASH_V2_PREFIX + hashlib.blake2b(data_to_hash.encode(), digest_size=32).hexdigest()
         
         # Generate a verification code using HMAC and a secret key
-        verification_code = hmac.new(
-            settings.SECRET_KEY.encode(),
-            hash_value.encode(),
-            hashlib.sha256
-        ).hexdigest()[:12]  # Take first 12 characters for brevity
+        verification_code = generate_verification_code(hash_value, 12)
         
         # Construct the IRN value with legacy format
-        # Format: IRN-{timestamp}-{first 8 chars of unique_id}-{first 6 chars of hash}
-        irn_value = f"IRN-{timestamp}-{unique_id[:8]}-{hash_value[:6]}".upper()
+        # Format: IRN-{timestamp}-{first 8 chars of unique_id}-{first 6 chars of the digest}
+        irn_value = f"IRN-{timestamp}-{unique_id[:8]}-{hash_value[len(HASH_V2_PREFIX):][:6]}".upper()
         
         # Log fallback to legacy method
         logger.warning(f"Used legacy IRN generation for invoice: {invoice_data.get('invoice_number', '')}")  
@@ -98,6 +96,53 @@ def generate_irn(invoice_data: Dict[str, Any]) -> Tuple[str, str, str]:
         return irn_value, verification_code, hash_value
 
 
+def _verify_irn_record(
+    irn_record: IRNRecord,
+    verification_code: str,
+    invoice_data: Dict[str, Any]
+) -> Tuple[bool, str]:
+    """Check a stored IRN against the provided verification code and invoice data."""
+    # Status checks come first so expired/revoked IRNs are rejected
+    # without touching the verification code
+    if irn_record.valid_until and irn_record.valid_until < datetime.utcnow():
+        return False, "IRN has expired"
+    
+    # Check if the IRN is revoked
+    if irn_record.status == IRNStatus.REVOKED:
+        return False, "IRN has been revoked"
+    
+    # Check if verification code matches, in constant time
+    stored_code = irn_record.verification_code
+    if not stored_code or not hmac.compare_digest(
+        (verification_code or "").encode(),
+        stored_code.encode()
+    ):
+        return False, "Invalid verification code"
+    
+    # If stored invoice data exists, verify it against the provided data
+    stored_data = irn_record.invoice_data
+    if stored_data:
+        # Verify key invoice details
+        if stored_data.invoice_number != invoice_data.get('invoice_number'):
+            return False, "Invoice number mismatch"
+    
+        if stored_data.total_amount != invoice_data.get('total_amount'):
+            return False, "Invoice amount mismatch"
+    
+        # More detailed validations could be added here
+    
+    return True, "IRN verification successful"
+
+
+def _verification_cache_expiry(irn_record: IRNRecord) -> int:
+    """Seconds a verification result for this IRN may be reused; never past valid_until."""
+    if not irn_record.valid_until:
+        return VERIFICATION_CACHE_EXPIRY
+    
+    remaining = (irn_record.valid_until - datetime.utcnow()).total_seconds()
+    return min(VERIFICATION_CACHE_EXPIRY, int(remaining))
+
+
 def verify_irn(
     db: Session,
     irn_value: str,
@@ -117,36 +162,23 @@ def verify_irn(
         Tuple containing (is_valid, message)
     """
     try:
-        # First, check if this IRN exists in the database for quick validation
-        irn_record = db.query(IRNRecord).filter(IRNRecord.irn_value == irn_value).first()
+        # Results are cached per IRN, code and invoice data, so repeated
+        # verifications skip the database
+        cached = IRNCache.get_cached_verification(irn_value, verification_code, invoice_data)
+        if cached is not None:
+            return cached
+        
+        # First, check if this IRN exists in the database for quick validation;
+        # the IRN is the primary key, so this checks the identity map first
+        irn_record = db.get(IRNRecord, irn_value)
         
         if irn_record:
-            # Check if the IRN has expired
-            if irn_record.expiration_date and irn_record.expiration_date < datetime.utcnow():
-                return False, "IRN has expired"
-            
-            # Check if the IRN is revoked
-            if irn_record.status == IRNStatus.REVOKED:
-                return False, "IRN has been revoked"
-            
-            # Check if verification code matches
-            if verification_code != irn_record.verification_code:
-                return False, "Invalid verification code"
-            
-            # If stored invoice data exists, verify it against the provided data
-            if irn_record.invoice_data:
-                stored_data = decode_invoice_data(irn_record.invoice_data)
-                
-                # Verify key invoice details
-                if stored_data.get('invoice_number') != invoice_data.get('invoice_number'):
-                    return False, "Invoice number mismatch"
-                
-                if stored_data.get('total_amount') != invoice_data.get('total_amount'):
-                    return False, "Invoice amount mismatch"
-                
-                # More detailed validations could be added here
-            
-            return True, "IRN verification successful"
+            result = _verify_irn_record(irn_record, verification_code, invoice_data)
+            IRNCache.cache_verification(
+                irn_value, verification_code, invoice_data, result,
+                expiry=_verification_cache_expiry(irn_record)
+            )
+            return result
         
         # If not in database, determine if it's a FIRS-formatted IRN or a legacy IRN
         if irn_value.startswith("IRN-"):
@@ -202,25 +234,20 @@ def expire_outdated_irns(db: Session) -> int:
     """
     now = datetime.utcnow()
     
-    # Find all active IRNs that have expired
-    expired_irns = (
+    # Expire all active IRNs past their validity in a single UPDATE
+    expired_count = (
         db.query(IRNRecord)
         .filter(
             IRNRecord.status == IRNStatus.ACTIVE,
-            IRNRecord.expires_at < now
+            IRNRecord.valid_until < now
         )
-        .all()
+        .update({IRNRecord.status: IRNStatus.EXPIRED}, synchronize_session=False)
     )
     
-    # Update their status to expired
-    for irn in expired_irns:
-        irn.status = IRNStatus.EXPIRED
-        db.add(irn)
-    
-    if expired_irns:
+    if expired_count:
         db.commit()
     
-    return len(expired_irns)
+    return expired_count
 
 
 def encode_invoice_data(invoice_data: Dict[str, Any]) -> str:
@@ -236,8 +263,9 @@ def encode_invoice_data(invoice_data: Dict[str, Any]) -> str:
     """
     # For simplicity, we'll just create a string representation
     # In a production environment, this would use encryption
-    import json
-    return json.dumps(invoice_data)
+    # orjson also handles the datetimes/UUIDs invoice payloads carry; non-str
+    # keys are stringified as json.dumps did
+    return orjson.dumps(invoice_data, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 def decode_invoice_data(encoded_data: str) -> Dict[str, Any]:
@@ -252,8 +280,7 @@ def decode_invoice_data(encoded_data: str) -> Dict[str, Any]:
     """
     # For simplicity, we'll just parse the JSON
     # In a production environment, this would use decryption
-    import json
-    return json.loads(encoded_data)
+    return orjson.loads(encoded_data)
 
 
 def create_validation_record(
@@ -300,9 +327,11 @@ def create_validation_record(
         response_data=response_data
     )
     
+    # Every column is set above, so the row needs no refresh, and the
+    # caller's loaded IRN record stays usable after the commit
     db.add(validation_record)
-    db.commit()
-    db.refresh(validation_record)
+    with no_expire_on_commit(db):
+        db.commit()
     
     return validation_record
 
@@ -5,11 +5,21 @@ This module provides functionality for collecting and calculating metrics
 for the monitoring dashboard, including IRN generation, validation,
 and Odoo integration metrics.
 """
+import asyncio
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union
-from sqlalchemy import func, desc, and_, or_, text
-from sqlalchemy.orm import Session
+from functools import wraps
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
+from cachetools import TTLCache # type: ignore
+from sqlalchemy import String, case, cast, column, func, desc, and_, or_, select, table, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, get_engine_kwargs
 
 from app.models.irn import IRNRecord, IRNValidationRecord, IRNStatus
 from app.models.validation import ValidationRecord
@@ -23,6 +33,403 @@ from app.models.transmission_status_log import TransmissionStatusLog
 
 logger = logging.getLogger(__name__)
 
+# Status keys reported in IRN metrics. "used" and "cancelled" are not IRNStatus
+# members but are part of the dashboard payload, so they are always reported.
+IRN_METRIC_STATUSES = tuple(status.value for status in IRNStatus) + ("used", "cancelled")
+
+
+# Look-back window of each dashboard time range; "all" has no lower bound
+_TIME_DELTAS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30)
+}
+
+
+def _time_threshold(now: datetime, time_range: str) -> datetime:
+    """Start of the ``time_range`` window ending at ``now``."""
+    delta = _TIME_DELTAS.get(time_range)
+    return now - delta if delta is not None else datetime.min
+
+
+def _filtered_base_query(
+    db: Session,
+    model: Any,
+    time_column: Any,
+    time_range: str,
+    time_threshold: datetime,
+    organization_id: Optional[str] = None,
+    integration_join: Any = None
+) -> Query:
+    """
+    Query ``model`` rows inside the time range.
+    
+    When ``organization_id`` is given the rows are joined to integrations on
+    ``integration_join`` and limited to that organization.
+    """
+    query = db.query(model)
+    if time_range != "all":
+        query = query.filter(time_column >= time_threshold)
+    if organization_id and integration_join is not None:
+        query = query.join(Integration, integration_join).filter(
+            Integration.organization_id == organization_id
+        )
+    return query
+
+
+# Dashboards poll the same aggregates repeatedly, so results are reused for a
+# short window keyed by (method, time_range, organization_id)
+METRICS_CACHE_TTL = 60
+_metrics_cache: TTLCache = TTLCache(maxsize=1024, ttl=METRICS_CACHE_TTL)
+_metrics_cache_lock = threading.Lock()
+
+
+# Hourly delta rows appended by the triggers from the 019_dashboard_metrics_rollup
+# migration; one logical counter is the SUM of cnt over its rows
+METRICS_ROLLUP = table(
+    "dashboard_metrics_rollup", column("bucket_hour"), column("metric"),
+    column("integration_id"), column("dim"), column("cnt")
+)
+METRICS_ROLLUP_PARTITION_DAYS_AHEAD = 7
+
+# Merge the delta rows of every counter that has more than one row
+_COMPACT_METRICS_ROLLUP = text("""
+    WITH split AS (
+        SELECT bucket_hour, metric, integration_id, dim
+        FROM dashboard_metrics_rollup
+        GROUP BY 1, 2, 3, 4
+        HAVING count(*) > 1
+    ), moved AS (
+        DELETE FROM dashboard_metrics_rollup r
+        USING split s
+        WHERE r.bucket_hour = s.bucket_hour AND r.metric = s.metric
+          AND r.integration_id = s.integration_id AND r.dim = s.dim
+        RETURNING r.bucket_hour, r.metric, r.integration_id, r.dim, r.cnt
+    )
+    INSERT INTO dashboard_metrics_rollup (bucket_hour, metric, integration_id, dim, cnt)
+    SELECT bucket_hour, metric, integration_id, dim, sum(cnt)
+    FROM moved
+    GROUP BY 1, 2, 3, 4
+    HAVING sum(cnt) <> 0
+""")
+
+_ROLLUP_PARTITIONS = text("""
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = 'dashboard_metrics_rollup'
+""")
+
+
+def _cached_metrics(method: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Cache a dashboard metrics method on every argument except the session."""
+    @wraps(method)
+    def wrapper(db: Session, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        cache_key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        with _metrics_cache_lock:
+            cached = _metrics_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = method(db, *args, **kwargs)
+        with _metrics_cache_lock:
+            _metrics_cache[cache_key] = result
+        return result
+    return wrapper
+
+
+def clear_metrics_cache() -> None:
+    """Drop all cached dashboard metrics."""
+    with _metrics_cache_lock:
+        _metrics_cache.clear()
+
+
+def _hour_buckets(now: datetime, hours: int = 24) -> List[Tuple[datetime, datetime]]:
+    """Return the [start, end) ranges of the past ``hours`` hours, newest first."""
+    return [
+        (now - timedelta(hours=offset + 1), now - timedelta(hours=offset))
+        for offset in range(hours)
+    ]
+
+
+def _day_buckets(now: datetime, days: int = 30) -> List[Tuple[datetime, datetime]]:
+    """Return the [start, end) ranges of the past ``days`` whole days, newest first."""
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        (midnight - timedelta(days=offset + 1), midnight - timedelta(days=offset))
+        for offset in range(days)
+    ]
+
+
+def _bucket_totals(
+    db: Session,
+    query: Query,
+    column: Any,
+    buckets: List[Tuple[datetime, datetime]],
+    *sum_columns: Any
+) -> List[Tuple[int, ...]]:
+    """
+    Aggregate ``query`` over contiguous time buckets with a single GROUP BY.
+    
+    Each row is assigned the index of the first bucket (newest first) whose
+    start it is not before, so one statement replaces a COUNT per bucket.
+    
+    Args:
+        db: Database session
+        query: Filtered query to aggregate
+        column: Timestamp column the buckets apply to
+        buckets: Contiguous [start, end) ranges, newest first
+        sum_columns: Expressions to sum per bucket alongside the row count
+        
+    Returns:
+        For each bucket, the row count followed by each column's sum
+    """
+    bucket = case(
+        *((column >= start, index) for index, (start, _) in enumerate(buckets))
+    ).label("bucket")
+    values = [expr.label(f"value_{i}") for i, expr in enumerate(sum_columns)]
+    
+    windowed = query.filter(column >= buckets[-1][0], column < buckets[0][1])
+    rows_per_bucket = windowed.with_entities(bucket, *values).subquery()
+    
+    grouped = db.query(
+        rows_per_bucket.c.bucket,
+        func.count(),
+        *(func.coalesce(func.sum(rows_per_bucket.c[value.name]), 0) for value in values)
+    ).group_by(rows_per_bucket.c.bucket).all()
+    
+    totals = [(0,) * (len(values) + 1) for _ in buckets]
+    for index, *aggregates in grouped:
+        totals[index] = tuple(int(aggregate) for aggregate in aggregates)
+    return totals
+
+
+def _b2b_flag(invoice_data: Any) -> Any:
+    """
+    SQL expression that is 1 for B2B invoices and 0 otherwise.
+    
+    An invoice counts as B2B when its customer has a non-empty TIN or VAT
+    number, evaluated with the database's JSON path operators.
+    """
+    customer_tax_id = func.coalesce(
+        func.nullif(invoice_data[("customer", "tax_id")].as_string(), ""),
+        func.nullif(invoice_data[("customer", "vat")].as_string(), "")
+    )
+    return case((customer_tax_id.isnot(None), 1), else_=0)
+
+
+def _is_postgresql(db: Session) -> bool:
+    """Whether the session is bound to a PostgreSQL database."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _common_error_counts(
+    db: Session,
+    failed_query: Query,
+    issues_column: Any,
+    time_column: Any,
+    sample_size: int = 100,
+    limit: int = 10
+) -> List[Tuple[str, int]]:
+    """
+    Count error codes across the issues of the most recent failed validations.
+    
+    On PostgreSQL the issues arrays are unnested with jsonb_array_elements and
+    grouped in the database, so only the top ``limit`` codes are returned.
+    Other dialects parse the sampled issues in Python.
+    """
+    recent = failed_query.with_entities(issues_column.label("issues")).order_by(
+        desc(time_column)
+    ).limit(sample_size)
+    
+    if _is_postgresql(db):
+        sample = recent.subquery()
+        issues = cast(sample.c.issues, JSONB)
+        elements = select(func.jsonb_array_elements(issues).label("issue")).where(
+            func.jsonb_typeof(issues) == "array"
+        ).subquery()
+        error_code = func.coalesce(elements.c.issue.op("->>")("error_code"), "unknown").label("error_code")
+        error_count = func.count().label("error_count")
+        statement = select(error_code, error_count).group_by(error_code).order_by(
+            desc(error_count)
+        ).limit(limit)
+        return [(code, int(count)) for code, count in db.execute(statement).all()]
+    
+    error_counts: Dict[str, int] = {}
+    for (issues,) in recent.all():
+        if isinstance(issues, str):
+            # If stored as string, try to parse
+            try:
+                issues = json.loads(issues)
+            except ValueError:
+                issues = []
+        for issue in issues or []:
+            error_type = issue.get("error_code", "unknown")
+            error_counts[error_type] = error_counts.get(error_type, 0) + 1
+    return sorted(error_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def _latest_rows(
+    db: Session,
+    key_column: Any,
+    time_column: Any,
+    keys: List[Any],
+    *columns: Any
+) -> Dict[Any, Tuple[Any, ...]]:
+    """
+    Most recent values of ``columns`` for each key, fetched in one query.
+    
+    Rows are ranked per key with ROW_NUMBER() ordered by ``time_column``, which
+    works on both PostgreSQL and SQLite. Keys without rows are left out.
+    """
+    if not keys:
+        return {}
+    
+    ranked = db.query(
+        key_column.label("key"),
+        *(column.label(f"value_{index}") for index, column in enumerate(columns)),
+        func.row_number().over(
+            partition_by=key_column,
+            order_by=desc(time_column)
+        ).label("row_number")
+    ).filter(key_column.in_(keys)).subquery()
+    
+    rows = db.query(
+        ranked.c.key,
+        *(ranked.c[f"value_{index}"] for index in range(len(columns)))
+    ).filter(ranked.c.row_number == 1).all()
+    return {key: tuple(values) for key, *values in rows}
+
+
+def _use_metrics_rollup(db: Session, time_range: str) -> bool:
+    """Whether totals for ``time_range`` can be read from the PostgreSQL rollup table."""
+    if not settings.METRICS_ROLLUP_ENABLED or not _is_postgresql(db):
+        return False
+    # Expired partitions are dropped, so all-time totals need the base tables
+    return time_range != "all" or settings.METRICS_ROLLUP_RETENTION_DAYS <= 0
+
+
+def _rollup_totals(
+    db: Session,
+    metric: str,
+    time_range: str,
+    time_threshold: datetime,
+    organization_id: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Sum a rollup metric per dimension over the time range.
+    
+    Rollup buckets are whole hours, so the window starts at the top of the
+    hour containing ``time_threshold``.
+    """
+    query = db.query(METRICS_ROLLUP.c.dim, func.sum(METRICS_ROLLUP.c.cnt)).filter(
+        METRICS_ROLLUP.c.metric == metric
+    )
+    if time_range != "all":
+        query = query.filter(METRICS_ROLLUP.c.bucket_hour >= func.date_trunc("hour", time_threshold))
+    if organization_id:
+        query = query.join(
+            Integration,
+            METRICS_ROLLUP.c.integration_id == cast(Integration.id, String)
+        ).filter(Integration.organization_id == organization_id)
+    return {dim: int(total or 0) for dim, total in query.group_by(METRICS_ROLLUP.c.dim).all()}
+
+
+def maintain_metrics_rollup(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Compact the rollup table and manage its daily partitions.
+    
+    Delta rows are merged into one row per counter, partitions are created
+    ahead for the next METRICS_ROLLUP_PARTITION_DAYS_AHEAD days and, when
+    METRICS_ROLLUP_RETENTION_DAYS is set, expired partitions are dropped.
+    """
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    db.execute(_COMPACT_METRICS_ROLLUP)
+    db.commit()
+    
+    for offset in range(1, METRICS_ROLLUP_PARTITION_DAYS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        try:
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS dashboard_metrics_rollup_{day:%Y%m%d} "
+                f"PARTITION OF dashboard_metrics_rollup "
+                f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+            ))
+            db.commit()
+        except Exception as e:
+            # Rows for that day already sit in the default partition
+            logger.warning(f"Could not create rollup partition for {day.date()}: {str(e)}")
+            db.rollback()
+    
+    retention_days = settings.METRICS_ROLLUP_RETENTION_DAYS
+    if retention_days > 0:
+        expiry = today - timedelta(days=retention_days)
+        for (partition,) in db.execute(_ROLLUP_PARTITIONS).all():
+            suffix = partition.rsplit("_", 1)[-1]
+            if suffix.isdigit() and datetime.strptime(suffix, "%Y%m%d") < expiry:
+                db.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+        db.execute(
+            text("DELETE FROM dashboard_metrics_rollup_default WHERE bucket_hour < :expiry"),
+            {"expiry": expiry}
+        )
+        db.commit()
+
+
+def _maintain_metrics_rollup() -> None:
+    """Maintain the rollup table with a dedicated session."""
+    db = SessionLocal()
+    try:
+        if settings.METRICS_ROLLUP_ENABLED and _is_postgresql(db):
+            maintain_metrics_rollup(db)
+    except Exception:
+        logger.exception("Failed to maintain the dashboard metrics rollup")
+        db.rollback()
+    finally:
+        db.close()
+
+
+async def maintain_metrics_rollups() -> None:
+    """
+    Compact the dashboard metrics rollup and manage its partitions.
+    
+    Runs as a periodic background task every METRICS_ROLLUP_MAINTENANCE_INTERVAL
+    seconds; a no-op unless the rollup is in use. The work runs in a worker
+    thread so the event loop is not blocked.
+    """
+    await asyncio.to_thread(_maintain_metrics_rollup)
+
+
+# Dashboard sections run on one shared, bounded executor so that concurrent
+# dashboard requests together hold at most half of the connection pool
+_dashboard_executor: Optional[ThreadPoolExecutor] = None
+_dashboard_executor_lock = threading.Lock()
+
+
+def _dashboard_max_workers() -> int:
+    """Worker count for the dashboard executor, kept well below the pool size."""
+    return max(1, get_engine_kwargs()["pool_size"] // 2)
+
+
+def _get_dashboard_executor() -> ThreadPoolExecutor:
+    """Return the shared dashboard executor, creating it on first use."""
+    global _dashboard_executor
+    with _dashboard_executor_lock:
+        if _dashboard_executor is None:
+            _dashboard_executor = ThreadPoolExecutor(
+                max_workers=_dashboard_max_workers(),
+                thread_name_prefix="dashboard-metrics"
+            )
+        return _dashboard_executor
+
+
+def _run_with_session(bind: Any, method: Callable[..., Any], *args: Any) -> Any:
+    """Run a metrics method on a short-lived session of its own."""
+    with Session(bind=bind) as session:
+        return method(session, *args)
+
 
 class MetricsService:
     """
@@ -33,6 +440,7 @@ class MetricsService:
     """
     
     @staticmethod
+    @_cached_metrics
     def get_irn_generation_metrics(
         db: Session, 
         time_range: str = "24h",
@@ -51,78 +459,52 @@ class MetricsService:
         """
         # Calculate time threshold based on time_range
         now = datetime.utcnow()
-        if time_range == "24h":
-            time_threshold = now - timedelta(hours=24)
-        elif time_range == "7d":
-            time_threshold = now - timedelta(days=7)
-        elif time_range == "30d":
-            time_threshold = now - timedelta(days=30)
-        else:
-            time_threshold = datetime.min  # All time
-            
-        # Base query
-        query = db.query(IRNRecord)
-        
-        # Add time and organization filters
-        if time_range != "all":
-            query = query.filter(IRNRecord.generated_at >= time_threshold)
+        time_threshold = _time_threshold(now, time_range)
             
-        if organization_id:
-            # Join with integration to get organization
-            query = query.join(
-                Integration, 
-                IRNRecord.integration_id == Integration.id.cast(str)
-            ).filter(Integration.organization_id == organization_id)
-        
-        # Get total count
-        total_count = query.count()
+        # Base query with time and organization filters
+        query = _filtered_base_query(
+            db, IRNRecord, IRNRecord.generated_at, time_range, time_threshold,
+            organization_id, IRNRecord.integration_id == cast(Integration.id, String)
+        )
         
-        # Get count by status
+        # Count by status in one grouped query; the total is their sum
+        if _use_metrics_rollup(db, time_range):
+            status_rows = _rollup_totals(db, "irn", time_range, time_threshold, organization_id).items()
+        else:
+            status_rows = (
+                query.with_entities(IRNRecord.status, func.count())
+                .group_by(IRNRecord.status)
+                .all()
+            )
+        counts_by_status = {getattr(status, "value", status): int(count) for status, count in status_rows}
+        total_count = sum(counts_by_status.values())
         status_counts = {
-            "unused": query.filter(IRNRecord.status == IRNStatus.UNUSED.value).count(),
-            "active": query.filter(IRNRecord.status == IRNStatus.ACTIVE.value).count(),
-            "used": query.filter(IRNRecord.status == IRNStatus.USED.value).count(),
-            "expired": query.filter(IRNRecord.status == IRNStatus.EXPIRED.value).count(),
-            "cancelled": query.filter(IRNRecord.status == IRNStatus.CANCELLED.value).count()
+            status: counts_by_status.get(status, 0) for status in IRN_METRIC_STATUSES
         }
         
         # Get generation rate (per hour) over time
-        hourly_generation = []
-        for hour_offset in range(24):
-            hour_start = now - timedelta(hours=hour_offset + 1)
-            hour_end = now - timedelta(hours=hour_offset)
-            
-            hour_query = query.filter(
-                IRNRecord.generated_at >= hour_start,
-                IRNRecord.generated_at < hour_end
-            )
-            
-            hourly_generation.append({
+        hour_buckets = _hour_buckets(now)
+        hourly_totals = _bucket_totals(db, query, IRNRecord.generated_at, hour_buckets)
+        hourly_generation = [
+            {
                 "hour": hour_offset,
                 "timestamp": hour_end.isoformat(),
-                "count": hour_query.count()
-            })
+                "count": count
+            }
+            for hour_offset, ((_, hour_end), (count,)) in enumerate(zip(hour_buckets, hourly_totals))
+        ]
             
         # Get daily generation for the past 30 days
-        daily_generation = []
-        for day_offset in range(30):
-            day_start = (now - timedelta(days=day_offset + 1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            day_end = (now - timedelta(days=day_offset)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            
-            day_query = query.filter(
-                IRNRecord.generated_at >= day_start,
-                IRNRecord.generated_at < day_end
-            )
-            
-            daily_generation.append({
+        day_buckets = _day_buckets(now)
+        daily_totals = _bucket_totals(db, query, IRNRecord.generated_at, day_buckets)
+        daily_generation = [
+            {
                 "day": day_offset,
                 "date": day_end.date().isoformat(),
-                "count": day_query.count()
-            })
+                "count": count
+            }
+            for day_offset, ((_, day_end), (count,)) in enumerate(zip(day_buckets, daily_totals))
+        ]
         
         return {
             "total_count": total_count,
@@ -133,6 +515,7 @@ class MetricsService:
         }
     
     @staticmethod
+    @_cached_metrics
     def get_validation_metrics(
         db: Session, 
         time_range: str = "24h",
@@ -151,35 +534,28 @@ class MetricsService:
         """
         # Calculate time threshold based on time_range
         now = datetime.utcnow()
-        if time_range == "24h":
-            time_threshold = now - timedelta(hours=24)
-        elif time_range == "7d":
-            time_threshold = now - timedelta(days=7)
-        elif time_range == "30d":
-            time_threshold = now - timedelta(days=30)
-        else:
-            time_threshold = datetime.min  # All time
-        
-        # Base query for validation records
-        query = db.query(ValidationRecord)
-        
-        # Add time and organization filters
-        if time_range != "all":
-            query = query.filter(ValidationRecord.validation_time >= time_threshold)
-            
-        if organization_id:
-            # No need to join with integration since validation_records already has integration_id
-            query = query.join(
-                Integration,
-                ValidationRecord.integration_id == Integration.id
-            ).filter(Integration.organization_id == organization_id)
+        time_threshold = _time_threshold(now, time_range)
         
-        # Get total count
-        total_count = query.count()
+        # Base query for validation records with time and organization filters
+        query = _filtered_base_query(
+            db, ValidationRecord, ValidationRecord.validation_time, time_range, time_threshold,
+            organization_id, ValidationRecord.integration_id == Integration.id
+        )
         
         # Get validation success vs. failure
-        success_count = query.filter(ValidationRecord.is_valid == True).count()
-        failure_count = query.filter(ValidationRecord.is_valid == False).count()
+        if _use_metrics_rollup(db, time_range):
+            outcome_counts = _rollup_totals(db, "validation", time_range, time_threshold, organization_id)
+            success_count = outcome_counts.get("valid", 0)
+            total_count = success_count + outcome_counts.get("invalid", 0)
+        else:
+            total_count, success_count = (
+                int(value or 0)
+                for value in query.with_entities(
+                    func.count(),
+                    func.sum(case((ValidationRecord.is_valid == True, 1), else_=0))
+                ).one()
+            )
+        failure_count = total_count - success_count
         
         # Calculate success rate
         success_rate = (success_count / total_count * 100) if total_count > 0 else 0
@@ -187,53 +563,29 @@ class MetricsService:
         # Get common validation errors
         common_errors = []
         try:
-            # This is a complex query that depends on the JSON structure of the issues field
-            # For PostgreSQL, we would use jsonb functions
-            # For SQLite, we need a simpler approach
-            
-            # Get failed validations
-            failed_validations = query.filter(
-                ValidationRecord.is_valid == False
-            ).order_by(desc(ValidationRecord.validation_time)).limit(100).all()
-            
-            # Extract and count error types
-            error_counts = {}
-            for validation in failed_validations:
-                issues = validation.issues or []
-                if isinstance(issues, str):
-                    # If stored as string, try to parse
-                    import json
-                    try:
-                        issues = json.loads(issues)
-                    except:
-                        issues = []
-                        
-                for issue in issues:
-                    error_type = issue.get("error_code", "unknown")
-                    error_counts[error_type] = error_counts.get(error_type, 0) + 1
-            
-            # Convert to sorted list
+            # Error codes are counted over the 100 most recent failures
+            sample_count = min(failure_count, 100)
+            error_counts = _common_error_counts(
+                db,
+                query.filter(ValidationRecord.is_valid == False),
+                ValidationRecord.issues,
+                ValidationRecord.validation_time
+            )
             common_errors = [
-                {"error_code": code, "count": count, "percentage": (count / len(failed_validations) * 100) if len(failed_validations) > 0 else 0}
-                for code, count in sorted(error_counts.items(), key=lambda x: x[1], reverse=True)
-            ][:10]  # Top 10 errors
+                {"error_code": code, "count": count, "percentage": (count / sample_count * 100) if sample_count > 0 else 0}
+                for code, count in error_counts
+            ]
         except Exception as e:
             logger.error(f"Error calculating common validation errors: {str(e)}")
         
         # Get validation rate (per hour) over time
         hourly_validation = []
-        for hour_offset in range(24):
-            hour_start = now - timedelta(hours=hour_offset + 1)
-            hour_end = now - timedelta(hours=hour_offset)
-            
-            hour_query = query.filter(
-                ValidationRecord.validation_time >= hour_start,
-                ValidationRecord.validation_time < hour_end
-            )
-            
-            total = hour_query.count()
-            success = hour_query.filter(ValidationRecord.is_valid == True).count()
-            
+        hour_buckets = _hour_buckets(now)
+        hourly_totals = _bucket_totals(
+            db, query, ValidationRecord.validation_time, hour_buckets,
+            case((ValidationRecord.is_valid == True, 1), else_=0)
+        )
+        for hour_offset, ((_, hour_end), (total, success)) in enumerate(zip(hour_buckets, hourly_totals)):
             hourly_validation.append({
                 "hour": hour_offset,
                 "timestamp": hour_end.isoformat(),
@@ -254,6 +606,7 @@ class MetricsService:
         }
     
     @staticmethod
+    @_cached_metrics
     def get_b2b_vs_b2c_metrics(
         db: Session, 
         time_range: str = "24h",
@@ -272,112 +625,45 @@ class MetricsService:
         """
         # Calculate time threshold based on time_range
         now = datetime.utcnow()
-        if time_range == "24h":
-            time_threshold = now - timedelta(hours=24)
-        elif time_range == "7d":
-            time_threshold = now - timedelta(days=7)
-        elif time_range == "30d":
-            time_threshold = now - timedelta(days=30)
-        else:
-            time_threshold = datetime.min  # All time
+        time_threshold = _time_threshold(now, time_range)
         
         # For this metric, we need to analyze invoice data
         # We'll consider an invoice as B2B if it has a customer TIN or VAT number
         # This is a simplification - in a real implementation, we would need more complex logic
         
-        # Get all validation records with invoice data
-        query = db.query(ValidationRecord)
-        
-        # Add time and organization filters
-        if time_range != "all":
-            query = query.filter(ValidationRecord.validation_time >= time_threshold)
-            
-        if organization_id:
-            query = query.join(
-                Integration,
-                ValidationRecord.integration_id == Integration.id
-            ).filter(Integration.organization_id == organization_id)
-        
-        # Count B2B vs B2C invoices
-        # This is a simplification - in a real implementation, we would need more complex logic
-        b2b_count = 0
-        b2c_count = 0
-        total_count = 0
-        
-        for record in query.all():
-            total_count += 1
-            invoice_data = record.invoice_data or {}
-            
-            # Simple heuristic for B2B vs B2C
-            is_b2b = False
-            
-            # Check for customer TIN or VAT number in invoice data
-            customer = invoice_data.get("customer", {})
-            if customer.get("tax_id") or customer.get("vat"):
-                is_b2b = True
-                
-            if is_b2b:
-                b2b_count += 1
-            else:
-                b2c_count += 1
-        
-        # Calculate validation success rates for B2B vs B2C
-        b2b_success_count = 0
-        b2c_success_count = 0
+        # Get validation records with time and organization filters
+        query = _filtered_base_query(
+            db, ValidationRecord, ValidationRecord.validation_time, time_range, time_threshold,
+            organization_id, ValidationRecord.integration_id == Integration.id
+        )
         
-        for record in query.filter(ValidationRecord.is_valid == True).all():
-            invoice_data = record.invoice_data or {}
-            
-            # Simple heuristic for B2B vs B2C
-            is_b2b = False
-            
-            # Check for customer TIN or VAT number in invoice data
-            customer = invoice_data.get("customer", {})
-            if customer.get("tax_id") or customer.get("vat"):
-                is_b2b = True
-                
-            if is_b2b:
-                b2b_success_count += 1
-            else:
-                b2c_success_count += 1
+        # Count B2B vs B2C invoices and their successes in one aggregate row
+        is_b2b = _b2b_flag(ValidationRecord.invoice_data)
+        is_success = case((ValidationRecord.is_valid == True, 1), else_=0)
+        total_count, b2b_count, success_count, b2b_success_count = (
+            int(value or 0)
+            for value in query.with_entities(
+                func.count(),
+                func.sum(is_b2b),
+                func.sum(is_success),
+                func.sum(is_b2b * is_success)
+            ).one()
+        )
+        b2c_count = total_count - b2b_count
+        b2c_success_count = success_count - b2b_success_count
         
         b2b_success_rate = (b2b_success_count / b2b_count * 100) if b2b_count > 0 else 0
         b2c_success_rate = (b2c_success_count / b2c_count * 100) if b2c_count > 0 else 0
         
-        # Get daily B2B vs B2C counts for the past 30 days
+        # Get daily B2B vs B2C counts for the past 30 days, split in the database
         daily_breakdown = []
-        for day_offset in range(30):
-            day_start = (now - timedelta(days=day_offset + 1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            day_end = (now - timedelta(days=day_offset)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            
-            day_query = query.filter(
-                ValidationRecord.validation_time >= day_start,
-                ValidationRecord.validation_time < day_end
-            ).all()
-            
-            day_b2b = 0
-            day_b2c = 0
-            
-            for record in day_query:
-                invoice_data = record.invoice_data or {}
-                
-                # Simple heuristic for B2B vs B2C
-                is_b2b = False
-                
-                # Check for customer TIN or VAT number in invoice data
-                customer = invoice_data.get("customer", {})
-                if customer.get("tax_id") or customer.get("vat"):
-                    is_b2b = True
-                    
-                if is_b2b:
-                    day_b2b += 1
-                else:
-                    day_b2c += 1
-            
+        day_buckets = _day_buckets(now)
+        daily_totals = _bucket_totals(
+            db, query, ValidationRecord.validation_time, day_buckets,
+            _b2b_flag(ValidationRecord.invoice_data)
+        )
+        for day_offset, ((_, day_end), (day_total, day_b2b)) in enumerate(zip(day_buckets, daily_totals)):
+            day_b2c = day_total - day_b2b
             daily_breakdown.append({
                 "day": day_offset,
                 "date": day_end.date().isoformat(),
@@ -399,6 +685,7 @@ class MetricsService:
         }
     
     @staticmethod
+    @_cached_metrics
     def get_odoo_integration_metrics(
         db: Session, 
         time_range: str = "24h",
@@ -417,14 +704,7 @@ class MetricsService:
         """
         # Calculate time threshold based on time_range
         now = datetime.utcnow()
-        if time_range == "24h":
-            time_threshold = now - timedelta(hours=24)
-        elif time_range == "7d":
-            time_threshold = now - timedelta(days=7)
-        elif time_range == "30d":
-            time_threshold = now - timedelta(days=30)
-        else:
-            time_threshold = datetime.min  # All time
+        time_threshold = _time_threshold(now, time_range)
         
         # Get Odoo integrations
         query = db.query(Integration).filter(
@@ -436,9 +716,9 @@ class MetricsService:
         
         odoo_integrations = query.all()
         
-        # Get integration status and counts
-        active_count = query.filter(Integration.is_active == True).count()
-        inactive_count = query.filter(Integration.is_active == False).count()
+        # Get integration status and counts from the integrations already loaded
+        active_count = sum(1 for integration in odoo_integrations if integration.is_active is True)
+        inactive_count = sum(1 for integration in odoo_integrations if integration.is_active is False)
         
         # Get total invoice count from validation records
         invoice_query = db.query(ValidationRecord).join(
@@ -458,22 +738,29 @@ class MetricsService:
                 Integration.organization_id == organization_id
             )
             
-        total_invoices = invoice_query.count()
-        
-        # Get success rate
-        successful_invoices = invoice_query.filter(
-            ValidationRecord.is_valid == True
-        ).count()
+        # Get total and successful invoices in one aggregate row
+        total_invoices, successful_invoices = (
+            int(value or 0)
+            for value in invoice_query.with_entities(
+                func.count(),
+                func.sum(case((ValidationRecord.is_valid == True, 1), else_=0))
+            ).one()
+        )
         
         success_rate = (successful_invoices / total_invoices * 100) if total_invoices > 0 else 0
         
         # Get integration statuses
         integration_statuses = []
+        last_validations = _latest_rows(
+            db,
+            ValidationRecord.integration_id,
+            ValidationRecord.validation_time,
+            [integration.id for integration in odoo_integrations],
+            ValidationRecord.validation_time,
+            ValidationRecord.is_valid
+        )
         for integration in odoo_integrations:
-            # Get last validation record for this integration
-            last_validation = db.query(ValidationRecord).filter(
-                ValidationRecord.integration_id == integration.id
-            ).order_by(desc(ValidationRecord.validation_time)).first()
+            last_validation = last_validations.get(integration.id)
             
             integration_statuses.append({
                 "integration_id": str(integration.id),
@@ -481,26 +768,21 @@ class MetricsService:
                 "organization_id": str(integration.organization_id),
                 "is_active": integration.is_active,
                 "created_at": integration.created_at.isoformat(),
-                "last_validated": last_validation.validation_time.isoformat() if last_validation else None,
-                "last_validation_success": last_validation.is_valid if last_validation else None
+                "last_validated": last_validation[0].isoformat() if last_validation else None,
+                "last_validation_success": last_validation[1] if last_validation else None
             })
         
         # Get hourly invoice count
-        hourly_counts = []
-        for hour_offset in range(24):
-            hour_start = now - timedelta(hours=hour_offset + 1)
-            hour_end = now - timedelta(hours=hour_offset)
-            
-            hour_query = invoice_query.filter(
-                ValidationRecord.validation_time >= hour_start,
-                ValidationRecord.validation_time < hour_end
-            )
-            
-            hourly_counts.append({
+        hour_buckets = _hour_buckets(now)
+        hourly_totals = _bucket_totals(db, invoice_query, ValidationRecord.validation_time, hour_buckets)
+        hourly_counts = [
+            {
                 "hour": hour_offset,
                 "timestamp": hour_end.isoformat(),
-                "count": hour_query.count()
-            })
+                "count": count
+            }
+            for hour_offset, ((_, hour_end), (count,)) in enumerate(zip(hour_buckets, hourly_totals))
+        ]
         
         return {
             "total_integrations": len(odoo_integrations),
@@ -515,6 +797,7 @@ class MetricsService:
         }
     
     @staticmethod
+    @_cached_metrics
     def get_system_health_metrics(
         db: Session, 
         time_range: str = "24h"
@@ -531,52 +814,35 @@ class MetricsService:
         """
         # Calculate time threshold based on time_range
         now = datetime.utcnow()
-        if time_range == "24h":
-            time_threshold = now - timedelta(hours=24)
-        elif time_range == "7d":
-            time_threshold = now - timedelta(days=7)
-        elif time_range == "30d":
-            time_threshold = now - timedelta(days=30)
-        else:
-            time_threshold = datetime.min  # All time
+        time_threshold = _time_threshold(now, time_range)
         
         # Get API key usage statistics
-        api_usage_query = db.query(APIKeyUsage)
-        
-        if time_range != "all":
-            api_usage_query = api_usage_query.filter(
-                APIKeyUsage.timestamp >= time_threshold
-            )
-            
-        api_usage = api_usage_query.all()
+        api_usage_query = _filtered_base_query(
+            db, APIKeyUsage, APIKeyUsage.timestamp, time_range, time_threshold
+        )
         
-        # Calculate total requests and error rate
-        total_requests = sum(usage.request_count for usage in api_usage)
-        error_requests = sum(usage.error_count for usage in api_usage)
+        # Calculate total requests, error rate and average response time in SQL
+        usage_totals = api_usage_query.with_entities(
+            func.sum(APIKeyUsage.request_count),
+            func.sum(APIKeyUsage.error_count),
+            func.sum(APIKeyUsage.total_response_time)
+        ).one()
+        total_requests = int(usage_totals[0] or 0)
+        error_requests = int(usage_totals[1] or 0)
+        total_response_time = usage_totals[2] or 0
         error_rate = (error_requests / total_requests * 100) if total_requests > 0 else 0
-        
-        # Calculate average response time
-        total_response_time = sum(
-            usage.total_response_time for usage in api_usage if usage.total_response_time
-        )
         avg_response_time = (
             total_response_time / total_requests if total_requests > 0 else 0
         )
         
         # Get hourly request rates
         hourly_requests = []
-        for hour_offset in range(24):
-            hour_start = now - timedelta(hours=hour_offset + 1)
-            hour_end = now - timedelta(hours=hour_offset)
-            
-            hour_usage = db.query(APIKeyUsage).filter(
-                APIKeyUsage.timestamp >= hour_start,
-                APIKeyUsage.timestamp < hour_end
-            ).all()
-            
-            hour_requests = sum(usage.request_count for usage in hour_usage)
-            hour_errors = sum(usage.error_count for usage in hour_usage)
-            
+        hour_buckets = _hour_buckets(now)
+        hourly_totals = _bucket_totals(
+            db, db.query(APIKeyUsage), APIKeyUsage.timestamp, hour_buckets,
+            APIKeyUsage.request_count, APIKeyUsage.error_count
+        )
+        for hour_offset, ((_, hour_end), (_, hour_requests, hour_errors)) in enumerate(zip(hour_buckets, hourly_totals)):
             hourly_requests.append({
                 "hour": hour_offset,
                 "timestamp": hour_end.isoformat(),
@@ -585,17 +851,16 @@ class MetricsService:
                 "error_rate": (hour_errors / hour_requests * 100) if hour_requests > 0 else 0
             })
         
-        # Get endpoint popularity
-        endpoint_popularity = {}
-        for usage in api_usage:
-            path = usage.path or "unknown"
-            endpoint_popularity[path] = endpoint_popularity.get(path, 0) + usage.request_count
-            
-        # Convert to sorted list
+        # Get the top 10 endpoints by request count
+        endpoint = func.coalesce(APIKeyUsage.path, "unknown").label("endpoint")
+        endpoint_requests = func.sum(APIKeyUsage.request_count).label("endpoint_requests")
+        endpoint_rows = api_usage_query.with_entities(endpoint, endpoint_requests).group_by(
+            endpoint
+        ).order_by(desc(endpoint_requests)).limit(10).all()
         endpoint_popularity_list = [
             {"endpoint": path, "count": count, "percentage": (count / total_requests * 100) if total_requests > 0 else 0}
-            for path, count in sorted(endpoint_popularity.items(), key=lambda x: x[1], reverse=True)
-        ][:10]  # Top 10 endpoints
+            for path, count in ((path, int(count or 0)) for path, count in endpoint_rows)
+        ]
         
         return {
             "total_requests": total_requests,
@@ -626,77 +891,53 @@ class MetricsService:
         """
         # Calculate time threshold based on time_range
         now = datetime.utcnow()
-        if time_range == "24h":
-            time_threshold = now - timedelta(hours=24)
-        elif time_range == "7d":
-            time_threshold = now - timedelta(days=7)
-        elif time_range == "30d":
-            time_threshold = now - timedelta(days=30)
-        else:
-            time_threshold = datetime.min  # All time
-            
-        # Base query
-        query = db.query(TransmissionRecord)
-        
-        # Add time and organization filters
-        if time_range != "all":
-            query = query.filter(TransmissionRecord.created_at >= time_threshold)
+        time_threshold = _time_threshold(now, time_range)
             
+        # Base query with time and organization filters
+        query = _filtered_base_query(
+            db, TransmissionRecord, TransmissionRecord.created_at, time_range, time_threshold
+        )
         if organization_id:
             query = query.filter(TransmissionRecord.organization_id == organization_id)
         
-        # Get total count
-        total_count = query.count()
-        
-        # Get count by status
-        status_counts = {}
-        for status in TransmissionStatus:
-            status_counts[status.value] = query.filter(
-                TransmissionRecord.status == status
-            ).count()
+        # Count by status in one grouped query; the total is their sum
+        status_rows = (
+            query.with_entities(TransmissionRecord.status, func.count())
+            .group_by(TransmissionRecord.status)
+            .all()
+        )
+        counts_by_status = {getattr(status, "value", status): count for status, count in status_rows}
+        total_count = sum(counts_by_status.values())
+        status_counts = {
+            status.value: counts_by_status.get(status.value, 0) for status in TransmissionStatus
+        }
         
         # Get transmission rate (per hour) over time
-        hourly_transmission = []
-        for hour_offset in range(24):
-            hour_start = now - timedelta(hours=hour_offset + 1)
-            hour_end = now - timedelta(hours=hour_offset)
-            
-            hour_query = query.filter(
-                TransmissionRecord.created_at >= hour_start,
-                TransmissionRecord.created_at < hour_end
-            )
-            
-            hourly_transmission.append({
+        hour_buckets = _hour_buckets(now)
+        hourly_totals = _bucket_totals(db, query, TransmissionRecord.created_at, hour_buckets)
+        hourly_transmission = [
+            {
                 "hour": hour_offset,
                 "timestamp": hour_end.isoformat(),
-                "count": hour_query.count()
-            })
+                "count": count
+            }
+            for hour_offset, ((_, hour_end), (count,)) in enumerate(zip(hour_buckets, hourly_totals))
+        ]
             
         # Get daily transmissions for the past 30 days
-        daily_transmission = []
-        for day_offset in range(30):
-            day_start = (now - timedelta(days=day_offset + 1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            day_end = (now - timedelta(days=day_offset)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            
-            day_query = query.filter(
-                TransmissionRecord.created_at >= day_start,
-                TransmissionRecord.created_at < day_end
-            )
-            
-            daily_transmission.append({
+        day_buckets = _day_buckets(now)
+        daily_totals = _bucket_totals(db, query, TransmissionRecord.created_at, day_buckets)
+        daily_transmission = [
+            {
                 "day": day_offset,
                 "date": day_end.date().isoformat(),
-                "count": day_query.count()
-            })
+                "count": count
+            }
+            for day_offset, ((_, day_end), (count,)) in enumerate(zip(day_buckets, daily_totals))
+        ]
         
         # Get success rate
-        success_count = query.filter(
-            TransmissionRecord.status == TransmissionStatus.COMPLETED
-        ).count()
+        success_count = status_counts[TransmissionStatus.COMPLETED.value]
         
         success_rate = (success_count / total_count * 100) if total_count > 0 else 0
         
@@ -898,20 +1139,27 @@ class MetricsService:
                     TransmissionRecord.created_at < day_end
                 )
                 
-                # Count transmissions by status
-                total_transmissions = base_query.count()
-                successful_transmissions = base_query.filter(
-                    TransmissionRecord.status == TransmissionStatus.COMPLETED
-                ).count()
-                failed_transmissions = base_query.filter(
-                    TransmissionRecord.status == TransmissionStatus.FAILED
-                ).count()
-                pending_transmissions = base_query.filter(
-                    TransmissionRecord.status.in_([
-                        TransmissionStatus.PENDING,
-                        TransmissionStatus.IN_PROGRESS
-                    ])
-                ).count()
+                # Count transmissions by status in one aggregate row
+                completed = TransmissionRecord.status == TransmissionStatus.COMPLETED
+                (
+                    total_transmissions,
+                    successful_transmissions,
+                    failed_transmissions,
+                    pending_transmissions,
+                    first_attempt_success
+                ) = (
+                    int(value or 0)
+                    for value in base_query.with_entities(
+                        func.count(),
+                        func.sum(case((completed, 1), else_=0)),
+                        func.sum(case((TransmissionRecord.status == TransmissionStatus.FAILED, 1), else_=0)),
+                        func.sum(case((TransmissionRecord.status.in_([
+                            TransmissionStatus.PENDING,
+                            TransmissionStatus.IN_PROGRESS
+                        ]), 1), else_=0)),
+                        func.sum(case((and_(completed, TransmissionRecord.retry_count == 0), 1), else_=0))
+                    ).one()
+                )
                 
                 # Calculate performance metrics
                 metrics_query = db.query(
@@ -928,14 +1176,6 @@ class MetricsService:
                 avg_processing_time, avg_encryption_time, avg_network_time, avg_payload_size = metrics_query.first()
                 
                 # Calculate success metrics
-                first_attempt_success = db.query(TransmissionRecord).filter(
-                    TransmissionRecord.organization_id == org.id,
-                    TransmissionRecord.created_at >= day_start,
-                    TransmissionRecord.created_at < day_end,
-                    TransmissionRecord.status == TransmissionStatus.COMPLETED,
-                    TransmissionRecord.retry_count == 0
-                ).count()
-                
                 first_attempt_success_rate = (
                     first_attempt_success / total_transmissions * 100
                 ) if total_transmissions > 0 else 0
@@ -1078,28 +1318,34 @@ class MetricsService:
         Returns:
             Dictionary with dashboard summary metrics
         """
-        # Get IRN metrics
-        irn_metrics = MetricsService.get_irn_generation_metrics(
-            db, "24h", organization_id
-        )
-        
-        # Get validation metrics
-        validation_metrics = MetricsService.get_validation_metrics(
-            db, "24h", organization_id
+        # The sections are independent; on PostgreSQL they run on the shared
+        # dashboard executor, each with a short-lived session of its own
+        sections = (
+            (MetricsService.get_irn_generation_metrics, ("24h", organization_id)),
+            (MetricsService.get_validation_metrics, ("24h", organization_id)),
+            (MetricsService.get_b2b_vs_b2c_metrics, ("24h", organization_id)),
+            (MetricsService.get_odoo_integration_metrics, ("24h", organization_id)),
+            (MetricsService.get_system_health_metrics, ("24h",)),
+            (MetricsService.get_transmission_metrics_summary, ("24h", organization_id))
         )
-        
-        # Get B2B vs B2C metrics
-        b2b_vs_b2c_metrics = MetricsService.get_b2b_vs_b2c_metrics(
-            db, "24h", organization_id
-        )
-        
-        # Get Odoo integration metrics
-        odoo_metrics = MetricsService.get_odoo_integration_metrics(
-            db, "24h", organization_id
-        )
-        
-        # Get system health metrics
-        system_metrics = MetricsService.get_system_health_metrics(db, "24h")
+        if _is_postgresql(db):
+            bind = db.get_bind()
+            executor = _get_dashboard_executor()
+            futures = [
+                executor.submit(_run_with_session, bind, method, *args)
+                for method, args in sections
+            ]
+            results = [future.result() for future in futures]
+        else:
+            results = [method(db, *args) for method, args in sections]
+        (
+            irn_metrics,
+            validation_metrics,
+            b2b_vs_b2c_metrics,
+            odoo_metrics,
+            system_metrics,
+            transmission_summary
+        ) = results
         
         # Combine into summary
         return {
@@ -1131,5 +1377,5 @@ class MetricsService:
                 "error_rate": system_metrics["error_rate"],
                 "avg_response_time": system_metrics["avg_response_time"]
             },
-            "transmission_summary": MetricsService.get_transmission_metrics_summary(db, "24h", organization_id)
+            "transmission_summary": transmission_summary
         }
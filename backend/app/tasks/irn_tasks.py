@@ -7,6 +7,7 @@ operations, such as expiring outdated IRNs.
 import logging
 from datetime import datetime
 from typing import Dict, Any
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
@@ -14,13 +15,25 @@ from app.models.irn import IRNRecord, IRNStatus
 
 logger = logging.getLogger(__name__)
 
+# Rows expired per UPDATE/commit in the expiry sweep, so a large backlog
+# does not become one long-running transaction
+EXPIRY_BATCH_SIZE = 5000
 
-def expire_outdated_irns() -> Dict[str, Any]:
+# Statuses the sweep may move to EXPIRED. Listed positively (rather than
+# "not expired or revoked") so the filter can seek into
+# idx_irn_status_valid_until once per status instead of scanning it
+EXPIRABLE_STATUSES = (IRNStatus.UNUSED, IRNStatus.ACTIVE, IRNStatus.INVALID)
+
+
+def expire_outdated_irns(batch_size: int = EXPIRY_BATCH_SIZE) -> Dict[str, Any]:
     """
     Update all expired but not marked IRNs to expired status.
     
     This task should be scheduled to run periodically (e.g., daily).
     
+    Args:
+        batch_size: Maximum number of IRNs expired per UPDATE statement
+    
     Returns:
         Dict with task results (count of updated IRNs)
     """
@@ -29,26 +42,33 @@ def expire_outdated_irns() -> Dict[str, Any]:
         # Current timestamp
         now = datetime.utcnow()
         
-        # Find all IRNs that are expired but not marked as such
-        expired_query = (
-            db.query(IRNRecord)
-            .filter(
-                IRNRecord.valid_until < now,
-                IRNRecord.status != IRNStatus.EXPIRED,
-                IRNRecord.status != IRNStatus.REVOKED
-            )
+        # IRNs that are expired but not marked as such
+        expired_filter = (
+            IRNRecord.status.in_(EXPIRABLE_STATUSES),
+            IRNRecord.valid_until < now
         )
         
-        expired_count = expired_query.count()
+        # Expire in chunks of batch_size, committing each. Updated rows drop
+        # out of the filter, so every chunk simply takes the next batch_size
+        # matches; no rows are loaded into the session
+        expired_count = 0
+        while True:
+            chunk = select(IRNRecord.irn).where(*expired_filter).limit(batch_size)
+            updated = (
+                db.query(IRNRecord)
+                .filter(IRNRecord.irn.in_(chunk))
+                .update(
+                    {"status": IRNStatus.EXPIRED},
+                    synchronize_session=False
+                )
+            )
+            if updated:
+                db.commit()
+                expired_count += updated
+            if updated < batch_size:
+                break
         
         if expired_count > 0:
-            # Update all expired IRNs
-            expired_query.update(
-                {"status": IRNStatus.EXPIRED},
-                synchronize_session=False
-            )
-            db.commit()
-            
             logger.info(f"Successfully expired {expired_count} outdated IRNs")
         else:
             logger.info("No outdated IRNs found to expire")
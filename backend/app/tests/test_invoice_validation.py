@@ -252,3 +252,64 @@ class TestValidationRuleEngine:
         result = engine.validate_invoice(invoice)
         
         assert any(error.error_code == "CUSTOM-001" for error in result.warnings)
+
+    def test_rule_metadata_is_built_once_and_tracks_new_rules(self):
+        """Test that get_all_rules reuses its models until rules are added"""
+        engine = ValidationRuleEngine()
+        first = engine.get_all_rules()
+        second = engine.get_all_rules()
+        
+        assert first == second
+        assert all(a is b for a, b in zip(first, second))
+        
+        engine.rules.append({
+            "id": "CUSTOM-002",
+            "name": "Custom metadata rule",
+            "description": "Custom rule for metadata caching",
+            "severity": "warning",
+            "category": "custom",
+            "field_path": "invoice_number",
+            "source": "custom",
+            "validator": lambda invoice: True,
+            "error_message": "Never raised"
+        })
+        
+        assert engine.get_all_rules()[-1].id == "CUSTOM-002"
+    
+    def test_default_engine_is_picklable(self):
+        """Test that the default rules pickle so the engine can reach worker processes"""
+        import pickle
+        
+        engine = pickle.loads(pickle.dumps(ValidationRuleEngine()))
+        
+        assert [rule["id"] for rule in engine.rules] == [
+            rule["id"] for rule in ValidationRuleEngine().rules
+        ]
+    
+    def test_rules_requiring_a_failed_field_are_skipped(self):
+        """Test that a missing seller is reported once, not by every seller rule"""
+        engine = ValidationRuleEngine()
+        invoice = TestInvoiceValidation().create_valid_invoice()
+        invoice.accounting_supplier_party = None
+        
+        result = engine.validate_invoice(invoice)
+        error_codes = [error.error_code for error in result.errors]
+        
+        assert "BIS3-REQ-003" in error_codes
+        assert not {"FIRS-REG-001", "FIRS-ADR-001", "FIRS-ID-001"} & set(error_codes)
+    
+    def test_fail_fast_stops_at_first_error(self):
+        """Test that fail_fast returns as soon as one error has been found"""
+        engine = ValidationRuleEngine()
+        invoice = TestInvoiceValidation().create_valid_invoice()
+        invoice.accounting_supplier_party = None
+        invoice.invoice_lines = []
+        
+        full = engine.validate_invoice(invoice)
+        fast = engine.validate_batch(
+            BatchValidationRequest(invoices=[invoice], fail_fast=True)
+        ).results[0]
+        
+        assert len(full.errors) > 1
+        assert fast.valid is False
+        assert fast.errors == full.errors[:1]
@@ -272,13 +272,32 @@ def generate_secret_key() -> bytes:
     return os.urandom(32)  # 256-bit key
 
 
+# (source string, derived key) for the last key handed out by get_app_encryption_key
+_ENC_KEY_CACHE: Optional[Tuple[str, bytes]] = None
+
+
 def get_app_encryption_key() -> bytes:
     """
     Get the application's encryption key from environment or generate a new one.
     In production, this should be retrieved from a secure key management system.
+    
+    The derived key is memoized against its source string, so repeated calls
+    skip the decoding work while a changed ENCRYPTION_KEY still takes effect.
     """
+    global _ENC_KEY_CACHE
     key_env = os.getenv("ENCRYPTION_KEY", settings.ENCRYPTION_KEY)
     
+    cached = _ENC_KEY_CACHE
+    if cached is not None and cached[0] == key_env:
+        return cached[1]
+    
+    key = _derive_app_encryption_key(key_env)
+    _ENC_KEY_CACHE = (key_env, key)
+    return key
+
+
+def _derive_app_encryption_key(key_env: str) -> bytes:
+    """Turn the configured ENCRYPTION_KEY string into raw key bytes."""
     # First try base64 decoding in case it's stored that way
     try:
         return base64.b64decode(key_env)
@@ -25,6 +25,7 @@ import json
 import logging
 import secrets
 import re
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple, List, Union
 
@@ -130,6 +131,34 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Prefix marking invoice hashes produced with BLAKE2b. Unprefixed hashes are
+# legacy SHA-256 values, whose verification codes remain HMAC-SHA256.
+HASH_V2_PREFIX = "b2:"
+
+# Key material derived from SECRET_KEY: (secret, keyed HMAC-SHA256 template,
+# BLAKE2b key). The HMAC template is copied per code so its key padding is
+# only computed once per SECRET_KEY value.
+_key_material: Optional[Tuple[str, "hmac.HMAC", bytes]] = None
+
+
+def _get_key_material() -> Tuple[str, "hmac.HMAC", bytes]:
+    """Return the SECRET_KEY-derived keys, rebuilding them if the setting changed."""
+    global _key_material
+    secret_key = settings.SECRET_KEY
+    cached = _key_material
+    if cached is None or cached[0] != secret_key:
+        secret = secret_key.encode()
+        # BLAKE2b keys are capped at 64 bytes; longer secrets are hashed down
+        blake_key = secret if len(secret) <= 64 else hashlib.blake2b(secret).digest()
+        cached = (secret_key, hmac.new(secret, None, hashlib.sha256), blake_key)
+        _key_material = cached
+    return cached
+
+
+def _get_hmac_template() -> "hmac.HMAC":
+    """Return the keyed HMAC template for legacy verification codes."""
+    return _get_key_material()[1]
+
 
 def extract_key_invoice_fields(invoice_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -155,22 +184,32 @@ def extract_key_invoice_fields(invoice_data: Dict[str, Any]) -> Dict[str, Any]:
     return essential_fields
 
 
-def calculate_invoice_hash(invoice_data: Dict[str, Any], unique_id: str = None) -> str:
+def calculate_invoice_hash(
+    invoice_data: Dict[str, Any],
+    unique_id: str = None,
+    legacy: bool = False,
+    timestamp: Optional[str] = None
+) -> str:
     """
     Calculate a cryptographic hash of invoice data.
     
     Args:
         invoice_data: Invoice data dictionary
         unique_id: Optional unique identifier to include in the hash
+        legacy: Produce an unprefixed SHA-256 hash, for checking IRNs issued
+            before the switch to BLAKE2b
+        timestamp: Entropy timestamp (YYYYMMDDHHMMSS); defaults to now. Batch
+            generation passes one shared value
         
     Returns:
-        SHA-256 hash of the invoice data
+        HASH_V2_PREFIX followed by the BLAKE2b-256 hash of the invoice data,
+        or the bare SHA-256 hash if legacy is set
     """
     # Extract essential fields
     key_fields = extract_key_invoice_fields(invoice_data)
     
     # Add a timestamp for entropy
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    timestamp = timestamp or time.strftime("%Y%m%d%H%M%S", time.gmtime())
     
     # Add a unique ID if provided, or generate one
     uid = unique_id or str(uuid.uuid4())
@@ -180,29 +219,77 @@ def calculate_invoice_hash(invoice_data: Dict[str, Any], unique_id: str = None)
     data_to_hash = f"{key_fields['invoice_number']}|{key_fields['invoice_date']}|{key_fields['seller_tax_id']}|" \
                   f"{key_fields['buyer_tax_id']}|{key_fields['total_amount']}|{key_fields['currency_code']}|{timestamp}|{uid}"
     
-    # Calculate SHA-256 hash
-    return hashlib.sha256(data_to_hash.encode()).hexdigest()
+    if legacy:
+        return hashlib.sha256(data_to_hash.encode()).hexdigest()
+    return HASH_V2_PREFIX + hashlib.blake2b(data_to_hash.encode(), digest_size=32).hexdigest()
+
+
+def is_legacy_hash(hash_value: str) -> bool:
+    """Return True if the hash predates HASH_V2_PREFIX (SHA-256 / HMAC-SHA256)."""
+    return not hash_value.startswith(HASH_V2_PREFIX)
 
 
 def generate_verification_code(hash_value: str, length: int = 12) -> str:
     """
-    Generate a verification code using HMAC and the application secret.
+    Generate a verification code keyed with the application secret.
+    
+    Versioned hashes get a keyed BLAKE2b code; legacy SHA-256 hashes keep
+    their HMAC-SHA256 code so existing IRNs still verify.
     
     Args:
         hash_value: The hash value to generate a verification code for
         length: Length of the verification code
         
     Returns:
-        HMAC-based verification code
+        Keyed-hash verification code
     """
-    # Generate HMAC using the application secret key
-    verification_code = hmac.new(
-        settings.SECRET_KEY.encode(),
-        hash_value.encode(),
-        hashlib.sha256
-    ).hexdigest()[:length]
+    return _verification_digest(hash_value, (length + 1) // 2).hex()[:length]
+
+
+def verification_code_matches(hash_value: str, verification_code: Optional[str], length: int = 12) -> bool:
+    """
+    Check a verification code against a hash in constant time.
     
-    return verification_code
+    The code is decoded from hex and compared with the raw digest bytes, so
+    half as many bytes are compared and no hex digest is built.
+    
+    Args:
+        hash_value: The hash value the code should have been generated for
+        verification_code: The code to check
+        length: Length of the verification code
+        
+    Returns:
+        True if the code is the one generate_verification_code produces
+    """
+    if not verification_code or len(verification_code) != length:
+        return False
+    
+    if length % 2:
+        # An odd-length code is not whole bytes; compare the hex forms
+        expected = generate_verification_code(hash_value, length)
+        return hmac.compare_digest(verification_code.encode(), expected.encode())
+    
+    # Codes are issued in lowercase hex; fromhex alone would also accept uppercase
+    if verification_code != verification_code.lower():
+        return False
+    try:
+        code_bytes = bytes.fromhex(verification_code)
+    except ValueError:
+        return False
+    
+    return hmac.compare_digest(_verification_digest(hash_value, length // 2), code_bytes)
+
+
+def _verification_digest(hash_value: str, size: int) -> bytes:
+    """Return the first size bytes of the keyed digest behind a verification code."""
+    if not is_legacy_hash(hash_value):
+        blake_key = _get_key_material()[2]
+        return hashlib.blake2b(hash_value.encode(), key=blake_key, digest_size=size).digest()
+    
+    # Generate HMAC using the application secret key
+    mac = _get_hmac_template().copy()
+    mac.update(hash_value.encode())
+    return mac.digest()[:size]
 
 
 def generate_service_id() -> str:
@@ -282,11 +369,69 @@ def generate_firs_irn(
         logger.error(f"Invalid timestamp: {ts}")
         raise ValueError("Invalid timestamp format for FIRS IRN")
     
+    return _assemble_firs_irn(invoice_data, invoice_number, sid, ts)
+
+
+def generate_firs_irns(
+    invoice_data_list: List[Dict[str, Any]],
+    service_id: Optional[str] = None,
+    timestamp: Optional[str] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Generate IRNs for many invoices at once.
+    
+    Equivalent to calling generate_firs_irn per invoice, but the date stamp,
+    hash timestamp and service ID/timestamp validation are done once for the
+    whole batch.
+    
+    Args:
+        invoice_data_list: Invoice data dictionaries
+        service_id: FIRS-assigned Service ID (generates one per IRN if not provided)
+        timestamp: Date in YYYYMMDD format (defaults to today)
+        
+    Returns:
+        IRN component dictionaries in input order; None for invoices whose
+        invoice number cannot be made FIRS-compliant
+    """
+    now = datetime.utcnow()
+    ts = timestamp or now.strftime("%Y%m%d")
+    hash_timestamp = now.strftime("%Y%m%d%H%M%S")
+    
+    if service_id is not None and not validate_service_id(service_id):
+        logger.error(f"Invalid service ID: {service_id}")
+        raise ValueError("Invalid service ID format for FIRS IRN")
+    
+    if not validate_timestamp(ts):
+        logger.error(f"Invalid timestamp: {ts}")
+        raise ValueError("Invalid timestamp format for FIRS IRN")
+    
+    results = []
+    for invoice_data in invoice_data_list:
+        invoice_number = format_invoice_number(invoice_data.get('invoice_number', ''))
+        if not validate_invoice_number(invoice_number):
+            logger.error(f"Invalid invoice number: {invoice_number}")
+            results.append(None)
+            continue
+        
+        sid = service_id or generate_service_id()
+        results.append(_assemble_firs_irn(invoice_data, invoice_number, sid, ts, hash_timestamp))
+    
+    return results
+
+
+def _assemble_firs_irn(
+    invoice_data: Dict[str, Any],
+    invoice_number: str,
+    sid: str,
+    ts: str,
+    hash_timestamp: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the IRN components for already-validated invoice number, service ID and timestamp."""
     # Generate unique ID
     unique_id = str(uuid.uuid4())
     
     # Calculate hash of invoice data
-    hash_value = calculate_invoice_hash(invoice_data, unique_id)
+    hash_value = calculate_invoice_hash(invoice_data, unique_id, timestamp=hash_timestamp)
     
     # Generate verification code
     verification_code = generate_verification_code(hash_value)
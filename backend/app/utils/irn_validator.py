@@ -13,8 +13,6 @@ tuples for uniform error handling.
 
 import re
 import logging
-import hashlib
-import hmac
 from datetime import datetime
 from typing import Dict, Any, Tuple, Optional, List, Union
 from enum import Enum
@@ -26,6 +24,8 @@ from app.utils.irn_generator import (
     validate_timestamp,
     parse_irn,
     calculate_invoice_hash,
+    verification_code_matches,
+    is_legacy_hash,
     extract_key_invoice_fields
 )
 
@@ -143,7 +143,8 @@ def validate_irn_against_invoice(
         if verify_hash:
             # Generate a hash of the invoice data
             unique_id = invoice_data.get('unique_id', None)
-            calculated_hash = calculate_invoice_hash(invoice_data, unique_id)
+            legacy = bool(stored_hash) and is_legacy_hash(stored_hash)
+            calculated_hash = calculate_invoice_hash(invoice_data, unique_id, legacy=legacy)
             
             # If stored hash is provided, compare with it
             if stored_hash:
@@ -154,13 +155,7 @@ def validate_irn_against_invoice(
             
             # Step 5: Verify verification code if provided
             if stored_verification_code:
-                expected_code = hmac.new(
-                    settings.SECRET_KEY.encode(),
-                    calculated_hash.encode(),
-                    hashlib.sha256
-                ).hexdigest()[:12]
-                
-                if stored_verification_code != expected_code:
+                if not verification_code_matches(calculated_hash, stored_verification_code, 12):
                     results["verification_code_valid"] = False
                     return False, "Verification code is invalid", results
                 
@@ -201,19 +196,13 @@ def verify_irn_integrity(
         
         # Calculate a fresh hash
         unique_id = invoice_data.get('unique_id', None)  
-        calculated_hash = calculate_invoice_hash(invoice_data, unique_id)
+        calculated_hash = calculate_invoice_hash(invoice_data, unique_id, legacy=is_legacy_hash(hash_value))
         
         if hash_value != calculated_hash:
             return False, "Hash value does not match invoice data"
         
         # Step 2: Verify the verification code matches the hash
-        expected_code = hmac.new(
-            settings.SECRET_KEY.encode(),
-            hash_value.encode(),
-            hashlib.sha256
-        ).hexdigest()[:12]
-        
-        if verification_code != expected_code:
+        if not verification_code_matches(hash_value, verification_code, 12):
             return False, "Verification code is invalid"
         
         # Step 3: Verify IRN format and content
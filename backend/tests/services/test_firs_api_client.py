@@ -0,0 +1,438 @@
+"""
+Tests for the FIRS API client transport behaviour (retries, throttling).
+"""
+
+import asyncio
+import threading
+import time
+import warnings
+
+import orjson
+import pytest
+import requests
+from fastapi import HTTPException
+from unittest.mock import MagicMock, patch
+
+from app.services.firs_core.firs_api_client import FIRSService, _parse_retry_after
+
+
+def _response(status_code, headers=None, payload=None):
+    """Build a fake requests.Response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = payload or {}
+    response.content = orjson.dumps(payload or {})
+    response.text = ""
+    return response
+
+
+@pytest.fixture
+def service():
+    """FIRS service with a live (fake) token and no backoff delay."""
+    firs = FIRSService(base_url="https://firs.test", api_key="key", api_secret="secret", use_sandbox=True)
+    firs.token = "token"
+    firs._token_expiry_mono = 0.0
+    with patch.object(FIRSService, "_ensure_authenticated", return_value=None), \
+         patch("app.services.firs_core.firs_api_client._exponential_backoff", return_value=0):
+        yield firs
+
+
+class TestRetryPolicy:
+    """Test cases for retrying transient FIRS failures."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_status_then_succeeds(self, service):
+        """A 503 followed by a 200 should surface as a success."""
+        responses = [_response(503), _response(200, payload={"code": 200})]
+        with patch.object(service.session, "request", side_effect=responses) as mock_request:
+            result = await service.sign_invoice({"irn": "IRN-1"})
+
+        assert result == {"code": 200}
+        assert mock_request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_connection_errors(self, service):
+        """Connection errors are retried before giving up."""
+        responses = [requests.ConnectionError("reset"), _response(200, payload={"ok": True})]
+        with patch.object(service.session, "request", side_effect=responses):
+            result = await service.validate_invoice({"irn": "IRN-1"})
+
+        assert result == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self, service):
+        """A 404 is final and must not be retried."""
+        with patch.object(service.session, "request", return_value=_response(404)) as mock_request:
+            with pytest.raises(Exception):
+                await service.download_invoice("IRN-404")
+
+        assert mock_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_returns_last_response_when_attempts_exhausted(self, service):
+        """Persistent 503s fall through to the normal error handling."""
+        with patch.object(service.session, "request", return_value=_response(503)) as mock_request:
+            response = await service._send("GET", "https://firs.test/api")
+
+        assert response.status_code == 503
+        assert mock_request.call_count == 3
+
+    def test_parse_retry_after(self):
+        """Retry-After accepts delta-seconds and rejects garbage."""
+        assert _parse_retry_after("2") == 2.0
+        assert _parse_retry_after(None) is None
+        assert _parse_retry_after("soon") is None
+
+
+class TestRateLimiting:
+    """Test cases for client-side throttling of FIRS calls."""
+
+    @pytest.mark.asyncio
+    async def test_every_attempt_acquires_limiter(self, service):
+        """Retries go through the limiter too, so they cannot burst past the quota."""
+        responses = [_response(503), _response(200, payload={"code": 200})]
+        with patch.object(service._loop_primitives().limiter, "acquire", wraps=service._loop_primitives().limiter.acquire) as mock_acquire, \
+             patch.object(service.session, "request", side_effect=responses):
+            await service.sign_invoice({"irn": "IRN-1"})
+
+        assert mock_acquire.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unretried_calls_are_throttled(self, service):
+        """Plain reference-data lookups are throttled as well."""
+        with patch.object(service._loop_primitives().limiter, "acquire", wraps=service._loop_primitives().limiter.acquire) as mock_acquire, \
+             patch.object(service.session, "request",
+                   return_value=_response(200, payload={"data": []})):
+            await service.get_countries()
+
+        assert mock_acquire.call_count == 1
+
+
+class TestRequestCoalescing:
+    """Test cases for sharing identical in-flight FIRS requests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_downloads_share_one_request(self, service):
+        """Concurrent downloads of the same IRN hit FIRS once."""
+        calls = []
+
+        async def fake_download(irn):
+            calls.append(irn)
+            await asyncio.sleep(0.01)
+            return {"irn": irn}
+
+        with patch.object(service, "_download_invoice", side_effect=fake_download):
+            results = await asyncio.gather(*(service.download_invoice("IRN-1") for _ in range(5)))
+
+        assert calls == ["IRN-1"]
+        assert all(result == {"irn": "IRN-1"} for result in results)
+        assert service._loop_primitives().inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys_are_not_shared(self, service):
+        """Different IRNs are fetched independently."""
+        async def fake_download(irn):
+            await asyncio.sleep(0)
+            return {"irn": irn}
+
+        with patch.object(service, "_download_invoice", side_effect=fake_download) as mock_download:
+            await asyncio.gather(service.download_invoice("IRN-1"), service.download_invoice("IRN-2"))
+
+        assert mock_download.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self, service):
+        """A failure is delivered to every coalesced caller and not cached."""
+        async def failing_download(irn):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        with patch.object(service, "_download_invoice", side_effect=failing_download):
+            results = await asyncio.gather(
+                service.download_invoice("IRN-1"), service.download_invoice("IRN-1"), return_exceptions=True
+            )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert service._loop_primitives().inflight == {}
+
+
+
+class _SlowLimiter:
+    """Stand-in limiter that yields and records how many callers hold it."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def __aenter__(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+
+    async def __aexit__(self, *exc_info):
+        self.active -= 1
+
+
+class TestConcurrencyCap:
+    """Test cases for bounding simultaneous FIRS calls."""
+
+    @pytest.mark.asyncio
+    async def test_global_cap_bounds_in_flight_requests(self, service):
+        """No more than the semaphore's worth of calls run at once."""
+        primitives = service._loop_primitives()
+        primitives.sem = asyncio.Semaphore(2)
+        primitives.limiter = _SlowLimiter()
+
+        with patch.object(service.session, "request", return_value=_response(200)) as mock_request:
+            await asyncio.gather(*(service._request("GET", "https://firs.test/api") for _ in range(6)))
+
+        assert mock_request.call_count == 6
+        assert primitives.limiter.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_downloads_take_the_download_semaphore(self, service):
+        """Invoice downloads are additionally bounded by the tighter download cap."""
+        download_sem = service._loop_primitives().download_sem = asyncio.Semaphore(1)
+        held = []
+
+        def fake_request(*args, **kwargs):
+            held.append(download_sem.locked())
+            return _response(200, payload={"irn": "IRN-1"})
+
+        with patch.object(service.session, "request", side_effect=fake_request):
+            result = await service.download_invoice("IRN-1")
+
+        assert result == {"irn": "IRN-1"}
+        assert held == [True]
+        assert not download_sem.locked()
+
+
+    def test_each_event_loop_gets_its_own_primitives(self, service):
+        """A service driven from several loops never shares loop-bound primitives between them."""
+        async def call():
+            await service.get_countries()
+            return service._loop_primitives()
+
+        with patch.object(service.session, "request", return_value=_response(200, payload={"data": []})), \
+             warnings.catch_warnings():
+            warnings.simplefilter("error")
+            first = asyncio.run(call())
+            second = asyncio.run(call())
+
+        assert first is not second
+        assert first.limiter is not second.limiter
+        assert first.sem is not second.sem
+
+class TestInvoiceStreaming:
+    """Test cases for streaming invoice downloads."""
+
+    @pytest.mark.asyncio
+    async def test_streams_body_in_chunks(self, service):
+        """The body is yielded chunk by chunk and the response closed afterwards."""
+        response = _response(200)
+        response.iter_content.return_value = iter([b"%PDF-", b"1.7"])
+
+        with patch.object(service.session, "request", return_value=response) as mock_request:
+            chunks = await service.stream_invoice("IRN-1", chunk_size=5)
+            body = [chunk async for chunk in chunks]
+
+        assert body == [b"%PDF-", b"1.7"]
+        assert mock_request.call_args.kwargs["stream"] is True
+        response.iter_content.assert_called_once_with(5)
+        response.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_missing_invoice_raises_before_streaming(self, service):
+        """Errors surface when the stream is opened, not midway through the body."""
+        response = _response(404)
+
+        with patch.object(service.session, "request", return_value=response):
+            with pytest.raises(HTTPException) as exc_info:
+                await service.stream_invoice("IRN-404")
+
+        assert exc_info.value.status_code == 404
+        response.close.assert_called_once()
+
+
+
+class TestJSONHandling:
+    """Test cases for orjson request and response handling."""
+
+    @pytest.mark.asyncio
+    async def test_json_payload_is_serialized_with_orjson(self, service):
+        """Outbound JSON bodies are sent as pre-encoded bytes with a JSON content type."""
+        with patch.object(service.session, "request", return_value=_response(200)) as mock_request:
+            await service._request("POST", "https://firs.test/api", json={"irn": "IRN-1", 1: "x"}, headers={"x-api-key": "key"})
+
+        kwargs = mock_request.call_args.kwargs
+        assert "json" not in kwargs
+        assert orjson.loads(kwargs["data"]) == {"irn": "IRN-1", "1": "x"}
+        assert kwargs["headers"] == {"x-api-key": "key", "Content-Type": "application/json"}
+
+    def test_json_parses_response_content(self):
+        """Response bodies are parsed from the raw content."""
+        assert FIRSService._json(_response(200, payload={"data": [1, 2]})) == {"data": [1, 2]}
+
+
+class TestHeaders:
+    """Test cases for the shared request headers."""
+
+    def test_headers_are_reused_until_token_changes(self, service):
+        """Repeated calls return the same read-only mapping."""
+        headers = service._get_auth_headers()
+
+        assert service._get_auth_headers() is headers
+        assert headers["Authorization"] == "Bearer token"
+        with pytest.raises(TypeError):
+            headers["Content-Type"] = "application/xml"
+
+        service.token = "refreshed"
+        assert service._get_auth_headers()["Authorization"] == "Bearer refreshed"
+
+    def test_headers_follow_credential_changes(self, service):
+        """Reassigning credentials rebuilds the default headers."""
+        service._get_default_headers()
+        service.api_key = "other-key"
+
+        assert service._get_default_headers()["x-api-key"] == "other-key"
+        assert service._get_auth_headers()["x-api-key"] == "other-key"
+
+    def test_default_headers_omit_authorization(self, service):
+        """Default headers never carry the bearer token."""
+        assert "Authorization" not in service._get_default_headers()
+
+
+class TestTokenRefresh:
+    """Test cases for refreshing the FIRS token before it expires."""
+
+    @pytest.fixture
+    def firs(self):
+        firs = FIRSService(base_url="https://firs.test", api_key="key", api_secret="secret", use_sandbox=True)
+        firs.token = "token"
+        firs._credentials = ("user@example.com", "password")
+        return firs
+
+    @pytest.mark.asyncio
+    async def test_fresh_token_is_used_as_is(self, firs):
+        """A token well within its lifetime is not refreshed."""
+        firs._token_expiry_mono = time.monotonic() + 3600
+
+        with patch.object(firs, "authenticate") as mock_authenticate:
+            await firs._ensure_authenticated()
+
+        mock_authenticate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_refresh(self, firs):
+        """A token about to expire is refreshed once for all waiting callers."""
+        firs._token_expiry_mono = time.monotonic() + 5
+
+        async def fake_authenticate(email, password):
+            await asyncio.sleep(0.01)
+            firs._token_expiry_mono = time.monotonic() + 3600
+
+        with patch.object(firs, "authenticate", side_effect=fake_authenticate) as mock_authenticate:
+            await asyncio.gather(*(firs._ensure_authenticated() for _ in range(5)))
+
+        mock_authenticate.assert_called_once_with("user@example.com", "password")
+
+    def test_refresh_lock_works_from_each_event_loop(self, firs):
+        """Contended refreshes on separate loops each get a lock bound to their own loop."""
+        async def fake_authenticate(email, password):
+            await asyncio.sleep(0.01)
+            firs._token_expiry_mono = time.monotonic() + 3600
+
+        async def refresh_concurrently():
+            firs._token_expiry_mono = time.monotonic() + 5
+            await asyncio.gather(*(firs._ensure_authenticated() for _ in range(3)))
+
+        with patch.object(firs, "authenticate", side_effect=fake_authenticate) as mock_authenticate:
+            asyncio.run(refresh_concurrently())
+            asyncio.run(refresh_concurrently())
+
+        assert mock_authenticate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_token_without_credentials_raises(self, firs):
+        """Without stored credentials an expired token still fails with 401."""
+        firs._credentials = None
+        firs._token_expiry_mono = time.monotonic() - 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await firs._ensure_authenticated()
+
+        assert exc_info.value.status_code == 401
+
+
+    @pytest.mark.asyncio
+    async def test_wall_clock_changes_do_not_affect_expiry(self, firs):
+        """Expiry is tracked on the monotonic clock, not the wall-clock timestamp."""
+        firs._token_expiry_mono = time.monotonic() + 3600
+        firs.token_expiry = None
+
+        with patch.object(firs, "authenticate") as mock_authenticate:
+            await firs._ensure_authenticated()
+
+        mock_authenticate.assert_not_called()
+
+
+class TestPooledTransport:
+    """Test cases for the pooled, non-blocking requests transport."""
+
+    def test_session_mounts_pooled_adapter(self, service):
+        """HTTPS calls go through a shared, sized connection pool."""
+        adapter = service.session.get_adapter("https://firs.test/api")
+
+        assert adapter._pool_maxsize == 50
+        assert adapter.max_retries.total == 0
+
+    @pytest.mark.asyncio
+    async def test_requests_run_off_the_event_loop(self, service):
+        """The blocking requests call runs in a worker thread."""
+        threads = []
+
+        def fake_request(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return _response(200)
+
+        with patch.object(service.session, "request", side_effect=fake_request):
+            await service._request("GET", "https://firs.test/api")
+
+        assert threads and threads[0] is not threading.main_thread()
+
+
+class TestSandboxBatchValidation:
+    """Test cases for validating IRN batches against the sandbox."""
+
+    @pytest.mark.asyncio
+    async def test_batch_runs_concurrently_and_records_once(self):
+        """Sandbox calls overlap up to the cap and are recorded in one insert."""
+        from app.services.firs_core import firs_api_client
+
+        active = peak = 0
+
+        async def fake_validate(self, irn_value):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"success": True, "message": "ok", "details": {"source": "firs_sandbox"}}
+
+        known = MagicMock(irn="IRN-1", invoice_number="INV-1")
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = [known]
+        irns = [f"IRN-{i}" for i in range(6)]
+
+        with patch.object(FIRSService, "validate_irn_sandbox", fake_validate), \
+             patch.object(firs_api_client, "create_validation_records_bulk") as mock_bulk:
+            result = await firs_api_client.validate_irns_with_firs_sandbox(db, irns, max_concurrency=3)
+
+        assert peak == 3
+        assert [r["irn"] for r in result["results"]] == irns
+        assert result["successful"] == 6
+        db.query.assert_called_once()
+        records = mock_bulk.call_args.args[1]
+        assert [r["irn"] for r in records] == ["IRN-1"]
+        assert "irn_record" in result["results"][1]["details"]
@@ -0,0 +1,75 @@
+"""
+Tests for the FIRS certification service HTTP client handling.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.firs_certification_service import FIRSCertificationService
+
+
+@pytest.fixture
+def service():
+    return FIRSCertificationService()
+
+
+class TestSharedClient:
+    """Test cases for the shared HTTP/2 client."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_across_calls(self, service):
+        """Every call goes through one pooled client."""
+        client = service._get_http_client()
+
+        assert service._get_http_client() is client
+        assert str(client.base_url).rstrip("/") == service.sandbox_base_url
+
+        await service.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_is_recreated_after_close(self, service):
+        """A closed client is replaced on next use."""
+        client = service._get_http_client()
+        await service.aclose()
+
+        assert client.is_closed
+        assert service._get_http_client() is not client
+
+        await service.aclose()
+
+    @pytest.mark.asyncio
+    async def test_requests_use_shared_client(self, service):
+        """Resource lookups are sent through the shared client."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            return httpx.Response(200, json={"data": []})
+
+        service._http_clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        await service.get_countries()
+        await service.get_currencies()
+
+        assert seen == ["/api/v1/invoice/resources/countries", "/api/v1/invoice/resources/currencies"]
+        await service.aclose()
+
+    def test_each_event_loop_gets_its_own_client(self, service):
+        """A loop never reuses a client whose connections belong to another loop."""
+        async def use_client():
+            client = service._get_http_client()
+            assert service._get_http_client() is client
+            return client
+
+        async def use_and_close():
+            client = await use_client()
+            await service.aclose()
+            return client
+
+        first = asyncio.run(use_client())
+        second = asyncio.run(use_and_close())
+
+        assert second is not first
+        assert second.is_closed
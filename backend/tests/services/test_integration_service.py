@@ -1,13 +1,42 @@
+import threading
+
 import pytest # type: ignore
 from unittest.mock import MagicMock, patch, call
+from datetime import datetime
+from types import SimpleNamespace
 from uuid import uuid4
 
+from app.services import integration_service
 from app.services.integration_service import (
     encrypt_sensitive_config_fields,
     decrypt_sensitive_config_fields,
     create_integration,
-    SENSITIVE_CONFIG_FIELDS
+    update_integration,
+    get_integrations,
+    batch_decrypt_configs,
+    sync_odoo_invoices,
+    validate_integration_config,
+    create_integration_from_template,
+    get_integration_templates,
+    decrypt_integration_config,
+    LazyDecryptedConfig,
+    SENSITIVE_CONFIG_FIELDS,
+    clear_decrypted_value_cache,
+    clear_integration_cache,
+    get_integration
 ) # type: ignore
+from app.schemas.integration import Integration, IntegrationTestResult, IntegrationUpdate # type: ignore
+from app.models.integration import IntegrationType # type: ignore
+
+
+@pytest.fixture(autouse=True)
+def _fresh_decrypted_value_cache():
+    """Keep cached plaintext from leaking between tests that mock decryption."""
+    clear_decrypted_value_cache()
+    clear_integration_cache()
+    yield
+    clear_decrypted_value_cache()
+    clear_integration_cache()
 
 
 def test_encrypt_sensitive_config_fields():
@@ -135,4 +164,594 @@ def test_create_integration(mock_decrypt, mock_encrypt, mock_create):
     mock_encrypt.assert_called_once_with(integration_in.config)
     
     # Verify decrypt_integration_config was called
-    mock_decrypt.assert_called_once_with(mock_integration) 
\ No newline at end of file
+    mock_decrypt.assert_called_once_with(mock_integration) 
+
+@patch("app.services.integration_service.crud.integration.update")
+@patch("app.services.integration_service.encrypt_sensitive_config_fields")
+@patch("app.services.integration_service.decrypt_integration_config")
+def test_update_integration_keeps_unset_fields_unset(mock_decrypt, mock_encrypt, mock_update):
+    """Test updating an integration only swaps in the encrypted config."""
+    db = MagicMock()
+    db_obj = MagicMock()
+    integration_in = IntegrationUpdate(config={"api_key": "secret-api-key"})
+    mock_encrypt.return_value = {"api_key": "encrypted_secret-api-key"}
+    
+    update_integration(db, db_obj, integration_in, uuid4())
+    
+    mock_encrypt.assert_called_once_with({"api_key": "secret-api-key"}, stored=db_obj.config)
+    obj_in = mock_update.call_args.kwargs["obj_in"]
+    assert obj_in.config == {"api_key": "encrypted_secret-api-key"}
+    assert obj_in.dict(exclude_unset=True) == {"config": {"api_key": "encrypted_secret-api-key"}}
+    assert integration_in.config == {"api_key": "secret-api-key"}
+
+
+def test_encrypt_sensitive_config_fields_copies_only_changed_branches():
+    """Test that subtrees without sensitive fields are shared, not copied."""
+    config = {
+        "api_key": "secret-api-key",
+        "mapping": {"invoice": {"number": "ref"}},
+        "auth": {"password": "nested-password"}
+    }
+    
+    with patch("app.services.integration_service.encrypt_sensitive_value") as mock_encrypt, \
+         patch("app.services.integration_service.get_app_encryption_key") as mock_get_key:
+        mock_encrypt.side_effect = lambda value, key: f"encrypted_{value}"
+        mock_get_key.return_value = "test-key"
+        
+        encrypted_config = encrypt_sensitive_config_fields(config)
+        
+        # The key is fetched once for the whole tree
+        mock_get_key.assert_called_once()
+    
+    assert encrypted_config["mapping"] is config["mapping"]
+    assert encrypted_config["auth"] is not config["auth"]
+    assert encrypted_config["auth"]["password"] == "encrypted_nested-password"
+    
+    # The caller's config is left untouched
+    assert config["api_key"] == "secret-api-key"
+    assert config["auth"]["password"] == "nested-password"
+    
+    # Nothing sensitive means nothing is copied
+    plain_config = {"api_url": "https://api.example.com", "settings": {"timeout": 30}}
+    assert decrypt_sensitive_config_fields(plain_config) is plain_config
+
+
+@patch("app.services.integration_service.undefer")
+@patch("app.services.integration_service.get_app_encryption_key")
+@patch("app.services.integration_service.decrypt_sensitive_value")
+def test_get_integrations_decrypts_page_in_one_batch(mock_decrypt, mock_get_key, mock_undefer):
+    """Test listing integrations decrypts every row with one key lookup."""
+    db = MagicMock()
+    rows = [
+        SimpleNamespace(name="first", config={"api_key": "encrypted_one", "timeout": 30}),
+        SimpleNamespace(name="second", config={"auth": {"password": "encrypted_two"}}),
+        SimpleNamespace(name="third", config={"api_url": "https://api.example.com"})
+    ]
+    db.query.return_value.options.return_value.offset.return_value.limit.return_value.all.return_value = rows
+    mock_get_key.return_value = b"test-key"
+    mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+    
+    result = get_integrations(db)
+    
+    mock_get_key.assert_called_once()
+    assert mock_decrypt.call_count == 2
+    # The deferred config column is loaded with the page rather than per row
+    mock_undefer.assert_called_once()
+    assert [integration.name for integration in result] == ["first", "second", "third"]
+    assert result[0].config == {"api_key": "one", "timeout": 30}
+    assert result[1].config == {"auth": {"password": "two"}}
+    assert result[2].config is rows[2].config
+    # Stored rows keep their ciphertext
+    assert rows[1].config["auth"]["password"] == "encrypted_two"
+
+
+def test_decrypt_integration_config_leaves_orm_object_untouched():
+    """Test decrypting an integration reads ORM attributes without mutating them."""
+    now = datetime.utcnow()
+    config = {"api_url": "https://api.example.com", "api_key": "encrypted_secret-api-key"}
+    db_integration = SimpleNamespace(
+        id=uuid4(),
+        client_id=uuid4(),
+        name="Test Integration",
+        description=None,
+        integration_type="custom",
+        config=config,
+        sync_frequency="hourly",
+        created_at=now,
+        updated_at=now,
+        created_by=None,
+        last_tested=None,
+        last_sync=None,
+        next_sync=None,
+        status="configured"
+    )
+    
+    with patch("app.services.integration_service.decrypt_sensitive_value") as mock_decrypt:
+        mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+        
+        result = decrypt_integration_config(db_integration, key=b"test-key")
+        
+        assert result.name == "Test Integration"
+        # Trusted rows are not re-validated, so values are carried over as-is
+        assert result.id is db_integration.id
+        assert result.integration_type == "custom"
+        # Nothing is decrypted until a sensitive field is read
+        mock_decrypt.assert_not_called()
+        
+        assert result.config["api_url"] == "https://api.example.com"
+        mock_decrypt.assert_not_called()
+        
+        assert result.config["api_key"] == "secret-api-key"
+        assert result.config["api_key"] == "secret-api-key"
+        mock_decrypt.assert_called_once_with("encrypted_secret-api-key", b"test-key")
+    
+    assert db_integration.config["api_key"] == "encrypted_secret-api-key"
+    assert "secret" not in repr(result.config)
+
+
+def test_lazy_decrypted_config_behaves_like_a_dict():
+    """Test the lazy config view decrypts nested values and converts to a plain dict."""
+    config = {"url": "https://erp.example.com", "auth": {"password": "encrypted_pw"}}
+    
+    with patch("app.services.integration_service.decrypt_sensitive_value") as mock_decrypt, \
+         patch("app.services.integration_service.get_app_encryption_key") as mock_get_key:
+        mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+        mock_get_key.return_value = b"test-key"
+        
+        lazy_config = LazyDecryptedConfig(config)
+        
+        assert len(lazy_config) == 2
+        assert "auth" in lazy_config
+        assert lazy_config.get("missing") is None
+        assert lazy_config["auth"]["password"] == "pw"
+        assert dict(lazy_config)["url"] == "https://erp.example.com"
+
+
+def test_flat_config_without_secrets_is_returned_untouched():
+    """Test a config with no sensitive or nested fields skips all encryption work."""
+    config = {"api_url": "https://api.example.com", "timeout": 30}
+    
+    with patch("app.services.integration_service.get_app_encryption_key") as mock_get_key:
+        assert encrypt_sensitive_config_fields(config) is config
+        assert decrypt_sensitive_config_fields(config) is config
+    
+    mock_get_key.assert_not_called()
+
+
+def test_decrypted_values_are_cached_per_key():
+    """Test repeated ciphertext is decrypted once per key and dropped on update."""
+    config = {"api_key": "encrypted_secret-api-key"}
+    
+    with patch("app.services.integration_service.decrypt_sensitive_value") as mock_decrypt, \
+         patch("app.services.integration_service.crud.integration.update"), \
+         patch("app.services.integration_service.decrypt_integration_config"):
+        mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+        
+        for _ in range(3):
+            assert decrypt_sensitive_config_fields(config, key=b"test-key")["api_key"] == "secret-api-key"
+        assert mock_decrypt.call_count == 1
+        
+        decrypt_sensitive_config_fields(config, key=b"other-key")
+        assert mock_decrypt.call_count == 2
+        
+        update_integration(MagicMock(), MagicMock(), IntegrationUpdate(config={"timeout": 30}), uuid4())
+        decrypt_sensitive_config_fields(config, key=b"test-key")
+        assert mock_decrypt.call_count == 3
+
+
+def test_batch_decrypt_configs_shares_untouched_branches():
+    """Test batch decryption copies only the dicts on a decrypted path."""
+    configs = [
+        {"mapping": {"invoice": "ref"}, "auth": {"token": "encrypted_t", "scheme": "bearer"}},
+        None,
+        {}
+    ]
+    
+    with patch("app.services.integration_service.decrypt_sensitive_value") as mock_decrypt:
+        mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+        
+        result = batch_decrypt_configs(configs, key=b"test-key")
+    
+    assert result[0] == {"mapping": {"invoice": "ref"}, "auth": {"token": "t", "scheme": "bearer"}}
+    assert result[0]["mapping"] is configs[0]["mapping"]
+    assert configs[0]["auth"]["token"] == "encrypted_t"
+    assert result[1:] == [None, {}]
+
+
+@patch("app.services.integration_service.fetch_odoo_invoices")
+@patch("app.services.integration_service.crud.integration.get")
+@patch("app.services.integration_service.decrypt_sensitive_value")
+def test_sync_odoo_invoices_decrypts_only_the_credential_it_uses(mock_decrypt, mock_get, mock_fetch):
+    """Test the Odoo sync reads one secret through the lazy config, decrypting it once."""
+    now = datetime.utcnow()
+    mock_get.return_value = SimpleNamespace(
+        id=uuid4(), client_id=uuid4(), name="Odoo", description=None,
+        integration_type=IntegrationType.ODOO, sync_frequency="hourly",
+        created_at=now, updated_at=now, created_by=None, last_tested=None,
+        last_sync=None, next_sync=None, status="configured",
+        config={
+            "url": "https://odoo.example.com",
+            "database": "prod",
+            "username": "admin",
+            "auth_method": "api_key",
+            "api_key": "encrypted_key",
+            "password": "encrypted_password"
+        }
+    )
+    mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+    mock_fetch.return_value = [{"id": 1}]
+    
+    with patch("app.services.integration_service.get_app_encryption_key", return_value=b"test-key"):
+        result = sync_odoo_invoices(MagicMock(), uuid4())
+    
+    assert result["success"] is True
+    assert mock_fetch.call_args.args[0].api_key == "key"
+    mock_decrypt.assert_called_once_with("encrypted_key", b"test-key")
+
+
+def test_encrypt_sensitive_config_fields_handles_deep_nesting():
+    """Test sensitive values several levels down are found and only their path is copied."""
+    config = {"a": {"b": {"c": {"token": "t", "keep": 1}, "sibling": {"x": 1}}}}
+    
+    with patch("app.services.integration_service.encrypt_sensitive_value") as mock_encrypt:
+        mock_encrypt.side_effect = lambda value, key: f"encrypted_{value}"
+        
+        encrypted_config = encrypt_sensitive_config_fields(config, key=b"test-key")
+    
+    assert encrypted_config["a"]["b"]["c"] == {"token": "encrypted_t", "keep": 1}
+    assert encrypted_config["a"]["b"]["sibling"] is config["a"]["b"]["sibling"]
+    assert config["a"]["b"]["c"]["token"] == "t"
+
+
+def test_validate_integration_config_reports_every_schema_error():
+    """Test all schema violations are reported in one validation pass."""
+    config = {
+        "type": "rest_api",
+        "timeout": 0,
+        "api_url": "",
+        "test_method": "FETCH"
+    }
+    
+    is_valid, errors = validate_integration_config(config)
+    
+    assert not is_valid
+    assert errors == [
+        "General validation error: 0 is less than the minimum of 1",
+        "REST API validation error: '' should be non-empty",
+        "REST API validation error: 'FETCH' is not one of "
+        "['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PATCH', 'POST', 'PUT']"
+    ]
+
+
+def test_validate_integration_config_flags_unknown_fields_only():
+    """Test unknown top-level fields are reported while custom_ fields are allowed."""
+    base_config = {"type": "soap", "service_url": "https://erp.example.com/ws"}
+    
+    assert validate_integration_config(base_config) == (True, [])
+    assert validate_integration_config({**base_config, "custom_region": "ng"}) == (True, [])
+    assert validate_integration_config({**base_config, "colour": "blue"}) == (
+        False, ["Unknown configuration field: 'colour'"]
+    )
+
+
+def test_rest_api_connection_test_uses_shared_session():
+    """Test REST connection checks go through the pooled session without touching the config."""
+    config = LazyDecryptedConfig({
+        "type": "rest_api",
+        "api_url": "https://api.example.com",
+        "test_endpoint": "/ping",
+        "test_method": "POST",
+        "auth_type": "bearer",
+        "api_key": "encrypted_secret-api-key",
+        "headers": {"Accept": "application/json"},
+        "test_data": {"probe": {"depth": 1}}
+    }, b"test-key")
+    response = MagicMock(status_code=200, headers={})
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [b"{}"]
+    
+    with patch("app.services.integration_service.decrypt_sensitive_value") as mock_decrypt, \
+         patch.object(integration_service._HTTP_SESSION, "post", return_value=response) as mock_post:
+        mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+        
+        result = integration_service._test_rest_api_connection(SimpleNamespace(config=config))
+    
+    assert result.success is True
+    mock_post.assert_called_once_with(
+        "https://api.example.com/ping",
+        json={"probe": {"depth": 1}},
+        headers={"Accept": "application/json", "Authorization": "Bearer secret-api-key"},
+        timeout=10,
+        stream=True
+    )
+    assert result.details["response_size"] == 2
+    response.__exit__.assert_called_once()
+    assert dict(config["headers"]) == {"Accept": "application/json"}
+
+
+@patch.dict("app.services.integration_service._CONNECTION_TESTS", {"soap": MagicMock()})
+@patch("app.services.integration_service.crud.integration.update")
+@patch("app.services.integration_service.crud.integration.get")
+def test_integration_connection_fetches_row_once(mock_get, mock_update):
+    """Test the connection test reuses one fetched row for the timestamp update."""
+    mock_test_soap = integration_service._CONNECTION_TESTS["soap"]
+    db = MagicMock()
+    db_obj = SimpleNamespace(**{field: None for field in Integration.__fields__})
+    db_obj.config = {"type": "soap", "service_url": "https://erp.example.com/ws"}
+    mock_get.return_value = db_obj
+    
+    result = integration_service.test_integration_connection(db, uuid4())
+    
+    assert result is mock_test_soap.return_value
+    mock_get.assert_called_once()
+    assert mock_update.call_args.kwargs["db_obj"] is db_obj
+    assert set(mock_update.call_args.kwargs["obj_in"].dict(exclude_unset=True)) == {"last_tested"}
+
+
+@patch.dict("app.services.integration_service._CONNECTION_TESTS", {"soap": MagicMock()})
+@patch("app.services.integration_service.crud.integration.update")
+@patch("app.services.integration_service.crud.integration.get")
+def test_integration_connection_shares_recent_results_per_config(mock_get, mock_update):
+    """Test that max_age reuses a fresh result until the config changes or is invalidated."""
+    mock_test_soap = integration_service._CONNECTION_TESTS["soap"]
+    db_obj = SimpleNamespace(**{field: None for field in Integration.__fields__})
+    db_obj.config = {"type": "soap", "service_url": "https://erp.example.com/ws"}
+    mock_get.return_value = db_obj
+    integration_id = uuid4()
+    
+    first = integration_service.test_integration_connection(MagicMock(), integration_id)
+    again = integration_service.test_integration_connection(MagicMock(), integration_id, max_age=60)
+    assert again is first
+    assert mock_test_soap.call_count == 1
+    
+    # A plain call always probes
+    integration_service.test_integration_connection(MagicMock(), integration_id)
+    assert mock_test_soap.call_count == 2
+    
+    # A changed config gets its own entry
+    db_obj.config = {"type": "soap", "service_url": "https://erp.example.com/ws2"}
+    integration_service.test_integration_connection(MagicMock(), integration_id, max_age=60)
+    assert mock_test_soap.call_count == 3
+    
+    integration_service.invalidate_test_cache(integration_id)
+    integration_service.test_integration_connection(MagicMock(), integration_id, max_age=60)
+    assert mock_test_soap.call_count == 4
+
+
+@patch("app.services.integration_service.create_integration")
+def test_create_integration_from_template_does_not_share_nested_config(mock_create):
+    """Test template-based integrations get their own copy of nested template dicts."""
+    create_integration_from_template(
+        MagicMock(), "xero", uuid4(), uuid4(), config_values={"timeout": 60}
+    )
+    
+    config = mock_create.call_args.args[1].config
+    template_config = get_integration_templates()["xero"]["config"]
+    assert config["timeout"] == 60
+    assert template_config["timeout"] == 30
+    assert config["headers"] == template_config["headers"]
+    assert config["headers"] is not template_config["headers"]
+    
+    with pytest.raises(TypeError):
+        get_integration_templates()["xero"] = {}
+
+
+def test_nested_config_without_secrets_skips_key_lookup():
+    """Test nested configs with no sensitive values never resolve the key."""
+    config = {"headers": {"Accept": "application/json"}, "endpoints": {"invoices": "/Invoices"}}
+    
+    with patch("app.services.integration_service.get_app_encryption_key") as mock_get_key:
+        assert encrypt_sensitive_config_fields(config) is config
+        assert decrypt_sensitive_config_fields(config) is config
+    
+    mock_get_key.assert_not_called()
+
+
+def test_encrypt_keeps_stored_ciphertext_for_unchanged_secrets():
+    """Test secrets echoed back from the stored config are not re-encrypted."""
+    stored = {
+        "api_key": "encrypted_secret-api-key",
+        "auth": {"password": "encrypted_pw"},
+        "token": "legacy-plaintext"
+    }
+    config = {
+        "api_key": "encrypted_secret-api-key",
+        "auth": {"password": "pw"},
+        "token": "legacy-plaintext",
+        "client_secret": "new-secret"
+    }
+    
+    with patch("app.services.integration_service.encrypt_sensitive_value") as mock_encrypt, \
+         patch("app.services.integration_service.decrypt_sensitive_value") as mock_decrypt:
+        mock_encrypt.side_effect = lambda value, key: f"encrypted_{value}"
+        mock_decrypt.side_effect = lambda value, key: value.replace("encrypted_", "")
+        
+        encrypted_config = encrypt_sensitive_config_fields(config, key=b"test-key", stored=stored)
+    
+    assert encrypted_config == {
+        "api_key": "encrypted_secret-api-key",
+        "auth": {"password": "encrypted_pw"},
+        "token": "encrypted_legacy-plaintext",
+        "client_secret": "encrypted_new-secret"
+    }
+    assert sorted(call.args[0] for call in mock_encrypt.call_args_list) == ["legacy-plaintext", "new-secret"]
+
+
+@patch("app.services.integration_service.undefer")
+@patch.dict("app.services.integration_service._CONNECTION_TESTS", {"soap": MagicMock()})
+def test_integrations_bulk_probes_concurrently_and_reports_missing(mock_undefer):
+    """Test bulk connection tests run in parallel and stamp rows on the calling thread."""
+    mock_test_soap = integration_service._CONNECTION_TESTS["soap"]
+    ids = [uuid4(), uuid4(), uuid4()]
+    rows = []
+    for integration_id in ids[:2]:
+        row = SimpleNamespace(**{field: None for field in Integration.__fields__})
+        row.id = integration_id
+        row.config = {"type": "soap", "service_url": "https://erp.example.com/ws"}
+        rows.append(row)
+    db = MagicMock()
+    db.query.return_value.options.return_value.filter.return_value.all.return_value = rows
+    
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def probe(integration):
+        # Both probes must be in flight at once to get past the barrier
+        barrier.wait()
+        return IntegrationTestResult(success=True, message=str(integration.id))
+    
+    mock_test_soap.side_effect = probe
+    
+    results = integration_service.test_integrations_bulk(db, ids)
+    
+    assert [results[integration_id].message for integration_id in ids[:2]] == [str(i) for i in ids[:2]]
+    assert results[ids[2]].details == {"error": "integration_not_found"}
+    assert all(row.last_tested is not None for row in rows)
+    db.commit.assert_called_once()
+
+
+def test_response_size_is_capped_and_never_buffers():
+    """Test response sizing trusts large Content-Length values and caps counted bodies."""
+    declared = MagicMock(headers={"Content-Length": str(10 * 1024 * 1024)})
+    assert integration_service._response_size(declared) == 10 * 1024 * 1024
+    declared.iter_content.assert_not_called()
+    
+    chunked = MagicMock(headers={})
+    chunked.iter_content.return_value = iter([b"x" * 8192] * 100)
+    assert integration_service._response_size(chunked) == 8192 * 9
+
+
+def test_connection_test_dispatch_covers_every_config_type():
+    """Test every valid config type has a connection test and a validator."""
+    assert set(integration_service._CONNECTION_TESTS) == integration_service._VALID_CONFIG_TYPES
+    assert set(integration_service._CONFIG_VALIDATORS) == integration_service._VALID_CONFIG_TYPES
+    
+    result = integration_service._run_connection_test(SimpleNamespace(config={"type": "ftp"}))
+    assert result.success is False
+    assert result.details == {"error": "unsupported_type"}
+
+
+@patch("app.services.integration_service.crud.integration.get")
+def test_get_integration_caches_until_row_changes(mock_get):
+    """Test repeat reads reuse the decrypted config until updated_at moves, on separate objects."""
+    row = SimpleNamespace(**{field: None for field in Integration.__fields__})
+    row.id = uuid4()
+    row.updated_at = datetime(2024, 1, 1)
+    row.config = {"api_key": "encrypted_secret-api-key"}
+    mock_get.return_value = row
+    
+    with patch("app.services.integration_service.decrypt_integration_config",
+               wraps=decrypt_integration_config) as decrypt:
+        first = get_integration(MagicMock(), row.id)
+        second = get_integration(MagicMock(), row.id)
+        assert decrypt.call_count == 1
+        assert second.config is first.config
+        
+        # Callers get their own object, so attribute writes do not leak into the cache
+        first.status = "active"
+        assert second.status is None
+        assert get_integration(MagicMock(), row.id).status is None
+        
+        row.updated_at = datetime(2024, 1, 2)
+        assert get_integration(MagicMock(), row.id).config is not first.config
+        assert decrypt.call_count == 2
+
+
+
+@patch("app.services.integration_service.decrypt_sensitive_value")
+@patch("app.services.integration_service.crud.integration.get")
+def test_export_integration_config_redacts_stored_secrets(mock_get, mock_decrypt):
+    """Test exports replace top-level and nested secrets without decrypting them."""
+    row = SimpleNamespace(**{field: None for field in Integration.__fields__})
+    row.id = uuid4()
+    row.name = "Test Integration"
+    row.integration_type = "custom"
+    row.sync_frequency = "hourly"
+    row.created_at = datetime(2024, 1, 1)
+    row.config = {
+        "api_url": "https://api.example.com",
+        "api_key": "encrypted_secret-api-key",
+        "auth": {"username": "admin", "password": "encrypted_secret-password"},
+        "options": {"timeout": 30}
+    }
+    mock_get.return_value = row
+    
+    export = integration_service.export_integration_config(MagicMock(), row.id)
+    
+    mock_decrypt.assert_not_called()
+    assert export.config == {
+        "api_url": "https://api.example.com",
+        "api_key": "<REQUIRES_INPUT>",
+        "auth": {"username": "admin", "password": "<REQUIRES_INPUT>"},
+        "options": {"timeout": 30}
+    }
+    # The stored row keeps its ciphertext
+    assert row.config["api_key"] == "encrypted_secret-api-key"
+    assert row.config["auth"]["password"] == "encrypted_secret-password"
+
+def test_config_urls_must_be_absolute_http():
+    """Test REST and SOAP URLs are checked for an http(s) scheme."""
+    rest = {"type": "rest_api", "api_url": "https://api.example.com/v1"}
+    soap = {"type": "soap", "service_url": "http://erp.example.com/ws"}
+    
+    assert validate_integration_config(rest) == (True, [])
+    assert validate_integration_config(soap) == (True, [])
+    assert "API URL must start with http:// or https://" in validate_integration_config(
+        {**rest, "api_url": "ftp://api.example.com"}
+    )[1]
+    assert "Service URL must start with http:// or https://" in validate_integration_config(
+        {**soap, "service_url": "https://erp example.com"}
+    )[1]
+
+
+@patch("app.services.integration_service.IntegrationUpdate")
+@patch("app.services.integration_service.update_integration")
+@patch("app.services.integration_service.get_integration")
+def test_monitors_share_one_event_loop_and_stop_by_cancelling(mock_get, mock_update, mock_update_schema):
+    """Test that every monitor runs as a task on the shared loop rather than its own thread."""
+    ids = [uuid4(), uuid4()]
+    checked = []
+    done = threading.Event()
+
+    def record_check(integration_id, interval_minutes):
+        checked.append((integration_id, threading.current_thread().name))
+        if len(checked) == len(ids):
+            done.set()
+
+    mock_get.return_value = MagicMock()
+    with patch("app.services.integration_service._check_integration_status", side_effect=record_check):
+        threads_before = threading.active_count()
+        for integration_id in ids:
+            assert integration_service.start_integration_monitoring(MagicMock(), integration_id, interval_minutes=60)
+        assert done.wait(5)
+
+        tasks = [integration_service._monitoring_tasks[str(i)] for i in ids]
+        for integration_id in ids:
+            assert integration_service.stop_integration_monitoring(MagicMock(), integration_id)
+
+    assert {integration_id for integration_id, _ in checked} == set(ids)
+    # One monitor loop thread plus at most one executor worker per check
+    assert threading.active_count() - threads_before <= 1 + len(ids)
+    for task in tasks:
+        with pytest.raises(Exception):
+            task.result(timeout=5)
+        assert task.cancelled()
+
+
+@patch("app.services.integration_service.get_integration")
+@patch("app.services.integration_service.test_integration_connection")
+def test_monitor_check_updates_status_without_rereading(mock_test, mock_get):
+    """Test that a monitor tick writes the status with one UPDATE and no extra read."""
+    mock_test.return_value = IntegrationTestResult(success=True, message="ok")
+    db = MagicMock()
+    db.query.return_value.filter.return_value.update.return_value = 1
+    integration_id = uuid4()
+    
+    with patch("app.db.session.SessionLocal", return_value=db):
+        integration_service._check_integration_status(integration_id, interval_minutes=30)
+    
+    mock_get.assert_not_called()
+    update = db.query.return_value.filter.return_value.update
+    update.assert_called_once()
+    assert list(update.call_args.args[0].values()) == ["active"]
+    db.commit.assert_called_once()
+    assert integration_service._status_cache[str(integration_id)]["status"] == "active"
@@ -0,0 +1,302 @@
+import asyncio
+import importlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# The SI service keeps its own copies of the IRN functions; both must behave the same
+IRN_SERVICE_MODULES = ["app.services.irn_service", "app.services.firs_si.irn_generation_service"]
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_expire_outdated_irns_issues_one_bulk_update(module_name):
+    """Test that expiry is a single UPDATE rather than a load-and-save loop."""
+    expire_outdated_irns = importlib.import_module(module_name).expire_outdated_irns
+    db = MagicMock()
+    query = db.query.return_value.filter.return_value
+    query.update.return_value = 3
+    
+    assert expire_outdated_irns(db) == 3
+    
+    query.update.assert_called_once()
+    assert query.update.call_args.kwargs["synchronize_session"] is False
+    query.all.assert_not_called()
+    db.commit.assert_called_once()
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_expire_outdated_irns_skips_commit_when_nothing_expired(module_name):
+    """Test that an empty sweep does not commit."""
+    expire_outdated_irns = importlib.import_module(module_name).expire_outdated_irns
+    db = MagicMock()
+    db.query.return_value.filter.return_value.update.return_value = 0
+    
+    assert expire_outdated_irns(db) == 0
+    db.commit.assert_not_called()
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_invoice_data_round_trips_and_serializes_dates(module_name):
+    """Test that stored invoice data round-trips and accepts datetime and UUID values."""
+    from datetime import datetime
+    from uuid import uuid4
+    module = importlib.import_module(module_name)
+    encode_invoice_data, decode_invoice_data = module.encode_invoice_data, module.decode_invoice_data
+    
+    invoice_id = uuid4()
+    encoded = encode_invoice_data({
+        "invoice_number": "INV001",
+        "total_amount": 1075.5,
+        "issued_at": datetime(2025, 1, 2, 3, 4, 5),
+        "invoice_id": invoice_id,
+        1: "numeric key",
+    })
+    
+    assert isinstance(encoded, str)
+    assert decode_invoice_data(encoded) == {
+        "invoice_number": "INV001",
+        "total_amount": 1075.5,
+        "issued_at": "2025-01-02T03:04:05",
+        "invoice_id": str(invoice_id),
+        "1": "numeric key",
+    }
+
+
+def _irn_record(**overrides):
+    from datetime import datetime, timedelta
+    from types import SimpleNamespace
+    from app.models.irn import IRNStatus # type: ignore
+    
+    fields = {
+        "valid_until": datetime.utcnow() + timedelta(days=1),
+        "status": IRNStatus.ACTIVE,
+        "verification_code": "abc123def456",
+        "invoice_data": None,
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_verify_irn_rejects_expired_before_checking_code(module_name):
+    """Test that an expired IRN fails on expiry even with a wrong code."""
+    from datetime import datetime, timedelta
+    verify_irn = importlib.import_module(module_name).verify_irn
+    
+    db = MagicMock()
+    db.get.return_value = _irn_record(valid_until=datetime.utcnow() - timedelta(days=1))
+    
+    with patch(f"{module_name}.hmac.compare_digest") as compare:
+        assert verify_irn(db, "INV001-94ND90NR-20240611", "wrong", {}) == (False, "IRN has expired")
+    compare.assert_not_called()
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_verify_irn_compares_codes_in_constant_time(module_name):
+    """Test that verification codes go through hmac.compare_digest."""
+    verify_irn = importlib.import_module(module_name).verify_irn
+    
+    db = MagicMock()
+    db.get.return_value = _irn_record()
+    
+    assert verify_irn(db, "INV001-94ND90NR-20240611", "abc123def456", {}) == (True, "IRN verification successful")
+    assert verify_irn(db, "INV001-94ND90NR-20240611", "abc123def457", {}) == (False, "Invalid verification code")
+    
+    db.get.return_value = _irn_record(verification_code=None)
+    assert verify_irn(db, "INV001-94ND90NR-20240611", None, {}) == (False, "Invalid verification code")
+
+
+class _FakeRedis:
+    """Just enough of a Redis client for the verification cache."""
+    
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+    
+    def pipeline(self):
+        return self
+    
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+    
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+    
+    def execute(self):
+        pass
+    
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+    
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_verify_irn_reuses_cached_results_until_invalidated(module_name):
+    """Test that repeat verifications are served from the cache."""
+    from app.cache.irn_cache import IRNCache, VERIFICATION_CACHE_EXPIRY # type: ignore
+    verify_irn = importlib.import_module(module_name).verify_irn
+    
+    db = MagicMock()
+    db.get.return_value = _irn_record()
+    fake_redis = _FakeRedis()
+    
+    with patch("app.cache.irn_cache.redis_client", fake_redis):
+        for _ in range(2):
+            assert verify_irn(db, "INV001-94ND90NR-20240611", "abc123def456", {}) == (True, "IRN verification successful")
+            assert verify_irn(db, "INV001-94ND90NR-20240611", "wrong", {}) == (False, "Invalid verification code")
+        assert db.get.call_count == 2
+        
+        # Codes are only stored as digests, and never beyond the cap
+        key = "irn:verify:INV001-94ND90NR-20240611"
+        assert all("abc123def456" not in field for field in fake_redis.hashes[key])
+        assert 0 < fake_redis.ttls[key] <= VERIFICATION_CACHE_EXPIRY
+        
+        IRNCache.invalidate_irn_cache("INV001-94ND90NR-20240611")
+        verify_irn(db, "INV001-94ND90NR-20240611", "abc123def456", {})
+        assert db.get.call_count == 3
+
+
+def test_validation_records_are_inserted_in_one_statement():
+    """Test that bulk validation records go out as one INSERT and one commit."""
+    from app.services.firs_si.irn_generation_service import create_validation_records_bulk # type: ignore
+    
+    db = MagicMock()
+    records = [
+        {"irn": f"INV00{i}-SVC00001-20250102", "validation_status": True, "validation_message": "IRN is active"}
+        for i in range(3)
+    ]
+    
+    assert create_validation_records_bulk(db, records) == 3
+    
+    db.execute.assert_called_once()
+    rows = db.execute.call_args.args[1]
+    assert [row["irn"] for row in rows] == [record["irn"] for record in records]
+    assert all(row["id"] and row["validation_date"] for row in rows)
+    db.add.assert_not_called()
+    db.commit.assert_called_once()
+    
+    db.reset_mock()
+    assert create_validation_records_bulk(db, []) == 0
+    db.execute.assert_not_called()
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_validation_record_commit_keeps_session_objects_loaded(module_name):
+    """Test that recording a validation neither refreshes nor expires loaded objects."""
+    module = importlib.import_module(module_name)
+    
+    db = MagicMock()
+    db.expire_on_commit = True
+    db.commit.side_effect = lambda: commits.append(db.expire_on_commit)
+    commits = []
+    
+    with patch.object(module, "IRNValidationRecord") as record_cls:
+        record = module.create_validation_record(db, "INV001-SVC00001-20250102", True, "IRN is active")
+    
+    assert record is record_cls.return_value
+    db.add.assert_called_once_with(record)
+    assert commits == [False]
+    assert db.expire_on_commit is True
+    db.refresh.assert_not_called()
+
+
+def test_si_fallback_irn_uses_shared_hash_and_verification_code():
+    """Test that the SI fallback path hashes and signs like the IRN generator."""
+    from app.services.firs_si.irn_generation_service import generate_irn # type: ignore
+    from app.utils.irn_generator import generate_verification_code, HASH_V2_PREFIX # type: ignore
+    
+    with patch("app.utils.irn_generator.generate_firs_irn", side_effect=ValueError("bad invoice")):
+        irn_value, verification_code, hash_value = generate_irn({"invoice_number": "INV001", "total_amount": 100})
+    
+    assert irn_value.startswith("IRN-")
+    assert hash_value.startswith(HASH_V2_PREFIX)
+    assert verification_code == generate_verification_code(hash_value, 12)
+
+
+
+@pytest.mark.parametrize("module_name", IRN_SERVICE_MODULES)
+def test_fallback_irn_takes_digest_characters_after_the_hash_prefix(module_name):
+    """Test that the legacy fallback IRN ends in six hex digits of the digest, not the prefix."""
+    import re
+    from app.utils.irn_generator import HASH_V2_PREFIX # type: ignore
+    generate_irn = importlib.import_module(module_name).generate_irn
+    
+    with patch("app.utils.irn_generator.generate_firs_irn", side_effect=ValueError("bad invoice")):
+        irn_value, _, hash_value = generate_irn({"invoice_number": "INV001", "total_amount": 100})
+    
+    assert re.fullmatch(r"IRN-\d{14}-[0-9A-F]{8}-[0-9A-F]{6}", irn_value)
+    assert irn_value.endswith(hash_value[len(HASH_V2_PREFIX):][:6].upper())
+
+def test_si_batch_generation_falls_back_per_invoice():
+    """Test that invoices rejected by the batch generator are generated individually."""
+    from app.services.firs_si import irn_generation_service # type: ignore
+    
+    batch_result = {"irn": "INV002-TESTSIDD-20250516", "verification_code": "abc123abc123", "hash_value": "b2:00"}
+    with patch("app.utils.irn_generator.generate_firs_irns", return_value=[None, batch_result]), \
+            patch.object(irn_generation_service, "generate_irn", return_value=("IRN-1", "code", "hash")) as single:
+        generated = irn_generation_service.generate_irns_batch([{"invoice_number": "INV001"}, {"invoice_number": "INV002"}])
+    
+    assert generated == [("IRN-1", "code", "hash"), ("INV002-TESTSIDD-20250516", "abc123abc123", "b2:00")]
+    single.assert_called_once_with({"invoice_number": "INV001"})
+
+
+def test_buffered_validation_records_flush_in_batches():
+    """Test that audit-only validation records are only queued and written in batches."""
+    from app.services.firs_si import irn_generation_service as service # type: ignore
+    
+    db = MagicMock()
+    with patch.object(service, "SessionLocal", return_value=db), \
+         patch.object(service, "VALIDATION_FLUSH_BATCH_SIZE", 2):
+        first = service.buffer_validation_record("INV001-SVC00001-20250102", True, "IRN is active")
+        service.buffer_validation_record("INV002-SVC00001-20250102", False, "IRN has expired")
+        service.buffer_validation_record("INV003-SVC00001-20250102", True, "IRN is active")
+        # Request handlers never write; the background task does
+        service.SessionLocal.assert_not_called()
+        
+        assert asyncio.run(service.flush_validation_buffer()) == 3
+        
+        batches = [call.args[1] for call in db.execute.call_args_list]
+        assert [[row["irn"] for row in rows] for rows in batches] == [
+            ["INV001-SVC00001-20250102", "INV002-SVC00001-20250102"],
+            ["INV003-SVC00001-20250102"]
+        ]
+        assert batches[0][0]["validation_date"] == first["validation_date"]
+        db.close.assert_called_once()
+        
+        db.reset_mock()
+        assert asyncio.run(service.flush_validation_buffer()) == 0
+        db.execute.assert_not_called()
+
+
+
+def test_failed_validation_flush_keeps_unwritten_records_for_retry():
+    """Test that records from a failed insert are retried on the next flush, within the cap."""
+    from app.services.firs_si import irn_generation_service as service # type: ignore
+    
+    db = MagicMock()
+    # The first batch is written, the second fails
+    db.execute.side_effect = [None, RuntimeError("connection lost")]
+    with patch.object(service, "SessionLocal", return_value=db), \
+         patch.object(service, "VALIDATION_FLUSH_BATCH_SIZE", 2), \
+         patch.object(service, "VALIDATION_BUFFER_MAX_PENDING", 3):
+        for i in (1, 2, 3, 4):
+            service.buffer_validation_record(f"INV00{i}-SVC00001-20250102", True, "IRN is active")
+        
+        assert asyncio.run(service.flush_validation_buffer()) == 2
+        db.rollback.assert_called_once()
+        
+        # Unwritten records are retried ahead of ones queued since
+        service.buffer_validation_record("INV005-SVC00001-20250102", True, "IRN is active")
+        service.buffer_validation_record("INV006-SVC00001-20250102", True, "IRN is active")
+        db.execute.side_effect = RuntimeError("connection lost")
+        assert asyncio.run(service.flush_validation_buffer()) == 0
+        
+        # Beyond the pending limit the oldest records are dropped
+        db.execute.side_effect = None
+        db.execute.reset_mock()
+        assert asyncio.run(service.flush_validation_buffer()) == 3
+        rows = [row for call in db.execute.call_args_list for row in call.args[1]]
+        assert [row["irn"] for row in rows] == [f"INV00{i}-SVC00001-20250102" for i in (4, 5, 6)]
@@ -0,0 +1,80 @@
+"""
+Tests for the key management service.
+"""
+
+import base64
+from unittest.mock import patch
+
+from app.services.key_service import KeyManagementService
+from app.utils.encryption import decrypt_with_gcm
+
+
+def test_get_key_by_id_decodes_each_key_once():
+    """Test that repeated lookups reuse the decoded key bytes."""
+    service = KeyManagementService()
+    service.initialize()
+    service._key_registry["stored"] = {"id": "stored", "key": "c2VjcmV0LWtleQ==", "active": False}
+    
+    with patch("app.services.key_service.base64.b64decode", wraps=base64.b64decode) as decode:
+        assert service.get_key_by_id("stored") == b"secret-key"
+        assert service.get_key_by_id("stored") == b"secret-key"
+        assert service.get_key_by_id("app_default") == service.get_current_key()
+    
+    decode.assert_called_once()
+
+
+def test_encrypt_value_tags_the_current_key():
+    """Test that encryption records the ID of the key it actually used."""
+    service = KeyManagementService()
+    with patch("app.services.key_service.get_app_encryption_key", return_value=b"k" * 32):
+        service.initialize()
+    # A reloaded registry can hold other entries still flagged active
+    service._key_registry = {"stale": {"id": "stale", "key": "c2VjcmV0LWtleQ==", "active": True}, **service._key_registry}
+    
+    encrypted = service.encrypt_value({"amount": 100})
+    
+    assert encrypted["key_id"] == "app_default"
+    assert service.decrypt_value(encrypted, as_dict=True) == {"amount": 100}
+
+
+def test_rotate_key_serves_new_key_and_keeps_old_ones():
+    """Test that a rotated key is current and earlier keys still resolve."""
+    service = KeyManagementService()
+    service.initialize()
+    old_key = service.get_current_key()
+    
+    with patch.object(service, "_save_keys_to_storage") as save:
+        key_id = service.rotate_key()
+    
+    save.assert_called_once()
+    assert service.get_key_by_id(key_id) == service.get_current_key() != old_key
+    assert service.get_key_by_id("app_default") == old_key
+    assert [k_id for k_id, k in service._key_registry.items() if k["active"]] == [key_id]
+
+
+def test_stored_keys_are_decrypted_once_per_service_until_the_file_changes(tmp_path):
+    """Test that a service re-reads the registry only when it has been rewritten."""
+    storage_file = tmp_path / "keys" / "key_registry.enc"
+    
+    with patch("app.services.key_service.get_app_encryption_key", return_value=b"k" * 32), \
+            patch.object(KeyManagementService, "_get_storage_file", return_value=storage_file):
+        writer = KeyManagementService()
+        key_id = writer.rotate_key()
+        
+        assert storage_file.exists()
+        assert not list(storage_file.parent.glob(".key_registry.*"))
+        
+        with patch("app.services.key_service.decrypt_with_gcm", wraps=decrypt_with_gcm) as decrypt:
+            reader = KeyManagementService()
+            assert reader.get_key_by_id(key_id) == writer.get_current_key()
+            assert reader.get_key_by_id("missing") is None
+            assert decrypt.call_count == 1
+            
+            # Decrypted registries are held per instance, never process-wide
+            assert KeyManagementService().get_key_by_id(key_id) == writer.get_current_key()
+            assert decrypt.call_count == 2
+            
+            # Rotating rewrites the file, so the next miss decrypts it again
+            newer_id = writer.rotate_key()
+            assert reader.get_key_by_id(newer_id) == writer.get_current_key()
+            assert decrypt.call_count == 3
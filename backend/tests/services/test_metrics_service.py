@@ -0,0 +1,391 @@
+"""
+Tests for the dashboard metrics service.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, declarative_base
+
+from app.models.irn import IRNRecord, IRNStatus
+from app.services import metrics_service
+from app.services.metrics_service import (
+    MetricsService, clear_metrics_cache, _b2b_flag, _bucket_totals, _common_error_counts, _day_buckets, _hour_buckets,
+    _latest_rows, _time_threshold
+)
+
+_Base = declarative_base()
+
+
+class _Event(_Base):
+    """Standalone table for exercising the bucketing helpers."""
+    __tablename__ = "events"
+
+    id = Column(Integer, primary_key=True)
+    happened_at = Column(DateTime, nullable=False)
+    requests = Column(Integer)
+    payload = Column(JSON)
+
+
+class _Usage(_Base):
+    """Standalone API usage table with the columns the health metrics read."""
+    __tablename__ = "usage"
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, nullable=False)
+    path = Column(String)
+    request_count = Column(Integer)
+    error_count = Column(Integer)
+    total_response_time = Column(Float)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics_cache():
+    clear_metrics_cache()
+    yield
+    clear_metrics_cache()
+
+
+def _event_session(now, events, payloads=()):
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all(
+        _Event(happened_at=now - age, requests=requests) for age, requests in events
+    )
+    session.add_all(
+        _Event(happened_at=now - timedelta(hours=13), payload=payload) for payload in payloads
+    )
+    session.commit()
+    return session
+
+
+def _query_db():
+    """Session mock whose filtered queries all return the same query mock."""
+    db = MagicMock()
+    query = db.query.return_value
+    query.filter.return_value = query
+    query.join.return_value = query
+    query.count.return_value = 0
+    return db, query
+
+
+def test_irn_status_counts_come_from_one_grouped_query():
+    """Test that IRN status counts and the total share a single GROUP BY."""
+    db, query = _query_db()
+    grouped = query.with_entities.return_value.group_by.return_value
+    grouped.all.return_value = [(IRNStatus.ACTIVE, 3), (IRNStatus.EXPIRED, 2), (IRNStatus.REVOKED, 1)]
+
+    metrics = MetricsService.get_irn_generation_metrics(db, time_range="7d")
+
+    assert metrics["total_count"] == 6
+    assert metrics["status_counts"]["active"] == 3
+    assert metrics["status_counts"]["expired"] == 2
+    assert metrics["status_counts"]["unused"] == 0
+    assert metrics["status_counts"]["used"] == 0
+    assert query.with_entities.call_args_list[0].args[0] is IRNRecord.status
+
+
+def test_bucket_totals_match_per_hour_counts():
+    """Test that one grouped query reproduces the per-hour COUNT/SUM loop."""
+    now = datetime(2025, 1, 2, 12, 30)
+    db = _event_session(now, [
+        (timedelta(minutes=5), 2),
+        (timedelta(minutes=59), 3),
+        (timedelta(minutes=61), None),
+        (timedelta(hours=23, minutes=59), 4),
+        (timedelta(hours=25), 100),
+        (timedelta(minutes=-5), 100),
+    ])
+    buckets = _hour_buckets(now)
+
+    totals = _bucket_totals(db, db.query(_Event), _Event.happened_at, buckets, _Event.requests)
+
+    assert len(totals) == 24
+    assert totals[0] == (2, 5)
+    assert totals[1] == (1, 0)
+    assert totals[23] == (1, 4)
+    assert sum(count for count, _ in totals) == 4
+
+
+def test_daily_b2b_split_happens_in_the_query():
+    """Test that B2B invoices are counted from customer TIN/VAT in SQL."""
+    now = datetime(2025, 1, 2, 12, 30)
+    db = _event_session(now, [], payloads=[
+        {"customer": {"tax_id": "12345678"}},
+        {"customer": {"vat": "NG-VAT-1"}},
+        {"customer": {"tax_id": ""}},
+        {"customer": {}},
+        {},
+    ])
+    buckets = _day_buckets(now)
+
+    totals = _bucket_totals(db, db.query(_Event), _Event.happened_at, buckets, _b2b_flag(_Event.payload))
+
+    assert buckets[0] == (datetime(2025, 1, 1), datetime(2025, 1, 2))
+    assert totals[0] == (5, 2)
+    assert all(total == (0, 0) for total in totals[1:])
+
+
+def test_b2b_totals_come_from_one_aggregate_row():
+    """Test that B2B/B2C totals and successes are read from a single aggregate query."""
+    db, query = _query_db()
+    query.with_entities.return_value.one.return_value = (10, 4, 7, 3)
+    db.query.return_value.group_by.return_value.all.return_value = []
+
+    metrics = MetricsService.get_b2b_vs_b2c_metrics(db, time_range="30d")
+
+    assert metrics["b2b_count"] == 4
+    assert metrics["b2c_count"] == 6
+    assert metrics["b2b_success_rate"] == 75
+    assert metrics["b2c_success_rate"] == 4 / 6 * 100
+    query.all.assert_not_called()
+
+
+def test_common_error_counts_parse_recent_issues_outside_postgresql():
+    """Test that error codes are counted over the most recent sample on SQLite."""
+    now = datetime(2025, 1, 2, 12, 30)
+    db = _event_session(now, [], payloads=[
+        [{"error_code": "TIN_MISSING"}, {"error_code": "VAT_INVALID"}],
+        [{"error_code": "TIN_MISSING"}, {}],
+        None,
+    ])
+    db.add(_Event(happened_at=now - timedelta(days=3), payload=[{"error_code": "OLD"}]))
+    db.commit()
+
+    counts = _common_error_counts(db, db.query(_Event), _Event.payload, _Event.happened_at, sample_size=3)
+
+    assert counts[0] == ("TIN_MISSING", 2)
+    assert sorted(counts[1:]) == [("VAT_INVALID", 1), ("unknown", 1)]
+
+
+def test_common_error_counts_unnest_issues_in_postgresql():
+    """Test that PostgreSQL groups error codes from jsonb_array_elements in one statement."""
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value.all.return_value = [("TIN_MISSING", 4), ("VAT_INVALID", 1)]
+
+    counts = _common_error_counts(db, Session().query(_Event), _Event.payload, _Event.happened_at)
+
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert counts == [("TIN_MISSING", 4), ("VAT_INVALID", 1)]
+    assert "jsonb_array_elements" in sql
+    assert "GROUP BY" in sql
+
+
+def test_latest_rows_pick_the_newest_row_per_key():
+    """Test that the newest row per key comes back from a single windowed query."""
+    now = datetime(2025, 1, 2, 12, 30)
+    db = _event_session(now, [
+        (timedelta(hours=3), 1),
+        (timedelta(hours=1), 1),
+        (timedelta(hours=2), 2),
+        (timedelta(hours=5), 3),
+    ])
+
+    latest = _latest_rows(db, _Event.requests, _Event.happened_at, [1, 2, 4], _Event.happened_at, _Event.id)
+
+    assert latest == {1: (now - timedelta(hours=1), 2), 2: (now - timedelta(hours=2), 3)}
+    assert _latest_rows(db, _Event.requests, _Event.happened_at, [], _Event.id) == {}
+
+
+def test_dashboard_metrics_are_cached_per_time_range_and_organization():
+    """Test that repeated dashboard polls reuse the cached aggregates."""
+    db, query = _query_db()
+    grouped = query.with_entities.return_value.group_by.return_value
+    grouped.all.return_value = [(IRNStatus.ACTIVE, 3)]
+
+    first = MetricsService.get_irn_generation_metrics(db, "7d")
+    calls = db.query.call_count
+
+    assert MetricsService.get_irn_generation_metrics(db, "7d") is first
+    assert db.query.call_count == calls
+
+    MetricsService.get_irn_generation_metrics(db, "30d")
+    assert db.query.call_count > calls
+
+
+def test_irn_status_counts_read_the_hourly_rollup_on_postgresql():
+    """Test that PostgreSQL reads IRN status totals from the metrics rollup table."""
+    db, query = _query_db()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    query.group_by.return_value.all.return_value = [("active", 5), ("expired", 1)]
+
+    with patch.object(
+        metrics_service, "_bucket_totals", side_effect=lambda db, query, column, buckets, *sums: [(0,)] * len(buckets)
+    ):
+        metrics = MetricsService.get_irn_generation_metrics(db, "24h")
+
+    assert metrics["total_count"] == 6
+    assert metrics["status_counts"]["active"] == 5
+    assert db.query.call_args_list[1].args[0] is metrics_service.METRICS_ROLLUP.c.dim
+    query.with_entities.assert_not_called()
+
+
+def test_rollup_maintenance_compacts_and_creates_partitions_ahead():
+    """Test that maintenance merges delta rows and pre-creates daily partitions."""
+    db = MagicMock()
+
+    metrics_service.maintain_metrics_rollup(db, now=datetime(2025, 1, 2, 12, 30))
+
+    statements = [str(call.args[0]) for call in db.execute.call_args_list]
+    assert "DELETE FROM dashboard_metrics_rollup" in statements[0]
+    assert len(statements) == 1 + metrics_service.METRICS_ROLLUP_PARTITION_DAYS_AHEAD
+    assert "dashboard_metrics_rollup_20250103 PARTITION OF" in statements[1]
+    assert "FROM ('2025-01-03') TO ('2025-01-04')" in statements[1]
+
+
+def test_system_health_totals_and_endpoints_are_aggregated_in_sql():
+    """Test that API usage totals and top endpoints come from SUM/GROUP BY queries."""
+    now = datetime.utcnow()
+    db = _event_session(now, [])
+    db.add_all([
+        _Usage(timestamp=now - timedelta(minutes=10), path="/irn", request_count=8, error_count=2, total_response_time=40.0),
+        _Usage(timestamp=now - timedelta(hours=2), path="/irn", request_count=2, error_count=0, total_response_time=None),
+        _Usage(timestamp=now - timedelta(hours=3), path=None, request_count=5, error_count=1, total_response_time=10.0),
+        _Usage(timestamp=now - timedelta(days=3), path="/old", request_count=50, error_count=50, total_response_time=1.0),
+    ])
+    db.commit()
+
+    with patch.object(metrics_service, "APIKeyUsage", _Usage):
+        metrics = MetricsService.get_system_health_metrics(db, "24h")
+
+    assert metrics["total_requests"] == 15
+    assert metrics["error_requests"] == 3
+    assert metrics["avg_response_time"] == 50.0 / 15
+    assert [(e["endpoint"], e["count"]) for e in metrics["endpoint_popularity"]] == [("/irn", 10), ("unknown", 5)]
+    assert metrics["hourly_requests"][0]["requests"] == 8
+
+
+def test_validation_counts_come_from_one_aggregate_row():
+    """Test that total, success and failure counts share a single query."""
+    db, query = _query_db()
+    query.with_entities.return_value.one.return_value = (10, 7)
+    db.query.return_value.group_by.return_value.all.return_value = []
+
+    metrics = MetricsService.get_validation_metrics(db, "24h")
+
+    assert (metrics["total_count"], metrics["success_count"], metrics["failure_count"]) == (10, 7, 3)
+    assert metrics["success_rate"] == 70
+    query.count.assert_not_called()
+
+
+def test_odoo_counts_avoid_repeated_count_queries():
+    """Test that integration and invoice counts need no separate COUNT queries."""
+    db, query = _query_db()
+    query.all.return_value = [MagicMock(is_active=True), MagicMock(is_active=True), MagicMock(is_active=False)]
+    query.with_entities.return_value.one.return_value = (4, 3)
+
+    with patch.object(metrics_service, "_latest_rows", return_value={}), patch.object(
+        metrics_service, "_bucket_totals", side_effect=lambda db, query, column, buckets, *sums: [(0,)] * len(buckets)
+    ):
+        metrics = MetricsService.get_odoo_integration_metrics(db, "24h")
+
+    assert (metrics["active_integrations"], metrics["inactive_integrations"]) == (2, 1)
+    assert metrics["total_invoices"] == 4
+    assert metrics["success_rate"] == 75
+    query.count.assert_not_called()
+
+
+def _patched_sections():
+    sections = {
+        name: MagicMock(return_value=MagicMock())
+        for name in (
+            "get_irn_generation_metrics", "get_validation_metrics", "get_b2b_vs_b2c_metrics",
+            "get_odoo_integration_metrics", "get_system_health_metrics", "get_transmission_metrics_summary"
+        )
+    }
+    return sections, patch.multiple(MetricsService, **sections)
+
+
+def test_dashboard_summary_runs_sections_on_their_own_sessions_on_postgresql():
+    """Test that PostgreSQL summary sections each get a short-lived session."""
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    sections, patcher = _patched_sections()
+
+    with patcher:
+        summary = MetricsService.get_dashboard_summary(db, "org-1")
+
+    sessions = [section.call_args.args[0] for section in sections.values()]
+    assert all(isinstance(session, Session) and session is not db for session in sessions)
+    assert len({id(session) for session in sessions}) == len(sections)
+    assert summary["transmission_summary"] is sections["get_transmission_metrics_summary"].return_value
+
+
+def test_dashboard_summary_reuses_the_request_session_outside_postgresql():
+    """Test that other dialects run the summary sections serially on the given session."""
+    db = MagicMock()
+    sections, patcher = _patched_sections()
+
+    with patcher:
+        MetricsService.get_dashboard_summary(db, "org-1")
+
+    assert all(section.call_args.args[0] is db for section in sections.values())
+
+
+
+@pytest.mark.parametrize("railway", [False, True])
+def test_dashboard_summary_fan_out_stays_below_the_pool_size(monkeypatch, railway):
+    """Test that concurrent dashboards never check out as many connections as the pool holds."""
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+    if railway:
+        monkeypatch.setenv("RAILWAY_ENVIRONMENT", "production")
+    else:
+        monkeypatch.delenv("RAILWAY_ENVIRONMENT", raising=False)
+        monkeypatch.delenv("RAILWAY_DEPLOYMENT", raising=False)
+    pool_size = metrics_service.get_engine_kwargs()["pool_size"]
+    monkeypatch.setattr(metrics_service, "_dashboard_executor", None)
+
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def section(*args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return MagicMock()
+
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    sections, patcher = _patched_sections()
+    for mock in sections.values():
+        mock.side_effect = section
+
+    with patcher, ThreadPoolExecutor(max_workers=4) as requests:
+        for future in [requests.submit(MetricsService.get_dashboard_summary, db) for _ in range(4)]:
+            future.result()
+    metrics_service._dashboard_executor.shutdown()
+
+    # Each request also holds its own session, so leave room in the pool
+    assert peak[0] <= metrics_service._dashboard_max_workers() < pool_size
+
+def test_time_threshold_uses_the_range_lookup():
+    """Test that each dashboard time range maps to its look-back window."""
+    now = datetime(2025, 1, 31, 12, 0)
+
+    assert _time_threshold(now, "24h") == datetime(2025, 1, 30, 12, 0)
+    assert _time_threshold(now, "7d") == datetime(2025, 1, 24, 12, 0)
+    assert _time_threshold(now, "30d") == datetime(2025, 1, 1, 12, 0)
+    assert _time_threshold(now, "all") == datetime.min
+
+
+def test_irn_metrics_filter_by_organization_through_integrations():
+    """Test that the IRN organization filter joins integrations on the cast integration ID."""
+    db, query = _query_db()
+    query.with_entities.return_value.group_by.return_value.all.return_value = []
+
+    MetricsService.get_irn_generation_metrics(db, "7d", "org-1")
+
+    join_target, join_condition = query.join.call_args.args
+    assert "CAST(integrations.id AS VARCHAR)" in str(join_condition)
@@ -0,0 +1,45 @@
+"""
+Test cases for scheduled IRN tasks.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from app.models.irn import IRNStatus
+from app.tasks.irn_tasks import EXPIRABLE_STATUSES, expire_outdated_irns
+
+
+def test_expirable_statuses_cover_everything_but_expired_and_revoked():
+    """Test that the positive status list matches the sweep's intent."""
+    assert set(EXPIRABLE_STATUSES) == set(IRNStatus) - {IRNStatus.EXPIRED, IRNStatus.REVOKED}
+
+
+@patch('app.tasks.irn_tasks.SessionLocal')
+def test_expire_outdated_irns_updates_in_committed_chunks(mock_session):
+    """Test that the sweep expires chunk by chunk until a short chunk."""
+    mock_db = MagicMock()
+    mock_session.return_value = mock_db
+    update = mock_db.query.return_value.filter.return_value.update
+    update.side_effect = [2, 2, 1]
+    
+    result = expire_outdated_irns(batch_size=2)
+    
+    assert result["success"] is True
+    assert result["details"]["expired_count"] == 5
+    assert update.call_count == 3
+    assert all(call.kwargs["synchronize_session"] is False for call in update.call_args_list)
+    assert mock_db.commit.call_count == 3
+    mock_db.query.return_value.all.assert_not_called()
+    mock_db.close.assert_called_once()
+
+
+@patch('app.tasks.irn_tasks.SessionLocal')
+def test_expire_outdated_irns_with_nothing_to_expire(mock_session):
+    """Test that an empty sweep issues one UPDATE and no commit."""
+    mock_db = MagicMock()
+    mock_session.return_value = mock_db
+    mock_db.query.return_value.filter.return_value.update.return_value = 0
+    
+    result = expire_outdated_irns()
+    
+    assert result["details"]["expired_count"] == 0
+    mock_db.commit.assert_not_called()
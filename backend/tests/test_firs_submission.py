@@ -92,7 +92,7 @@ class TestFIRSSubmission(unittest.TestCase):
 </Invoice>
 """
     
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_authenticate(self, mock_post):
         """Test authentication with FIRS API."""
         # Mock successful authentication
@@ -130,7 +130,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertEqual(kwargs["json"]["email"], "test@example.com")
         self.assertEqual(kwargs["json"]["password"], "password")
     
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_authenticate_failure(self, mock_post):
         """Test authentication failure with FIRS API."""
         # Mock failed authentication
@@ -149,7 +149,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertTrue("FIRS API authentication failed" in context.exception.detail)
         
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_submit_invoice(self, mock_post, mock_auth):
         """Test submitting a single invoice."""
         # Setup mocks
@@ -184,7 +184,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertTrue("metadata" in kwargs["json"])
     
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_submit_invoice_failure(self, mock_post, mock_auth):
         """Test invoice submission failure."""
         # Setup mocks
@@ -211,7 +211,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertEqual(result.errors[0]["field"], "tax_total")
     
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_submit_invoices_batch(self, mock_post, mock_auth):
         """Test submitting a batch of invoices."""
         # Setup mocks
@@ -251,7 +251,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertTrue("metadata" in kwargs["json"])
         
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_submit_ubl_invoice(self, mock_post, mock_auth):
         """Test submitting a UBL XML invoice."""
         # Setup mocks
@@ -289,7 +289,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertEqual(kwargs["headers"]["X-FIRS-Profile"], "BIS3.0")
     
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_check_submission_status(self, mock_get, mock_auth):
         """Test checking submission status."""
         # Setup mocks
@@ -325,7 +325,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertEqual(kwargs["url"], f"https://test-api.firs.gov.ng/api/v1/invoice/submission/{submission_id}/status")
     
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_check_submission_status_not_found(self, mock_get, mock_auth):
         """Test checking status for non-existent submission."""
         # Setup mocks
@@ -347,7 +347,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertTrue(f"Submission with ID {submission_id} not found" in context.exception.detail)
     
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_validate_ubl_invoice(self, mock_post, mock_auth):
         """Test validating a UBL XML invoice."""
         # Setup mocks
@@ -380,7 +380,7 @@ class TestFIRSSubmission(unittest.TestCase):
         self.assertEqual(kwargs["headers"]["Content-Type"], "application/xml")
     
     @patch('app.services.firs_service.FIRSService._ensure_authenticated')
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_validate_ubl_invoice_invalid(self, mock_post, mock_auth):
         """Test validating an invalid UBL XML invoice."""
         # Setup mocks
@@ -18,9 +18,11 @@ from app.utils.irn_generator import (
     extract_key_invoice_fields,
     calculate_invoice_hash,
     generate_verification_code,
+    verification_code_matches,
     generate_service_id,
     format_invoice_number,
     generate_firs_irn,
+    generate_firs_irns,
     verify_irn,
     generate_irn_for_ubl_invoice,
     # Include validation functions from irn_generator instead of irn.py
@@ -81,9 +83,11 @@ class TestIRNGenerator(unittest.TestCase):
         unique_id = str(uuid4())
         hash_value = calculate_invoice_hash(self.invoice_data, unique_id)
         
-        # Verify hash is a 64-character hex string (SHA-256)
-        self.assertEqual(len(hash_value), 64)
-        self.assertTrue(all(c in '0123456789abcdef' for c in hash_value))
+        # Verify hash is a version prefix plus a 64-character hex string (BLAKE2b-256)
+        self.assertTrue(hash_value.startswith("b2:"))
+        digest = hash_value[len("b2:"):]
+        self.assertEqual(len(digest), 64)
+        self.assertTrue(all(c in '0123456789abcdef' for c in digest))
         
         # Verify hash is deterministic for same input
         hash_value2 = calculate_invoice_hash(self.invoice_data, unique_id)
@@ -111,6 +115,59 @@ class TestIRNGenerator(unittest.TestCase):
         verification_code3 = generate_verification_code("different_hash_value")
         self.assertNotEqual(verification_code, verification_code3)
     
+    def test_verification_code_tracks_secret_key(self):
+        """Test that the cached HMAC key follows SECRET_KEY changes."""
+        import hashlib
+        import hmac
+        from unittest.mock import patch
+        from app.utils import irn_generator
+        
+        hash_value = "0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef"
+        for secret in ("first-secret", "second-secret"):
+            with patch.object(irn_generator.settings, "SECRET_KEY", secret):
+                expected = hmac.new(secret.encode(), hash_value.encode(), hashlib.sha256).hexdigest()[:12]
+                self.assertEqual(generate_verification_code(hash_value), expected)
+    
+    def test_verification_code_follows_hash_version(self):
+        """Test that legacy SHA-256 hashes keep HMAC codes and new hashes use keyed BLAKE2b."""
+        import hashlib
+        import hmac
+        from unittest.mock import patch
+        from app.utils import irn_generator
+        
+        unique_id = str(uuid4())
+        legacy_hash = calculate_invoice_hash(self.invoice_data, unique_id, legacy=True)
+        self.assertEqual(len(legacy_hash), 64)
+        
+        with patch.object(irn_generator.settings, "SECRET_KEY", "rollout-secret"):
+            new_hash = calculate_invoice_hash(self.invoice_data, unique_id)
+            self.assertEqual(
+                generate_verification_code(legacy_hash),
+                hmac.new(b"rollout-secret", legacy_hash.encode(), hashlib.sha256).hexdigest()[:12]
+            )
+            self.assertEqual(
+                generate_verification_code(new_hash),
+                hashlib.blake2b(new_hash.encode(), key=b"rollout-secret", digest_size=6).hexdigest()
+            )
+    
+    def test_verification_code_matches(self):
+        """Test the constant-time verification code check for both hash versions."""
+        unique_id = str(uuid4())
+        for hash_value in (
+            calculate_invoice_hash(self.invoice_data, unique_id, legacy=True),
+            calculate_invoice_hash(self.invoice_data, unique_id)
+        ):
+            code = generate_verification_code(hash_value)
+            self.assertTrue(verification_code_matches(hash_value, code))
+            self.assertFalse(verification_code_matches(hash_value, code[:-1] + ("0" if code[-1] != "0" else "1")))
+            if code != code.upper():
+                self.assertFalse(verification_code_matches(hash_value, code.upper()))
+            self.assertFalse(verification_code_matches(hash_value, "zz" + code[2:]))
+            self.assertFalse(verification_code_matches(hash_value, code[:10]))
+            self.assertFalse(verification_code_matches(hash_value, None))
+            # Odd lengths are compared as hex text
+            self.assertTrue(verification_code_matches(hash_value, generate_verification_code(hash_value, 7), 7))
+    
     def test_generate_service_id(self):
         """Test generation of service ID."""
         service_id = generate_service_id()
@@ -171,6 +228,27 @@ class TestIRNGenerator(unittest.TestCase):
         result2 = generate_firs_irn(self.invoice_data, service_id, timestamp)
         self.assertEqual(result2["irn"], f"INV2025001-{service_id}-{timestamp}")
     
+    def test_generate_firs_irns_batch(self):
+        """Test that batch generation matches single generation per invoice."""
+        invoices = [dict(self.invoice_data, invoice_number=f"INV2025{i:03d}") for i in range(3)]
+        
+        results = generate_firs_irns(invoices, "TESTSIDD", "20250516")
+        
+        self.assertEqual(
+            [result["irn"] for result in results],
+            [f"INV2025{i:03d}-TESTSIDD-20250516" for i in range(3)]
+        )
+        self.assertEqual(len({result["unique_id"] for result in results}), 3)
+        for invoice, result in zip(invoices, results):
+            self.assertEqual(set(result), set(generate_firs_irn(invoice)))
+            self.assertEqual(result["verification_code"], generate_verification_code(result["hash_value"]))
+            is_valid, _ = verify_irn(result["irn"], invoice)
+            self.assertTrue(is_valid)
+        
+        # Batch-level parameters are validated once, up front
+        with self.assertRaises(ValueError):
+            generate_firs_irns(invoices, "BAD", "20250516")
+    
     def test_verify_irn(self):
         """Test verification of IRN."""
         # Generate an IRN
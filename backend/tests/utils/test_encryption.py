@@ -14,6 +14,7 @@ from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from fastapi import HTTPException # type: ignore
 
+from app.utils import encryption
 from app.utils.encryption import (
     decrypt_sensitive_value,
     encrypt_irn_data,
@@ -182,4 +183,21 @@ def test_get_app_encryption_key():
     # Test without environment variable
     with mock.patch.dict(os.environ, {}, clear=True):
         key = get_app_encryption_key()
-        assert len(key) == 32  # 256-bit key 
\ No newline at end of file
+        assert len(key) == 32  # 256-bit key 
+
+def test_get_app_encryption_key_is_memoized_per_source():
+    """Test the derived key is reused until ENCRYPTION_KEY changes."""
+    first_key = base64.b64encode(os.urandom(32)).decode()
+    second_key = base64.b64encode(os.urandom(32)).decode()
+    
+    with mock.patch.dict(os.environ, {"ENCRYPTION_KEY": first_key}), \
+            mock.patch(
+                "app.utils.encryption._derive_app_encryption_key",
+                wraps=encryption._derive_app_encryption_key
+            ) as mock_derive:
+        assert get_app_encryption_key() == base64.b64decode(first_key)
+        assert get_app_encryption_key() == base64.b64decode(first_key)
+        mock_derive.assert_called_once_with(first_key)
+    
+    with mock.patch.dict(os.environ, {"ENCRYPTION_KEY": second_key}):
+        assert get_app_encryption_key() == base64.b64decode(second_key)